@@ -1,6 +1,15 @@
+import importlib
+import json
+import threading
+
 import dash
 import dash_bootstrap_components as dbc
 from dash import dcc, html
+from flask import abort, request
+
+import page_cache
+from exports import EXPORT_FORMATS, export_response
+from grid_query import model_key, valid_models
 
 # 1. Initialize the Dash App
 app = dash.Dash(
@@ -11,7 +20,11 @@ app = dash.Dash(
         dbc.themes.CYBORG,
         # This loads the AgGrid dark theme
         "https://cdn.jsdelivr.net/npm/ag-grid-community@31.1.1/styles/ag-theme-alpine-dark.css"
-    ]
+    ],
+    # Page layouts are functions that compute their data on first use.
+    # Without this, Dash calls every page's layout on the first request to
+    # validate callback IDs, which would build every page up front.
+    suppress_callback_exceptions=True,
 )
 
 # --- CRITICAL CHANGE 1: Define the Flask Server Object ---
@@ -20,6 +33,27 @@ app = dash.Dash(
 server = app.server 
 # --------------------------------------------------------
 
+# 2. Register the Pages
+# pages_folder="" turns off Dash's page-folder scan, so import the page
+# modules here (in navbar order) and attach their layouts the way the scan
+# would. Importing them is cheap: each page computes its data on first use
+# (see page_cache.py).
+PAGE_MODULES = [
+    'tab1_overview',
+    'tab2_explorer',
+    'tab3_trend',
+    'tab4_geo',
+    'tab5_genres',
+    'tab6_talent',
+    'tab7_recommendations',
+]
+for module_name in PAGE_MODULES:
+    page_module = importlib.import_module(module_name)
+    dash.page_registry[module_name]['layout'] = page_module.layout
+
+if not page_cache.LAZY_PAGES:
+    page_cache.load_all_pages()
+
 navbar = dbc.NavbarSimple(
     dbc.Nav(
         [
@@ -42,10 +76,67 @@ app.layout = dbc.Container(
     fluid=True,
 )
 
-# 4. Run the App (Modified for Production)
+# 4. Warm-up, Liveness & Readiness
+def start_warm_up():
+    """Precompute every page in a background thread; /readyz returns 503 until it is done."""
+    if page_cache.WARMUP_MODE != 'off':
+        threading.Thread(target=page_cache.warm_up, name='page-warm-up', daemon=True).start()
+
+
+@server.route('/healthz')
+def healthz():
+    # Liveness: the worker is up and answering requests
+    return {'status': 'ok'}
+
+
+@server.route('/readyz')
+def readyz():
+    # Readiness: every page's data, figures and caches are computed
+    status = page_cache.warm_status()
+    return status, 200 if status['ready'] else 503
+
+
+# 5. Data Exports
+# Streamed downloads of what the pages show, built on the server rather
+# than from the rows the browser happens to hold (the pages are imported above)
+from tab2_explorer import explorer_result
+from tab6_talent import talent_data
+from talent_lookup import talent_portfolio
+
+
+@server.route('/export/content-explorer.<file_format>')
+def export_content_explorer(file_format):
+    # ?models=[sortModel, filterModel] (JSON, as the grid sends them) &q=search
+    if file_format not in EXPORT_FORMATS:
+        abort(404)
+    try:
+        sort_model, filter_model = json.loads(request.args.get('models') or '[[], {}]')
+    except (TypeError, ValueError):
+        abort(400)
+    if not valid_models(sort_model, filter_model):
+        abort(400)
+    key = model_key({'sortModel': sort_model, 'filterModel': filter_model})
+    return export_response(explorer_result(key, request.args.get('q', '').strip()), 'content_explorer', file_format)
+
+
+@server.route('/export/talent/<int:talent_id>.<file_format>')
+def export_talent_portfolio(talent_id, file_format):
+    names = talent_data()['talent_names']
+    if file_format not in EXPORT_FORMATS or not 0 <= talent_id < len(names):
+        abort(404)
+    filename = ''.join(c if c.isalnum() else '_' for c in names[talent_id]).strip('_').lower() or 'talent'
+    # The full portfolio, a row per title and production country, read from
+    # only the row groups that hold this person
+    df = talent_portfolio(talent_id, ['show_id', 'title', 'role', 'release_year', 'country'])
+    return export_response(df, f"{filename}_portfolio", file_format)
+
+
+# 6. Run the App (Modified for Production)
 if __name__ == '__main__':
+    start_warm_up()
     # When running locally, use this command:
     app.run(debug=True, port=8052)
     
 # NOTE: The production server (Gunicorn on Render) ignores the 'if __name__ == "__main__":' 
 # block and instead looks directly for the 'server' object defined above.
+# gunicorn.conf.py starts the warm-up in each worker.
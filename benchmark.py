@@ -0,0 +1,225 @@
+# Scaling benchmarks for the prep pipeline and the page data builds.
+#
+# For each catalog size, generates a synthetic catalog (see
+# synthetic_catalog.py) and, in a scratch directory, measures each of these
+# steps in a fresh process:
+#
+#   snapshot             building the typed catalog snapshot (catalog.py)
+#   stage:<name>         every prepare_talent_data.py stage, in pipeline order
+#   page:<page name>     every page's @page_data build
+#
+# recording wall time, peak RSS and output size (bytes written for the
+# snapshot and stages, in-memory size of the DataFrames for pages). Results
+# are appended to a CSV, one row per step tagged with the run's start time and
+# git commit, and each step is compared with the previous run at the same
+# scale so regressions stand out.
+#
+#   python benchmark.py --scale 1 10 100 [--steps snapshot stage:edges] [--timeout 1800]
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Files the pages read from the working directory besides the prepared datasets
+STATIC_FILES = ['country-capital-lat-long-population.csv']
+
+RESULT_FIELDS = ['run_started', 'commit', 'scale', 'catalog_rows', 'step', 'status',
+                 'seconds', 'peak_rss_mb', 'baseline_rss_mb', 'output_bytes', 'error']
+
+# A step this much slower than the previous run is flagged
+REGRESSION_RATIO = 1.2
+
+
+# --- 1. Steps (run inside a worker process) ---
+def _data_bytes(value):
+    """In-memory size of the DataFrames/arrays inside a page's data."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(_data_bytes(item) for item in value.values())
+    return 0
+
+
+def run_step(step):
+    """Run one step in this process; return its measurements."""
+    import catalog
+    import prepare_talent_data
+
+    kind, _, name = step.partition(':')
+    if kind == 'page':
+        # Registers the pages (and their loaders) without computing anything
+        import app  # noqa: F401
+        from page_cache import PAGE_LOADERS
+        load = PAGE_LOADERS[name]
+
+    baseline = prepare_talent_data.peak_rss_mb()
+    start = time.perf_counter()
+    if kind == 'snapshot':
+        catalog.build_snapshot()
+        output_bytes = os.path.getsize(catalog.SNAPSHOT_PATH)
+    elif kind == 'stage':
+        prepare_talent_data.STAGES[name]['run']()
+        output_bytes = sum(os.path.getsize(path) for path in prepare_talent_data.STAGES[name]['outputs'])
+    elif kind == 'page':
+        output_bytes = _data_bytes(load())
+    else:
+        raise ValueError(f"unknown step {step!r}")
+
+    return {
+        'seconds': round(time.perf_counter() - start, 3),
+        'peak_rss_mb': prepare_talent_data.peak_rss_mb(),
+        'baseline_rss_mb': baseline,
+        'output_bytes': output_bytes,
+    }
+
+
+def all_steps():
+    import app  # noqa: F401
+    from page_cache import PAGE_LOADERS
+    from prepare_talent_data import STAGES
+    return ['snapshot'] + [f"stage:{name}" for name in STAGES] + [f"page:{name}" for name in PAGE_LOADERS]
+
+
+# --- 2. Running a Scale ---
+def prepare_workdir(workdir, csv_path):
+    """Empty scratch directory holding the static inputs; returns the worker env."""
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(workdir)
+    for name in STATIC_FILES:
+        shutil.copy(os.path.join(REPO_DIR, name), workdir)
+    return {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join(filter(None, [REPO_DIR, os.environ.get('PYTHONPATH')])),
+        'DASHBOARD_CATALOG_CSV': os.path.abspath(csv_path),
+        'DASHBOARD_CACHE_DIR': os.path.join(workdir, '.cache'),
+        'DASHBOARD_SHARED_MEMORY': '0',
+        'DASHBOARD_LAZY_PAGES': '1',
+        'DASHBOARD_WARMUP': 'off',
+    }
+
+
+def measure(step, workdir, env, timeout):
+    """Run one step in a fresh process, so its peak RSS is its own."""
+    command = [sys.executable, os.path.join(REPO_DIR, 'benchmark.py'), '--worker', step]
+    try:
+        done = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'status': 'timeout', 'seconds': timeout, 'error': f"over {timeout}s"}
+    if done.returncode != 0:
+        lines = (done.stderr or done.stdout).strip().splitlines()
+        return {'status': 'failed', 'error': lines[-1] if lines else f"exit code {done.returncode}"}
+    return {'status': 'ok', **json.loads(done.stdout.strip().splitlines()[-1])}
+
+
+def previous_results(results_path):
+    """Latest successful seconds per (scale, step) from earlier runs."""
+    if not os.path.exists(results_path):
+        return {}
+    df = pd.read_csv(results_path)
+    df = df[df['status'] == 'ok'].sort_values('run_started')
+    return {(int(row.scale), row.step): float(row.seconds) for row in df.itertuples()}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def append_result(results_path, row):
+    is_new = not os.path.exists(results_path)
+    if os.path.dirname(results_path):
+        os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    with open(results_path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if is_new:
+            writer.writeheader()
+        writer.writerow({field: row.get(field, '') for field in RESULT_FIELDS})
+
+
+def run_benchmarks(scales, steps=None, results_path=None, timeout=1800, seed=0, bench_dir=None):
+    """Benchmark every step at every scale, appending one row per step to results_path."""
+    from datastore import CACHE_DIR
+    from synthetic_catalog import write_synthetic_catalog
+
+    bench_dir = bench_dir or os.path.join(CACHE_DIR, 'benchmarks')
+    results_path = results_path or os.path.join(bench_dir, 'results.csv')
+    selected = steps or all_steps()
+    # Steps run in pipeline order; unselected snapshot/stage steps still run
+    # (unrecorded) when a later selected step needs their outputs.
+    unknown = set(selected) - set(all_steps())
+    if unknown:
+        raise ValueError(f"unknown step(s): {', '.join(sorted(unknown))}")
+    steps = [step for step in all_steps() if step in selected or not step.startswith('page:')]
+    steps = steps[:max(steps.index(step) for step in selected) + 1]
+    previous = previous_results(results_path)
+    run_started = time.strftime('%Y-%m-%dT%H:%M:%S')
+    commit = git_commit()
+
+    for scale in scales:
+        csv_path = write_synthetic_catalog(scale, seed=seed)
+        catalog_rows = len(pd.read_csv(csv_path, usecols=['show_id']))
+        workdir = os.path.join(bench_dir, f"{scale}x")
+        env = prepare_workdir(workdir, csv_path)
+        print(f"=== {scale}x: {catalog_rows:,} titles ({csv_path}) ===")
+        print(f"{'Step':<34}{'Status':<9}{'Seconds':>9}{'Peak RSS (MB)':>15}{'Output (MB)':>13}  vs previous")
+
+        for step in steps:
+            result = measure(step, workdir, env, timeout)
+            if step not in selected:
+                if result['status'] != 'ok':
+                    print(f"{step:<34}{result['status']:<9}  (setup) {result['error']}")
+                continue
+            row = {'run_started': run_started, 'commit': commit, 'scale': scale,
+                   'catalog_rows': catalog_rows, 'step': step, **result}
+            append_result(results_path, row)
+
+            comparison = ''
+            if result['status'] == 'ok' and (scale, step) in previous and previous[(scale, step)] > 0:
+                ratio = result['seconds'] / previous[(scale, step)]
+                comparison = f"{ratio:.2f}x" + ("  <-- slower" if ratio > REGRESSION_RATIO else '')
+            elif result['status'] != 'ok':
+                comparison = result['error']
+            seconds = result.get('seconds')
+            peak = result.get('peak_rss_mb')
+            output_bytes = result.get('output_bytes')
+            print(f"{step:<34}{result['status']:<9}"
+                  f"{'' if seconds is None else f'{seconds:.2f}':>9}"
+                  f"{'' if peak is None else f'{peak:.1f}':>15}"
+                  f"{'' if output_bytes is None else f'{output_bytes / 1e6:.1f}':>13}  {comparison}")
+    print(f"Results appended to {results_path}")
+    return results_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the prep stages and page data builds at several catalog sizes.")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10], help="catalog size multiples (default: 1 10)")
+    parser.add_argument('--steps', nargs='+', help="steps to run (default: all; see --list)")
+    parser.add_argument('--results', help="CSV to append results to (default: .cache/benchmarks/results.csv)")
+    parser.add_argument('--timeout', type=int, default=1800, help="seconds before a step is recorded as timed out")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--list', action='store_true', help="list the steps and exit")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_step(args.worker)))
+    elif args.list:
+        print('\n'.join(all_steps()))
+    else:
+        run_benchmarks(args.scale, args.steps, args.results, args.timeout, args.seed)
@@ -0,0 +1,243 @@
+# Shared catalog data layer.
+#
+# Every page imports the Netflix catalog from here instead of calling
+# pd.read_csv("netflix.csv") itself, so the catalog is loaded (and the
+# country/genre/cast/director columns are exploded) once per worker process.
+#
+# netflix.csv is converted once into a typed Parquet snapshot (parsed dates,
+# categorical type/rating, parsed duration, pre-split list columns) that is
+# only rebuilt when the CSV's content hash changes. Workers load the snapshot,
+# and only the columns they ask for, through datastore.read_table (so it is
+# memory-mapped and shared between workers in shared-memory mode).
+#
+# Everything returned by this module is shared between pages: treat it as
+# read-only and .copy() before adding or changing columns.
+#
+# Rebuild the snapshot by hand with:  python catalog.py [--force]
+
+import functools
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from datastore import CACHE_DIR, read_table
+
+CATALOG_CSV = os.environ.get("DASHBOARD_CATALOG_CSV", "netflix.csv")
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, "netflix.parquet")
+SNAPSHOT_META_PATH = os.path.join(CACHE_DIR, "netflix.meta.json")
+
+# Bump when the snapshot layout changes so old snapshots are rebuilt.
+SNAPSHOT_VERSION = 1
+
+# Comma-separated columns and the pre-split list column built from each
+LIST_COLUMNS = {
+    'country': 'country_list',
+    'listed_in': 'genre_list',
+    'cast': 'cast_list',
+    'director': 'director_list',
+}
+
+# Placeholder values some exports use instead of leaving the cell empty
+MISSING_MARKERS = {'No Data', 'Not Given'}
+
+
+# --- 1. Snapshot Ingest ---
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_meta():
+    try:
+        with open(SNAPSHOT_META_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_meta(meta):
+    tmp_path = f"{SNAPSHOT_META_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, SNAPSHOT_META_PATH)
+
+
+def _split_list(value):
+    if not isinstance(value, str):
+        return []
+    items = [item.strip() for item in value.split(',')]
+    return [item for item in items if item and item not in MISSING_MARKERS]
+
+
+def parse_catalog_csv(path):
+    """Read the raw catalog CSV and add the typed/derived snapshot columns."""
+    df = pd.read_csv(path)
+
+    df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce')
+    df['year_added'] = df['date_added'].dt.year.astype('Int16')
+    df['month_num'] = df['date_added'].dt.month.astype('Int8')
+    df['month_abbr'] = df['date_added'].dt.strftime('%b')
+
+    df['type'] = df['type'].astype('category')
+    df['rating'] = df['rating'].astype('category')
+
+    # "90 min" -> duration_minutes=90, "2 Seasons" -> duration_seasons=2
+    duration = df['duration'].astype('string').str.extract(r'(\d+)\s*(min|Season)', expand=True)
+    amount = pd.to_numeric(duration[0], errors='coerce')
+    df['duration_minutes'] = amount.where(duration[1] == 'min').astype('Int32')
+    df['duration_seasons'] = amount.where(duration[1] == 'Season').astype('Int32')
+
+    for column_name, list_name in LIST_COLUMNS.items():
+        df[list_name] = df[column_name].map(_split_list)
+
+    return df
+
+
+def snapshot_is_current():
+    """True if the snapshot on disk was built from the current CSV."""
+    meta = _read_meta()
+    if meta is None or meta.get('version') != SNAPSHOT_VERSION or not os.path.exists(SNAPSHOT_PATH):
+        return False
+    if not os.path.exists(CATALOG_CSV):
+        # Deployments may ship the snapshot without the CSV
+        return True
+
+    stat = os.stat(CATALOG_CSV)
+    if stat.st_size == meta['size'] and stat.st_mtime_ns == meta['mtime_ns']:
+        return True
+
+    # mtime changed (e.g. a fresh checkout): only rebuild if the content did
+    if stat.st_size != meta['size'] or _file_sha256(CATALOG_CSV) != meta['sha256']:
+        return False
+    _write_meta({**meta, 'mtime_ns': stat.st_mtime_ns})
+    return True
+
+
+def build_snapshot():
+    """Convert the CSV into the typed Parquet snapshot and record its hash."""
+    if not os.path.exists(CATALOG_CSV):
+        raise FileNotFoundError(f"{CATALOG_CSV} not found.")
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    stat = os.stat(CATALOG_CSV)
+    sha256 = _file_sha256(CATALOG_CSV)
+    df = parse_catalog_csv(CATALOG_CSV)
+
+    # Write to a private temp file first so concurrently booting workers
+    # never read a half-written snapshot.
+    tmp_path = f"{SNAPSHOT_PATH}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, SNAPSHOT_PATH)
+    _write_meta({
+        'version': SNAPSHOT_VERSION,
+        'source': CATALOG_CSV,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256,
+        'rows': len(df),
+    })
+    return df
+
+
+@functools.lru_cache(maxsize=None)
+def ensure_snapshot():
+    """Build the snapshot if it is missing or stale; return the dataset version."""
+    if not snapshot_is_current():
+        build_snapshot()
+    return _read_meta()['sha256']
+
+
+def catalog_version():
+    """Content hash of the CSV the current snapshot was built from."""
+    return ensure_snapshot()
+
+
+# --- 2. The Catalog ---
+@functools.lru_cache(maxsize=None)
+def _read_snapshot(columns):
+    ensure_snapshot()
+    return read_table(SNAPSHOT_PATH, columns=list(columns) if columns else None)
+
+
+def load_catalog(columns=None):
+    """Catalog, one row per show_id, optionally limited to some columns."""
+    return _read_snapshot(tuple(columns) if columns else None)
+
+
+# Columns used by the time-based charts
+ADDED_COLUMNS = ['show_id', 'type', 'title', 'rating', 'release_year',
+                 'date_added', 'year_added', 'month_num', 'month_abbr']
+
+
+@functools.lru_cache(maxsize=None)
+def load_added_titles():
+    """Catalog rows that have a valid date_added (used by the time-based charts)."""
+    df = load_catalog(ADDED_COLUMNS)
+    df = df.dropna(subset=['date_added']).copy()
+    df['year_added'] = df['year_added'].astype(int)
+    df['month_num'] = df['month_num'].astype(int)
+    return df
+
+
+# --- 3. Bridge Tables (show_id -> one value per row) ---
+def explode_values(df, column_name, value_name):
+    """Turn a comma-separated column into a (show_id, value) table, one row per listed value.
+
+    Values are counted as listed, like the pages always have: placeholder
+    markers ("Not Given") and repeats within a title are kept. The
+    pre-split list columns drop both.
+    """
+    df = df.dropna(subset=[column_name])
+    values = df[column_name].str.strip().str.split(', ')
+    df_bridge = pd.DataFrame({'show_id': df['show_id'].to_numpy(), value_name: values.to_numpy()}).explode(value_name)
+    df_bridge[value_name] = df_bridge[value_name].astype(str).str.strip()
+    return df_bridge.reset_index(drop=True)
+
+
+def _explode_column(column_name, value_name):
+    return explode_values(load_catalog(['show_id', column_name]), column_name, value_name)
+
+
+@functools.lru_cache(maxsize=None)
+def title_countries():
+    """show_id -> country"""
+    return _explode_column('country', 'country')
+
+
+@functools.lru_cache(maxsize=None)
+def title_genres():
+    """show_id -> genre (from 'listed_in')"""
+    return _explode_column('listed_in', 'genre')
+
+
+@functools.lru_cache(maxsize=None)
+def title_cast():
+    """show_id -> cast member name"""
+    return _explode_column('cast', 'name')
+
+
+@functools.lru_cache(maxsize=None)
+def title_directors():
+    """show_id -> director name"""
+    return _explode_column('director', 'name')
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the typed catalog snapshot.")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the CSV is unchanged")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.force or not snapshot_is_current():
+        df = build_snapshot()
+        print(f"Snapshot rebuilt: {len(df)} titles -> {SNAPSHOT_PATH} ({time.perf_counter() - start:.2f}s)")
+    else:
+        print(f"Snapshot is up to date: {SNAPSHOT_PATH}")
@@ -0,0 +1,135 @@
+# Read-only dataset store shared by all pages.
+#
+# By default datasets are read from Parquet into private, per-process pandas
+# DataFrames. With DASHBOARD_SHARED_MEMORY=1 each Parquet file is converted
+# once into an uncompressed Arrow IPC file under the cache directory and
+# opened through a memory map instead: numeric columns and Arrow-backed string
+# columns then point straight into the mapped file, so every gunicorn worker
+# on the box shares a single physical copy through the OS page cache.
+#
+# numpy arrays (graph indices, matrices) get the same treatment through
+# save_array()/load_array(), which always memory-map.
+
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CACHE_DIR = os.environ.get("DASHBOARD_CACHE_DIR", ".cache")
+SHARED_MEMORY = os.environ.get("DASHBOARD_SHARED_MEMORY", "0").lower() in ("1", "true", "yes")
+
+# Prepared outputs of prepare_talent_data.py read by the pages through
+# read_table() or mapped_table() (the per-talent files are read piecewise by
+# talent_lookup.py)
+PREPARED_DATASETS = [
+    'talent_dictionary.parquet',
+    'talent_titles.parquet',
+    'rising_stars.parquet',
+    'talent_centrality.parquet',
+    'genre_edges.parquet',
+]
+
+
+# --- 1. Arrow IPC Conversion ---
+def arrow_path_for(parquet_path):
+    name = os.path.splitext(os.path.basename(parquet_path))[0]
+    return os.path.join(CACHE_DIR, f"{name}.arrow")
+
+
+def _is_stale(target_path, source_path):
+    if not os.path.exists(target_path):
+        return True
+    return os.path.getmtime(target_path) < os.path.getmtime(source_path)
+
+
+def convert_to_arrow(parquet_path):
+    """Write parquet_path as an uncompressed Arrow IPC file (one record batch)."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    arrow_path = arrow_path_for(parquet_path)
+    # A single contiguous batch lets to_pandas() hand out views instead of
+    # concatenating chunks into fresh (private) memory.
+    table = pq.read_table(parquet_path).combine_chunks()
+    # Store strings with 64-bit offsets, which is what pandas' Arrow-backed
+    # string arrays hold, so wrapping them later does not cast (copy).
+    schema = pa.schema([
+        field.with_type(pa.large_string()) if pa.types.is_string(field.type) else field
+        for field in table.schema
+    ], metadata=table.schema.metadata)
+    table = table.cast(schema)
+
+    tmp_path = f"{arrow_path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+    os.replace(tmp_path, arrow_path)
+    return arrow_path
+
+
+def prepare_shared(parquet_paths):
+    """Convert any stale Arrow copies up front (call once, before forking workers)."""
+    for path in parquet_paths:
+        if os.path.exists(path) and _is_stale(arrow_path_for(path), path):
+            convert_to_arrow(path)
+
+
+# --- 2. Reading Tables ---
+try:
+    # Same missing-value semantics as pandas' default "str" dtype
+    STRING_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+except TypeError:  # pandas < 2.3
+    STRING_DTYPE = pd.StringDtype("pyarrow")
+
+
+def arrow_string_dtype(arrow_type):
+    """types_mapper for Table.to_pandas(): keep strings Arrow-backed, not Python objects."""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return STRING_DTYPE
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _open_mapped(arrow_path):
+    source = pa.memory_map(arrow_path, 'r')
+    return pa.ipc.open_file(source).read_all()
+
+
+def mapped_table(parquet_path):
+    """The dataset as a memory-mapped Arrow table (its Arrow copy is made on first use).
+
+    Slicing the table is O(1) and copies nothing, whatever shared mode is set to.
+    """
+    if not os.path.exists(parquet_path):
+        raise FileNotFoundError(f"{parquet_path} not found.")
+    arrow_path = arrow_path_for(parquet_path)
+    if _is_stale(arrow_path, parquet_path):
+        convert_to_arrow(parquet_path)
+        _open_mapped.cache_clear()
+    return _open_mapped(arrow_path)
+
+
+def read_table(parquet_path, columns=None):
+    """Load a dataset as a DataFrame, memory-mapped when shared mode is on."""
+    if not SHARED_MEMORY:
+        return pd.read_parquet(parquet_path, columns=columns)
+
+    table = mapped_table(parquet_path)
+    if columns is not None:
+        table = table.select(list(columns))
+    return table.to_pandas(split_blocks=True, types_mapper=arrow_string_dtype)
+
+
+# --- 3. numpy Arrays ---
+def save_array(path, array):
+    """Write a .npy file atomically."""
+    tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, np.ascontiguousarray(array))
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_array(path):
+    """Open a saved array read-only and memory-mapped (shared through the page cache)."""
+    return np.load(path, mmap_mode='r')
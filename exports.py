@@ -0,0 +1,87 @@
+# Streaming CSV / Parquet downloads.
+#
+# app.py serves the explorer's current result and a person's portfolio as
+# files. The rows are written EXPORT_CHUNK_ROWS at a time and each chunk is
+# sent as soon as it is encoded, so a worker holds one chunk of output no
+# matter how many rows are exported. Parquet gets one row group per chunk.
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flask import Response
+
+EXPORT_CHUNK_ROWS = 10_000
+
+
+def _frames(data):
+    """The rows of a DataFrame or pyarrow Table as DataFrames of EXPORT_CHUNK_ROWS rows."""
+    if isinstance(data, pa.Table):
+        for batch in data.to_batches(max_chunksize=EXPORT_CHUNK_ROWS):
+            yield batch.to_pandas()
+    else:
+        for start in range(0, len(data), EXPORT_CHUNK_ROWS):
+            yield data.iloc[start:start + EXPORT_CHUNK_ROWS]
+
+
+def csv_chunks(data):
+    header = True
+    for df in _frames(data):
+        yield df.to_csv(index=False, header=header)
+        header = False
+    if header:
+        # No rows: still send the header
+        yield ','.join(data.column_names if isinstance(data, pa.Table) else data.columns) + '\n'
+
+
+class _ChunkSink:
+    """Write-only file for ParquetWriter that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self.parts, self.position, self.closed = [], 0, False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        # Parquet records absolute offsets, so count every byte ever written
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data, self.parts = b''.join(self.parts), []
+        return data
+
+
+def parquet_chunks(data):
+    if isinstance(data, pa.Table):
+        schema = data.schema
+        tables = (pa.Table.from_batches([batch], schema) for batch in data.to_batches(max_chunksize=EXPORT_CHUNK_ROWS))
+    else:
+        schema = pa.Schema.from_pandas(data, preserve_index=False)
+        tables = (pa.Table.from_pandas(df, schema=schema, preserve_index=False) for df in _frames(data))
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for table in tables:
+            writer.write_table(table)
+            yield sink.drain()
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': (csv_chunks, 'text/csv'),
+    'parquet': (parquet_chunks, 'application/vnd.apache.parquet'),
+}
+
+
+def export_response(data, filename, file_format):
+    """A streamed download of a DataFrame or Table; file_format is a key of EXPORT_FORMATS."""
+    chunks, mimetype = EXPORT_FORMATS[file_format]
+    return Response(chunks(data), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}.{file_format}"'})
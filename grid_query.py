@@ -0,0 +1,187 @@
+# Server-side rows for AG Grid's infinite row model.
+#
+# With rowModelType="infinite" the grid asks for one block of rows at a time
+# through its getRowsRequest prop ({startRow, endRow, sortModel,
+# filterModel}); a callback answers in getRowsResponse with {rowData,
+# rowCount}. rows_response() does the answering for a pyarrow Table or a
+# DataFrame: the request's filters and sort are applied with pandas, and
+# only the requested block is converted to records. An unfiltered, unsorted
+# Table is sliced directly, which copies nothing.
+#
+# The grid asks for block after block with the same models while the user
+# scrolls, so a page can keep its filtered, sorted result under
+# model_key(request) and answer each block with block_response(). Requests
+# come from the browser, so pages check them with valid_request() first.
+
+import json
+
+import pandas as pd
+import pyarrow as pa
+
+from datastore import arrow_string_dtype
+
+EMPTY_RESPONSE = {'rowData': [], 'rowCount': 0}
+
+
+# --- 1. Filters ---
+def _text_mask(values, condition):
+    kind = condition.get('type', 'contains')
+    text = values.astype('string').str.lower()
+    term = str(condition.get('filter') or '').lower()
+    if kind == 'blank':
+        return values.isna() | (text == '')
+    if kind == 'notBlank':
+        return values.notna() & (text != '')
+    if kind == 'equals':
+        return text == term
+    if kind == 'notEqual':
+        return text != term
+    if kind == 'startsWith':
+        return text.str.startswith(term)
+    if kind == 'endsWith':
+        return text.str.endswith(term)
+    if kind == 'notContains':
+        return ~text.str.contains(term, regex=False)
+    return text.str.contains(term, regex=False)
+
+
+def _number_mask(values, condition):
+    kind = condition.get('type', 'equals')
+    values = pd.to_numeric(values, errors='coerce')
+    value = condition.get('filter')
+    if kind == 'blank':
+        return values.isna()
+    if kind == 'notBlank':
+        return values.notna()
+    if kind == 'inRange':
+        return (values >= value) & (values <= condition.get('filterTo'))
+    compare = {
+        'equals': values.eq, 'notEqual': values.ne,
+        'lessThan': values.lt, 'lessThanOrEqual': values.le,
+        'greaterThan': values.gt, 'greaterThanOrEqual': values.ge,
+    }
+    return compare.get(kind, values.eq)(value)
+
+
+def _column_mask(values, column_filter):
+    """Rows passing one column's filter model (a single or an AND/OR combined condition)."""
+    if 'conditions' in column_filter:
+        masks = [_column_mask(values, condition) for condition in column_filter['conditions']]
+        combined = masks[0]
+        for mask in masks[1:]:
+            combined = combined | mask if column_filter.get('operator') == 'OR' else combined & mask
+        return combined
+    if column_filter.get('filterType') == 'number':
+        return _number_mask(values, column_filter)
+    if column_filter.get('filterType') == 'set':
+        return values.astype('string').isin([str(value) for value in column_filter.get('values') or []])
+    return _text_mask(values, column_filter)
+
+
+def filter_frame(df, filter_model):
+    """Apply an AG Grid filterModel (text and number filters) to a DataFrame."""
+    mask = pd.Series(True, index=df.index)
+    for column_name, column_filter in (filter_model or {}).items():
+        if column_name in df.columns:
+            mask &= _column_mask(df[column_name], column_filter).fillna(False).astype(bool)
+    return df[mask]
+
+
+# --- 2. Sorting ---
+def sort_frame(df, sort_model):
+    """Apply an AG Grid sortModel ([{colId, sort}], in priority order) to a DataFrame."""
+    sort_model = [item for item in sort_model or [] if item['colId'] in df.columns]
+    if not sort_model:
+        return df
+    return df.sort_values([item['colId'] for item in sort_model],
+                          ascending=[item['sort'] == 'asc' for item in sort_model],
+                          kind='stable', na_position='last')
+
+
+# --- 3. Validating Requests ---
+SORT_DIRECTIONS = ('asc', 'desc')
+
+# Number filter types that compare against no value
+VALUELESS_FILTERS = ('blank', 'notBlank')
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _valid_filter(column_filter):
+    if not isinstance(column_filter, dict):
+        return False
+    if 'conditions' in column_filter:
+        conditions = column_filter['conditions']
+        return isinstance(conditions, list) and bool(conditions) and all(map(_valid_filter, conditions))
+    if column_filter.get('filterType') == 'number':
+        kind = column_filter.get('type', 'equals')
+        if kind in VALUELESS_FILTERS:
+            return True
+        return _is_number(column_filter.get('filter')) and (kind != 'inRange' or _is_number(column_filter.get('filterTo')))
+    if column_filter.get('filterType') == 'set':
+        return isinstance(column_filter.get('values') or [], list)
+    return True
+
+
+def valid_models(sort_model, filter_model):
+    """Whether a sortModel and filterModel have the shape filter_frame and sort_frame expect.
+
+    They come from the browser, so anything else is rejected rather than left to fail in pandas.
+    """
+    if not isinstance(sort_model, list) or not isinstance(filter_model, dict):
+        return False
+    for item in sort_model:
+        if not isinstance(item, dict) or not isinstance(item.get('colId'), str) or item.get('sort') not in SORT_DIRECTIONS:
+            return False
+    return all(map(_valid_filter, filter_model.values()))
+
+
+def valid_request(request):
+    """Whether a getRowsRequest has valid models and integer row bounds."""
+    if not isinstance(request, dict):
+        return False
+    bounds = [request.get('startRow') or 0, request.get('endRow') or 0]
+    return (all(isinstance(bound, int) and not isinstance(bound, bool) for bound in bounds)
+            and valid_models(request.get('sortModel') or [], request.get('filterModel') or {}))
+
+
+# --- 4. Answering a Block Request ---
+def model_key(request):
+    """Hashable key of a request's sort and filter models (the same for every block)."""
+    return json.dumps([request.get('sortModel') or [], request.get('filterModel') or {}], sort_keys=True)
+
+
+def block_response(df, request, columns=None):
+    """getRowsResponse for one block of an already filtered and sorted DataFrame."""
+    start = int(request.get('startRow') or 0)
+    stop = int(request.get('endRow') or start)
+    block = df.iloc[start:stop]
+    if columns is not None:
+        block = block[list(columns)]
+    # None rather than NaN/<NA>, which JSON cannot carry
+    block = block.astype(object).where(block.notna(), None)
+    return {'rowData': block.to_dict('records'), 'rowCount': len(df)}
+
+
+def rows_response(data, request, columns=None):
+    """getRowsResponse for one getRowsRequest, served from a Table or DataFrame.
+
+    `columns` limits the fields sent to the grid (default: all).
+    """
+    if request is None or not valid_request(request):
+        return EMPTY_RESPONSE
+    start = int(request.get('startRow') or 0)
+    stop = int(request.get('endRow') or start)
+
+    if isinstance(data, pa.Table):
+        if columns is not None:
+            data = data.select(list(columns))
+        if not request.get('sortModel') and not request.get('filterModel'):
+            return {'rowData': data.slice(start, stop - start).to_pylist(), 'rowCount': data.num_rows}
+        data = data.to_pandas(types_mapper=arrow_string_dtype)
+    elif columns is not None:
+        data = data[list(columns)]
+
+    return block_response(sort_frame(filter_frame(data, request.get('filterModel')), request.get('sortModel')), request)
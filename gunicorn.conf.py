@@ -0,0 +1,26 @@
+# Gunicorn picks this file up automatically from the working directory,
+# so the Procfile's plain `gunicorn app:server` uses these hooks.
+
+import os
+
+
+def on_starting(server):
+    """Runs once in the master process, before any worker is forked."""
+    import catalog
+    import datastore
+
+    # Build the catalog snapshot here so workers don't race to build it.
+    catalog.ensure_snapshot()
+
+    # In shared-memory mode, convert every dataset to Arrow IPC once up
+    # front; workers then only memory-map the same files.
+    if datastore.SHARED_MEMORY:
+        datastore.prepare_shared([catalog.SNAPSHOT_PATH] + datastore.PREPARED_DATASETS)
+        server.log.info("Shared-memory datasets ready in %s", os.path.abspath(datastore.CACHE_DIR))
+
+
+def post_worker_init(worker):
+    """Runs in each worker once app:server is loaded: start warming every page."""
+    import app
+
+    app.start_warm_up()
@@ -0,0 +1,114 @@
+# Lazy, once-per-worker page data.
+#
+# Page modules wrap the code that loads their datasets and builds their static
+# figures in @page_data("<page name>"). Nothing is computed at import time:
+# the first request that needs the data computes it (under a lock, so
+# concurrent requests in a threaded worker wait for a single computation) and
+# every later call returns the same object.
+#
+# Set DASHBOARD_LAZY_PAGES=0 to get the old behaviour back and compute every
+# page's data while the app starts.
+#
+# warm_up() computes every page (plus any registered @warmer caches) ahead of
+# traffic; app.py runs it when a worker starts and reports progress on /readyz.
+
+import functools
+import os
+import threading
+import time
+
+LAZY_PAGES = os.environ.get("DASHBOARD_LAZY_PAGES", "1").lower() not in ("0", "false", "no")
+
+# page name -> loader function, in registration order
+PAGE_LOADERS = {}
+
+
+def page_data(name):
+    """Decorator: compute a page's data once per worker, on first use."""
+    def decorator(build):
+        lock = threading.Lock()
+        state = {}
+
+        @functools.wraps(build)
+        def load():
+            if 'value' in state:
+                return state['value']
+            with lock:
+                if 'value' not in state:
+                    start = time.perf_counter()
+                    state['value'] = build()
+                    state['seconds'] = round(time.perf_counter() - start, 3)
+            return state['value']
+
+        load.is_loaded = lambda: 'value' in state
+        load.load_seconds = lambda: state.get('seconds')
+        PAGE_LOADERS[name] = load
+        return load
+    return decorator
+
+
+def load_all_pages():
+    """Compute every registered page's data now (used when LAZY_PAGES is off)."""
+    for load in PAGE_LOADERS.values():
+        load()
+
+
+# --- Warm-up ---
+# Extra per-page work to do during warm-up, e.g. filling a callback's cache
+PAGE_WARMERS = {}
+
+# DASHBOARD_WARMUP=background (default) warms every page in a background
+# thread after the worker starts; "off" leaves every page lazy.
+WARMUP_MODE = os.environ.get("DASHBOARD_WARMUP", "background").lower()
+
+_warm_state = {'started': None, 'finished': None, 'pages': {}}
+
+
+def warmer(name):
+    """Decorator: register extra work to run when the named page is warmed."""
+    def decorator(fn):
+        PAGE_WARMERS.setdefault(name, []).append(fn)
+        return fn
+    return decorator
+
+
+def warm_up():
+    """Compute every page's data, figures and caches, recording per-page timings."""
+    _warm_state['started'] = time.time()
+    for name, load in PAGE_LOADERS.items():
+        start = time.perf_counter()
+        try:
+            load()
+            for fn in PAGE_WARMERS.get(name, []):
+                fn()
+            error = None
+        except Exception as e:
+            # Keep warming the other pages; the failing page raises again
+            # (and shows its error) when it is requested.
+            error = f"{type(e).__name__}: {e}"
+        _warm_state['pages'][name] = {
+            'seconds': round(time.perf_counter() - start, 3),
+            'error': error,
+        }
+    _warm_state['finished'] = time.time()
+
+
+def warm_status():
+    """Readiness report: ready once warm-up has finished (or is turned off)."""
+    pages = {}
+    for name, load in PAGE_LOADERS.items():
+        warm = _warm_state['pages'].get(name, {})
+        pages[name] = {
+            'loaded': load.is_loaded(),
+            'load_seconds': load.load_seconds(),
+            'warm_seconds': warm.get('seconds'),
+            'error': warm.get('error'),
+        }
+
+    started, finished = _warm_state['started'], _warm_state['finished']
+    return {
+        'ready': WARMUP_MODE == 'off' or finished is not None,
+        'warmup': WARMUP_MODE,
+        'warmup_seconds': round(finished - started, 3) if finished else None,
+        'pages': pages,
+    }
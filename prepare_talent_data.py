@@ -1,20 +1,131 @@
-# Save this as prepare_talent_data.py
+# Talent & genre data preparation pipeline.
+#
+# Builds the .parquet files read by the Creator & Talent Hub and Genre
+# Intelligence pages from the catalog snapshot (see catalog.py), as a set of
+# named stages:
+#
+#   portfolio     -> talent_portfolio.parquet  (one row per title/person/country)
+#                    talent_dictionary.parquet (talent_id -> name, primary role)
+#   talent_index  -> talent_titles.parquet     (distinct titles per talent, contiguous)
+#                    talent_index/*.npy        (row offsets + stats per talent_id)
+#   talent_search -> talent_index/search_*.npy (name token index for type-ahead)
+#   edges         -> talent_edges.parquet      (collaboration network)
+#                    talent_graph/*.npy        (the same as CSR arrays, per talent_id)
+#   rising_stars  -> rising_stars.parquet      (growth score for every talent)
+#   centrality    -> talent_centrality.parquet (network metrics + community per talent)
+#   similarity    -> talent_index/similarity_*.npy (MinHash/LSH index, "people like X")
+#   genre_edges   -> genre_edges.parquet       (genre co-occurrence counts)
+#   title_similar -> title_neighbors.parquet   (most similar titles, for the explorer)
+#   show_manifest -> .cache/prep_shows.parquet (per-show hashes, for --incremental)
+#
+# Each stage records a hash of its inputs, the settings it reads and its
+# code (this script, catalog.py, datastore.py and the modules its builders
+# live in) in
+# .cache/prep_manifest.json and is skipped while they are unchanged. Stages
+# whose inputs are ready run side by side in a process pool, each in a fresh
+# process so its peak memory can be reported.
+#
+#   python prepare_talent_data.py                  # every stage
+#   python prepare_talent_data.py edges            # one stage (plus stale upstream ones)
+#   python prepare_talent_data.py --force rising_stars
+#   python prepare_talent_data.py --rising-window 3   # rising stars over 3 years
+#   python prepare_talent_data.py --list
+#   python prepare_talent_data.py --incremental    # apply only the shows that changed
+#
+# People are stored as int32 talent_id codes in the portfolio and edge tables;
+# talent_dictionary.parquet maps them back to names. IDs follow the sorted
+# order of the names, so they are renumbered whenever the set of names changes.
+# The portfolio is sorted by talent_id and written in small row groups, so
+# talent_lookup.py can read one person's rows from the row groups whose
+# talent_id statistics cover them; the talent hub itself uses the offset
+# index, which finds a person's rows and stats by position, and the CSR graph
+# (talent_graph.py) for collaborators.
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
 
 import pandas as pd
 import numpy as np
-from itertools import combinations
 
-print("Starting talent data preparation...")
+import catalog
+from catalog import MISSING_MARKERS
+from datastore import CACHE_DIR, save_array
+from talent_lookup import INDEX_ARRAYS, TITLE_COLUMNS, TITLES_PATH, index_path
+from talent_graph import GRAPH_ARRAYS, build_csr, graph_path
+from talent_search import SEARCH_ARRAYS, build_search_index
+from talent_similarity import SIMILARITY_ARRAYS, build_similarity_index
+from title_similarity import FEATURE_COLUMNS, NEIGHBORS_PATH, title_neighbors
 
-# --- 1. Load Data ---
 try:
-    # This path points to your Desktop
-    df = pd.read_csv("netflix.csv")
-except FileNotFoundError:
-    print("Error: /Users/pranjalimane/Desktop/netflix.csv not found.")
-    exit()
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PREP_MANIFEST_PATH = os.path.join(CACHE_DIR, "prep_manifest.json")
+
+# Stage input standing for the catalog snapshot (keyed by the CSV's content hash)
+CATALOG_INPUT = 'catalog'
+
+# State kept between runs for --incremental
+SHOW_MANIFEST_PATH = os.path.join(CACHE_DIR, "prep_shows.parquet")
+YEARLY_COUNTS_PATH = os.path.join(CACHE_DIR, "talent_yearly_counts.parquet")
+
+# Modules every stage is built with, besides this script
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+COMMON_CODE = ['catalog.py', 'datastore.py']
+
+# stage name -> {'run', 'inputs', 'outputs', 'code', 'settings'}, in pipeline order
+STAGES = {}
+
+# Tunable values the stages read, by name (set from the command line). A
+# stage lists the ones it uses, and their values are part of its cache key.
+SETTINGS = {}
+
+
+def stage(name, outputs, inputs=(), code=(), settings=()):
+    """Decorator: register a pipeline stage, the files it reads and writes, the
+    modules (next to this script) holding the code that builds it and the
+    SETTINGS it reads."""
+    def decorator(run):
+        STAGES[name] = {'run': run, 'inputs': list(inputs), 'outputs': list(outputs),
+                        'code': [os.path.join(CODE_DIR, path) for path in COMMON_CODE + list(code)],
+                        'settings': list(settings)}
+        return run
+    return decorator
+
+
+def write_output(df, path, **parquet_options):
+    """Write a stage output atomically, so a failed run never leaves half a file."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False, **parquet_options)
+    os.replace(tmp_path, path)
+
+
+# Rows per row group in the per-talent lookup files: a lookup decodes a whole
+# group, so keep them small; smaller than this mostly grows the file (each
+# group repeats its own dictionaries), which zstd then wins back.
+TALENT_ROW_GROUP_SIZE = 4096
+
+
+def write_talent_sorted(df, path):
+    """Write a table sorted by talent_id, in lookup-sized row groups (with statistics)."""
+    df = df.sort_values('talent_id', kind='stable')
+    write_output(df, path, row_group_size=TALENT_ROW_GROUP_SIZE, write_statistics=True, compression='zstd')
+
+
+# --- 1. Build Portfolio & Master Talent List (Features 1, 3, 4) ---
+# Raw catalog columns the stages read (the comma-separated strings, as in netflix.csv)
+PORTFOLIO_COLUMNS = ['show_id', 'title', 'release_year', 'country', 'cast', 'director']
+
 
-# --- 2. Build Portfolio & Master Talent List (Features 1, 3, 4) ---
 def explode_talent(df_in, column_name, role):
     """Helper function to explode a talent column (cast or director)"""
     df_role = df_in[['show_id', 'title', 'release_year', 'country', column_name]].copy()
@@ -30,80 +141,982 @@ def explode_talent(df_in, column_name, role):
     
     return df_role[['show_id', 'title', 'release_year', 'country', 'name', 'role']]
 
-print("Step 1/3: Processing portfolios...")
-df_cast = explode_talent(df, 'cast', 'Actor')
-df_director = explode_talent(df, 'director', 'Director')
-df_portfolio = pd.concat([df_cast, df_director]).drop_duplicates()
-
-# Save for Features 1, 3, 4
-df_portfolio.to_parquet('talent_portfolio.parquet', index=False)
-print("  -> talent_portfolio.parquet saved.")
-
-# --- 3. Build Collaboration Edges (Feature 2) ---
-print("Step 2/3: Building collaboration network... (this may take a minute)")
-shows = df_portfolio.groupby('show_id')['name'].apply(list)
-edges = []
-for talent_list in shows:
-    for pair in combinations(sorted(talent_list), 2):
-        edges.append({'source': pair[0], 'target': pair[1]})
-df_edges = pd.DataFrame(edges)
-df_edges_agg = df_edges.groupby(['source', 'target']).size().reset_index(name='weight')
-
-# Save for Feature 2
-df_edges_agg.to_parquet('talent_edges.parquet', index=False)
-print(f"  -> talent_edges.parquet saved with {len(df_edges_agg)} unique relationships.")
-
-# --- 4. Identify Rising Stars (Feature 5) ---
-print("Step 3/3: Identifying rising stars...")
-df_yearly_count = df_portfolio.groupby(['name', 'release_year']).size().reset_index(name='titles_count')
-
-RECENT_YEAR = df['release_year'].max() - 5 
-df_recent = df_yearly_count[df_yearly_count['release_year'] >= RECENT_YEAR]
-
-def get_growth_slope(group):
-    if len(group) < 2: return 0
-    y = group['titles_count'].values
-    x = group['release_year'].values
-    slope, _ = np.polyfit(x, y, 1)
-    return slope
-
-df_growth = df_recent.groupby('name').apply(get_growth_slope).reset_index(name='growth_slope')
-df_total = df_recent.groupby('name')['titles_count'].sum().reset_index(name='total_recent_titles')
-df_rising = pd.merge(df_growth, df_total, on='name')
-df_rising = df_rising[(df_rising['growth_slope'] > 0) & (df_rising['total_recent_titles'] >= 2)]
-df_rising = df_rising.sort_values(by=['growth_slope', 'total_recent_titles'], ascending=False)
-
-# Save for Feature 5
-df_rising.head(100).to_parquet('rising_stars.parquet', index=False)
-print("  -> rising_stars.parquet saved.")
-print("--- Preparation Complete! ---")
+
+def portfolio_rows(df):
+    """Portfolio rows (cast, then directors) for some catalog rows."""
+    df_cast = explode_talent(df, 'cast', 'Actor')
+    df_director = explode_talent(df, 'director', 'Director')
+    return pd.concat([df_cast, df_director]).drop_duplicates()
+
+
+def talent_profile(df_portfolio):
+    """Primary role and top production country per talent (by distinct titles)."""
+    def top_value(column_name):
+        counts = df_portfolio.groupby(['name', column_name])['show_id'].nunique().reset_index(name='titles')
+        counts = counts.sort_values(['titles', column_name], ascending=[False, True], kind='stable')
+        return counts.drop_duplicates('name').set_index('name')[column_name]
+
+    return pd.DataFrame({'primary_role': top_value('role'), 'top_country': top_value('country')})
+
+
+def talent_dictionary(df_portfolio):
+    """talent_id (position in the sorted names), name and primary role of every person."""
+    names = np.sort(df_portfolio['name'].unique())
+    return pd.DataFrame({
+        'talent_id': np.arange(len(names), dtype=np.int32),
+        'name': names,
+        'primary_role': talent_profile(df_portfolio)['primary_role'].reindex(names).to_numpy(),
+    })
+
+
+def encode_talent(df, df_dictionary, columns):
+    """Replace name columns with int32 talent_id codes from the dictionary."""
+    index = pd.Index(df_dictionary['name'])
+    return df.assign(**{
+        column_name: index.get_indexer(df[column_name]).astype(np.int32) for column_name in columns
+    })
+
+
+def decode_talent(df, df_dictionary, columns):
+    """Replace talent_id code columns with names."""
+    names = df_dictionary['name'].to_numpy()
+    return df.assign(**{column_name: names[df[column_name].to_numpy()] for column_name in columns})
+
+
+def write_portfolio(df_portfolio):
+    """Save the (named) portfolio as talent_id codes plus the talent dictionary."""
+    df_dictionary = talent_dictionary(df_portfolio)
+    df_encoded = encode_talent(df_portfolio, df_dictionary, ['name']).rename(columns={'name': 'talent_id'})
+    write_talent_sorted(df_encoded, 'talent_portfolio.parquet')
+    write_output(df_dictionary, 'talent_dictionary.parquet')
+    return df_dictionary
+
+
+def read_portfolio(columns=None):
+    """The portfolio with names decoded (and the dictionary)."""
+    df_dictionary = pd.read_parquet('talent_dictionary.parquet')
+    df_portfolio = pd.read_parquet('talent_portfolio.parquet', columns=columns)
+    df_portfolio = decode_talent(df_portfolio, df_dictionary, ['talent_id']).rename(columns={'talent_id': 'name'})
+    return df_portfolio, df_dictionary
+
+
+@stage('portfolio', outputs=['talent_portfolio.parquet', 'talent_dictionary.parquet'], inputs=[CATALOG_INPUT])
+def build_portfolio():
+    df_portfolio = portfolio_rows(catalog.load_catalog(PORTFOLIO_COLUMNS))
+
+    # Save for Features 1, 3, 4
+    df_dictionary = write_portfolio(df_portfolio)
+    return [f"{len(df_portfolio):,} portfolio rows, {len(df_dictionary):,} talents"]
+
+
+def _offsets(talent_ids, n_talents):
+    """Start of each talent_id's run in a talent_id-sorted column, plus the end."""
+    return np.searchsorted(talent_ids, np.arange(n_talents + 1)).astype(np.int64)
+
+
+def write_talent_index(df_portfolio, n_talents):
+    """Save the distinct titles per talent and the offset/stats arrays over them.
+
+    `df_portfolio` is the encoded portfolio, sorted by talent_id.
+    """
+    df_titles = df_portfolio[TITLE_COLUMNS].drop_duplicates()
+    write_output(df_titles, TITLES_PATH, compression='zstd')
+
+    by_talent = df_portfolio.groupby('talent_id')
+    years = by_talent['release_year'].agg(['min', 'max']).reindex(range(n_talents), fill_value=0)
+    role_codes, roles = pd.factorize(df_portfolio['role'], sort=True)
+    role_flags = np.zeros(n_talents, dtype=np.uint8)
+    np.bitwise_or.at(role_flags, df_portfolio['talent_id'].to_numpy(), np.left_shift(1, role_codes).astype(np.uint8))
+
+    # Same counts as the hub's pie always showed: portfolio rows per country
+    country_rows = df_portfolio.groupby(['talent_id', 'country']).size()
+    country_codes, countries = pd.factorize(country_rows.index.get_level_values('country'), sort=True)
+
+    arrays = {
+        'title_count': by_talent['show_id'].nunique().reindex(range(n_talents), fill_value=0).to_numpy(np.int32),
+        'first_year': years['min'].to_numpy(np.int16),
+        'last_year': years['max'].to_numpy(np.int16),
+        'role_flags': role_flags,
+        'roles': np.asarray(roles, dtype=str),
+        'country_offsets': _offsets(country_rows.index.get_level_values('talent_id').to_numpy(), n_talents),
+        'country_ids': country_codes.astype(np.int16),
+        'country_rows': country_rows.to_numpy(np.int32),
+        'countries': np.asarray(countries, dtype=str),
+        'title_offsets': _offsets(df_titles['talent_id'].to_numpy(), n_talents),
+    }
+    os.makedirs(os.path.dirname(index_path('title_offsets')), exist_ok=True)
+    # title_offsets last: readers reload the index when its mtime changes
+    for name in sorted(INDEX_ARRAYS, key=lambda name: name == 'title_offsets'):
+        save_array(index_path(name), arrays[name])
+    return [f"{len(df_titles):,} talent titles indexed for {n_talents:,} talents"]
+
+
+@stage('talent_index', outputs=[TITLES_PATH] + [index_path(name) for name in INDEX_ARRAYS],
+       inputs=['talent_portfolio.parquet', 'talent_dictionary.parquet'], code=['talent_lookup.py'])
+def build_talent_index():
+    n_talents = len(pd.read_parquet('talent_dictionary.parquet', columns=['talent_id']))
+    return write_talent_index(pd.read_parquet('talent_portfolio.parquet'), n_talents)
+
+
+def write_search_index(df_dictionary):
+    """Save the name search arrays (search_token_offsets last, as readers key on it)."""
+    arrays = build_search_index(df_dictionary['name'])
+    os.makedirs(os.path.dirname(index_path('search_tokens')), exist_ok=True)
+    for name in SEARCH_ARRAYS:
+        save_array(index_path(name), arrays[name])
+    return [f"{len(arrays['search_tokens']):,} name tokens indexed"]
+
+
+@stage('talent_search', outputs=[index_path(name) for name in SEARCH_ARRAYS], inputs=['talent_dictionary.parquet'],
+       code=['talent_search.py', 'talent_lookup.py'])
+def build_talent_search():
+    return write_search_index(pd.read_parquet('talent_dictionary.parquet', columns=['name']))
+
+
+# --- 2. Build Collaboration Edges (Feature 2) ---
+def count_pairs(groups, members, max_pairs=5_000_000):
+    """Count how often each pair of members appears together in a group.
+
+    `groups` and `members` are equal-length integer codes, one row per
+    membership. Pairs are generated per group from sorted members (like
+    itertools.combinations on a sorted list), so left <= right. Work is done
+    in chunks of at most `max_pairs` pairs, with the running totals kept as
+    packed int64 keys (left * n_members + right), to bound peak memory.
+
+    Returns (left, right, weight) arrays sorted by (left, right).
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    members = np.asarray(members, dtype=np.int64)
+    n_members = int(members.max()) + 1 if len(members) else 1
+
+    # Sort by group, then member, and find where each group starts
+    order = np.lexsort((members, groups))
+    groups, members = groups[order], members[order]
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]]) if len(groups) else np.array([], dtype=np.int64)
+    sizes = np.diff(np.r_[starts, len(groups)])
+
+    keys = np.array([], dtype=np.int64)
+    weights = np.array([], dtype=np.int64)
+    pending_keys, pending_counts, pending = [], [], 0
+
+    def merge():
+        all_keys = np.concatenate([keys] + pending_keys)
+        all_counts = np.concatenate([weights] + pending_counts)
+        merged_keys, inverse = np.unique(all_keys, return_inverse=True)
+        return merged_keys, np.bincount(inverse, weights=all_counts).astype(np.int64)
+
+    # Every group of the same size shares one set of (i, j) position pairs
+    for size in np.unique(sizes[sizes >= 2]):
+        left_pos, right_pos = np.triu_indices(size, k=1)
+        size_starts = starts[sizes == size]
+        pair_step = min(len(left_pos), max_pairs)
+        group_step = max(1, max_pairs // len(left_pos))
+
+        for g in range(0, len(size_starts), group_step):
+            base = size_starts[g:g + group_step, None]
+            for p in range(0, len(left_pos), pair_step):
+                left = members[base + left_pos[p:p + pair_step]]
+                right = members[base + right_pos[p:p + pair_step]]
+                chunk_keys, chunk_counts = np.unique((left * n_members + right).ravel(), return_counts=True)
+                pending_keys.append(chunk_keys)
+                pending_counts.append(chunk_counts)
+                pending += len(chunk_keys)
+                if pending >= max_pairs:
+                    keys, weights = merge()
+                    pending_keys, pending_counts, pending = [], [], 0
+
+    if pending_keys:
+        keys, weights = merge()
+    return keys // n_members, keys % n_members, weights
+
+
+def dedupe_memberships(df_members, group_column, member_column, exclude=MISSING_MARKERS):
+    """One row per (group, member): a person counts once per title, however
+    many countries (or roles) the title was exploded into. Members in
+    `exclude` (placeholders such as "No Data") are dropped."""
+    df_members = df_members[[group_column, member_column]]
+    df_members = df_members[~df_members[member_column].isin(exclude)]
+    return df_members.drop_duplicates()
+
+
+def build_edge_table(df_members, group_column, member_column, exclude=MISSING_MARKERS):
+    """Weighted (source, target) table of members that share a group.
+
+    `weight` is the number of distinct groups (titles) the two share.
+    """
+    df_members = dedupe_memberships(df_members, group_column, member_column, exclude)
+    member_codes, member_names = pd.factorize(df_members[member_column], sort=True)
+    group_codes, _ = pd.factorize(df_members[group_column])
+    left, right, weight = count_pairs(group_codes, member_codes)
+    return pd.DataFrame({
+        'source': np.asarray(member_names)[left],
+        'target': np.asarray(member_names)[right],
+        'weight': weight,
+    })
+
+
+def edge_validation_report(df_members, group_column, member_column, df_edges, exclude=MISSING_MARKERS):
+    """Compare the raw (exploded) membership rows with the deduplicated set the edges use."""
+    raw_sizes = df_members.groupby(group_column).size()
+    df_unique = dedupe_memberships(df_members, group_column, member_column, exclude)
+    unique_sizes = df_unique.groupby(group_column).size()
+    repeats = df_members.groupby([group_column, member_column]).size()
+
+    def pair_total(sizes):
+        return int((sizes * (sizes - 1) // 2).sum())
+
+    return {
+        'membership_rows': len(df_members),
+        'unique_memberships': len(df_unique),
+        'raw_pairs': pair_total(raw_sizes),
+        'unique_pairs': pair_total(unique_sizes),
+        'self_pairs_dropped': pair_total(repeats),
+        'edges': len(df_edges),
+        'total_weight': int(df_edges['weight'].sum()),
+        'self_edges': int((df_edges['source'] == df_edges['target']).sum()),
+    }
+
+
+def marker_ids(df_dictionary):
+    """talent_ids of the "No Data"-style placeholder names."""
+    return df_dictionary.loc[df_dictionary['name'].isin(MISSING_MARKERS), 'talent_id'].to_numpy()
+
+
+def encode_edges(df_edges):
+    return df_edges.astype({'source': np.int32, 'target': np.int32})
+
+
+def write_talent_edges(df_edges, n_talents):
+    """Save the edges, plus the CSR arrays (strongest collaborators first) for per-talent queries."""
+    write_output(df_edges, 'talent_edges.parquet')
+    arrays = build_csr(df_edges['source'].to_numpy(), df_edges['target'].to_numpy(),
+                       df_edges['weight'].to_numpy(), n_talents)
+    os.makedirs(os.path.dirname(graph_path('offsets')), exist_ok=True)
+    for name in GRAPH_ARRAYS:
+        save_array(graph_path(name), arrays[name])
+
+
+@stage('edges', outputs=['talent_edges.parquet'] + [graph_path(name) for name in GRAPH_ARRAYS],
+       inputs=['talent_portfolio.parquet', 'talent_dictionary.parquet'], code=['talent_graph.py'])
+def build_talent_edges():
+    df_portfolio = pd.read_parquet('talent_portfolio.parquet', columns=['show_id', 'talent_id'])
+    df_dictionary = pd.read_parquet('talent_dictionary.parquet')
+    exclude = marker_ids(df_dictionary)
+    # IDs follow name order, so pairs come out ordered and sorted as with names
+    df_edges = encode_edges(build_edge_table(df_portfolio, 'show_id', 'talent_id', exclude))
+
+    # Save for Feature 2
+    write_talent_edges(df_edges, len(df_dictionary))
+
+    report = edge_validation_report(df_portfolio, 'show_id', 'talent_id', df_edges, exclude)
+    return [
+        "edge validation (raw exploded rows -> deduplicated (show_id, talent) set):",
+        f"  memberships: {report['membership_rows']:,} -> {report['unique_memberships']:,}",
+        f"  pairs generated: {report['raw_pairs']:,} -> {report['unique_pairs']:,} "
+        f"({report['self_pairs_dropped']:,} self-pairs dropped)",
+        f"  edges: {report['edges']:,}, total weight (shared titles): {report['total_weight']:,}, "
+        f"self-edges: {report['self_edges']}",
+    ]
+
+
+# --- 3. Identify Rising Stars (Feature 5) ---
+# Growth is fitted over the last rising_window_years years before the latest
+# release year (--rising-window)
+RISING_WINDOW_YEARS = 5
+SETTINGS['rising_window_years'] = RISING_WINDOW_YEARS
+
+
+def score_talent_growth(df_yearly_count, latest_year, window_years=RISING_WINDOW_YEARS):
+    """Least-squares trend of titles per year for every talent, in one vectorized pass.
+
+    Equivalent to np.polyfit(year, titles_count, 1) per person over the window
+    (years with no titles are not points, as before), computed from grouped
+    sums of x, y, xy, x^2 and y^2. People with fewer than two points in the
+    window get a slope (and R^2) of 0.
+    """
+    window_start = latest_year - window_years
+    df_recent = df_yearly_count[df_yearly_count['release_year'] >= window_start]
+
+    # Measure x from the window start so the sums stay small and precise
+    x = (df_recent['release_year'] - window_start).astype(float)
+    y = df_recent['titles_count'].astype(float)
+    sums = pd.DataFrame({
+        'name': df_recent['name'], 'n': 1.0,
+        'sx': x, 'sy': y, 'sxx': x * x, 'sxy': x * y, 'syy': y * y,
+    }).groupby('name').sum()
+    sums = sums.reindex(df_yearly_count['name'].unique(), fill_value=0.0)
+
+    n = sums['n'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sxx = sums['sxx'].to_numpy() - sums['sx'].to_numpy() ** 2 / n
+        sxy = sums['sxy'].to_numpy() - sums['sx'].to_numpy() * sums['sy'].to_numpy() / n
+        syy = sums['syy'].to_numpy() - sums['sy'].to_numpy() ** 2 / n
+        slope = np.where((n >= 2) & (sxx > 0), sxy / sxx, 0.0)
+        mean_x = sums['sx'].to_numpy() / n + window_start
+        intercept = np.where(n >= 1, sums['sy'].to_numpy() / n - slope * mean_x, np.nan)
+        r_squared = np.where((n >= 2) & (syy > 0), slope * sxy / syy, 0.0)
+
+    return pd.DataFrame({
+        'name': sums.index,
+        'growth_slope': slope,
+        'intercept': intercept,
+        'r_squared': np.clip(r_squared, 0.0, 1.0),
+        'recent_years': n.astype(int),
+        'total_recent_titles': sums['sy'].to_numpy().astype(int),
+    })
+
+
+def yearly_title_counts(df_portfolio):
+    """Distinct titles per person per release year (not exploded country rows)."""
+    df_talent_titles = df_portfolio[['show_id', 'name', 'release_year']].drop_duplicates()
+    df_talent_titles = df_talent_titles[~df_talent_titles['name'].isin(MISSING_MARKERS)]
+    return df_talent_titles.groupby(['name', 'release_year']).size().reset_index(name='titles_count')
+
+
+def write_rising_stars(df_portfolio, df_dictionary, df_yearly_count, latest_year):
+    """Score every talent and save rising_stars.parquet."""
+    df_scores = score_talent_growth(df_yearly_count, latest_year, SETTINGS['rising_window_years'])
+    df_scores.insert(0, 'talent_id', encode_talent(df_scores, df_dictionary, ['name'])['name'])
+    # A title has one release year, so the yearly counts add up to distinct titles
+    df_scores['total_titles'] = df_scores['name'].map(df_yearly_count.groupby('name')['titles_count'].sum())
+    df_scores = df_scores.join(talent_profile(df_portfolio), on='name')
+    df_scores = df_scores.sort_values(by=['growth_slope', 'total_recent_titles'], ascending=False)
+
+    # Save for Feature 5: every talent is scored; the hub picks the rising ones
+    write_output(df_scores, 'rising_stars.parquet')
+    n_rising = int(((df_scores['growth_slope'] > 0) & (df_scores['total_recent_titles'] >= 2)).sum())
+    return [f"{len(df_scores):,} talents scored ({n_rising:,} rising)"]
+
+
+@stage('rising_stars', outputs=['rising_stars.parquet', YEARLY_COUNTS_PATH],
+       inputs=[CATALOG_INPUT, 'talent_portfolio.parquet', 'talent_dictionary.parquet'],
+       settings=['rising_window_years'])
+def build_rising_stars():
+    df_portfolio, df_dictionary = read_portfolio()
+    latest_year = catalog.load_catalog(['release_year'])['release_year'].max()
+
+    df_yearly_count = yearly_title_counts(df_portfolio)
+    # Kept (by name, which survives renumbering) so --incremental can adjust
+    # the counts instead of recounting
+    write_output(df_yearly_count, YEARLY_COUNTS_PATH)
+    return write_rising_stars(df_portfolio, df_dictionary, df_yearly_count, latest_year)
+
+
+# --- 4. Network Centrality & Communities (Talent Hub) ---
+# Computed on the CSR arrays written by the edges stage, with numpy only:
+# every pass over the network is one gather/bincount over all edges.
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-12
+PAGERANK_MAX_ITER = 100
+# Betweenness is estimated from shortest paths out of this many random sources
+BETWEENNESS_SAMPLES = 256
+COMMUNITY_MAX_ITER = 30
+
+
+def _edge_rows(offsets):
+    """Source talent_id of every CSR entry."""
+    return np.repeat(np.arange(len(offsets) - 1, dtype=np.int32), np.diff(offsets))
+
+
+def pagerank(offsets, neighbors, weights, damping=PAGERANK_DAMPING,
+             tolerance=PAGERANK_TOLERANCE, max_iter=PAGERANK_MAX_ITER):
+    """Weighted PageRank by power iteration (people without edges share the dangling mass)."""
+    n = len(offsets) - 1
+    rows = _edge_rows(offsets)
+    strength = np.bincount(rows, weights=weights, minlength=n)
+    dangling = strength == 0
+    share = np.divide(weights, strength[rows], where=strength[rows] > 0, out=np.zeros(len(weights)))
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        spread = np.bincount(neighbors, weights=rank[rows] * share, minlength=n)
+        new_rank = damping * (spread + rank[dangling].sum() / n) + (1 - damping) / n
+        done = np.abs(new_rank - rank).sum() < n * tolerance
+        rank = new_rank
+        if done:
+            break
+    return rank
+
+
+def _bfs_levels(offsets, neighbors, source):
+    """Shortest-path DAG from one source, level by level.
+
+    Returns (sigma, levels): the number of shortest paths to every node, and
+    for each level the (parent, child) edges of the DAG entering it.
+    """
+    n = len(offsets) - 1
+    depth = np.full(n, -1, dtype=np.int32)
+    sigma = np.zeros(n)
+    depth[source], sigma[source] = 0, 1.0
+    frontier = np.array([source])
+    levels = []
+    while len(frontier):
+        starts = offsets[frontier]
+        lengths = offsets[frontier + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        parents, children = np.repeat(frontier, lengths), neighbors[positions]
+        unseen = depth[children] == -1
+        depth[np.unique(children[unseen])] = len(levels) + 1
+        on_dag = depth[children] == len(levels) + 1
+        parents, children = parents[on_dag], children[on_dag]
+        if not len(children):
+            break
+        sigma += np.bincount(children, weights=sigma[parents], minlength=n)
+        levels.append((parents, children))
+        frontier = np.unique(children)
+    return sigma, levels
+
+
+def sampled_betweenness(offsets, neighbors, samples=BETWEENNESS_SAMPLES, seed=0):
+    """Betweenness centrality estimated from `samples` random sources (Brandes' algorithm).
+
+    Unweighted shortest paths, normalized as networkx's
+    betweenness_centrality(normalized=True, k=samples) is.
+    """
+    n = len(offsets) - 1
+    rng = np.random.default_rng(seed)
+    sources = rng.choice(n, size=min(samples, n), replace=False)
+    betweenness = np.zeros(n)
+    for source in sources:
+        sigma, levels = _bfs_levels(offsets, neighbors, source)
+        delta = np.zeros(n)
+        for parents, children in reversed(levels):
+            delta += np.bincount(parents, weights=sigma[parents] / sigma[children] * (1 + delta[children]),
+                                 minlength=n)
+        delta[source] = 0
+        betweenness += delta
+    if n <= 2:
+        return betweenness
+    return betweenness * (n / len(sources)) / ((n - 1) * (n - 2))
+
+
+def label_communities(offsets, neighbors, weights, max_iter=COMMUNITY_MAX_ITER, seed=0):
+    """Community labels by weighted label propagation.
+
+    Each round, a random half of the people adopt the label with the most
+    shared titles among their collaborators (keeping their own on a tie);
+    updating half at a time stops labels flip-flopping between neighbors.
+    Labels are renumbered 0, 1, ... from the largest community down.
+    """
+    n = len(offsets) - 1
+    rows = _edge_rows(offsets)
+    labels = np.arange(n, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    for _ in range(max_iter):
+        # Total weight per (person, neighbor label), strongest label first per person
+        keys, totals = np.unique(rows.astype(np.int64) * n + labels[neighbors], return_inverse=True)
+        totals = np.bincount(totals, weights=weights)
+        people, candidate = keys // n, keys % n
+        # Own label wins ties: rank it just above an equal total
+        order = np.lexsort((candidate != labels[people], -totals, people))
+        first = order[np.r_[True, people[order][1:] != people[order][:-1]]]
+        best = labels.copy()
+        best[people[first]] = candidate[first]
+
+        update = rng.random(n) < 0.5
+        changed = update & (best != labels)
+        labels[changed] = best[changed]
+        if changed.sum() <= n * 1e-4:
+            break
+
+    _, community, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.lexsort((np.arange(len(sizes)), -sizes))] = np.arange(len(sizes))
+    return rank[community].astype(np.int32), sizes[community].astype(np.int32)
+
+
+def write_centrality(df_dictionary):
+    """Score every talent's place in the network and save talent_centrality.parquet."""
+    offsets, neighbors, weights = (np.load(graph_path(name)) for name in ['offsets', 'neighbors', 'weights'])
+    community, community_size = label_communities(offsets, neighbors, weights)
+    df_centrality = pd.DataFrame({
+        'talent_id': df_dictionary['talent_id'].to_numpy(),
+        'name': df_dictionary['name'].to_numpy(),
+        'primary_role': df_dictionary['primary_role'].to_numpy(),
+        'collaborators': np.diff(offsets).astype(np.int32),
+        'weighted_degree': np.bincount(_edge_rows(offsets), weights=weights, minlength=len(offsets) - 1).astype(np.int32),
+        'pagerank': pagerank(offsets, neighbors, weights),
+        'betweenness': sampled_betweenness(offsets, neighbors),
+        'community': community,
+        'community_size': community_size,
+    })
+    # In talent_id order, so a person's row is at position talent_id
+    write_output(df_centrality, 'talent_centrality.parquet')
+    n_communities = df_centrality.loc[df_centrality['community_size'] > 1, 'community'].nunique()
+    return [f"{len(df_centrality):,} talents scored, {n_communities:,} communities of 2+ people"]
+
+
+@stage('centrality', outputs=['talent_centrality.parquet'],
+       inputs=['talent_dictionary.parquet'] + [graph_path(name) for name in GRAPH_ARRAYS], code=['talent_graph.py'])
+def build_centrality():
+    return write_centrality(pd.read_parquet('talent_dictionary.parquet'))
+
+
+def talent_features(df_portfolio, df_genre, offsets, neighbors):
+    """(offsets, codes) CSR of every talent's feature set, codes sorted per talent.
+
+    Features are the talent's collaborators (codes 0..n-1, their talent_ids),
+    the genres of their titles, then their production countries.
+    """
+    n_talents = len(offsets) - 1
+    df_titles = df_portfolio[['talent_id', 'show_id']].drop_duplicates()
+    genre_codes, genres = pd.factorize(df_genre['genre'], sort=True)
+    df_genre_features = df_titles.merge(df_genre.assign(code=genre_codes + n_talents)[['show_id', 'code']], on='show_id')
+    country_codes, _ = pd.factorize(df_portfolio['country'], sort=True)
+
+    df_features = pd.concat([
+        pd.DataFrame({'talent_id': _edge_rows(offsets), 'code': np.asarray(neighbors, dtype=np.int64)}),
+        df_genre_features[['talent_id', 'code']],
+        pd.DataFrame({'talent_id': df_portfolio['talent_id'].to_numpy(),
+                      'code': country_codes + n_talents + len(genres)}),
+    ], ignore_index=True).drop_duplicates()
+    df_features = df_features.sort_values(['talent_id', 'code'])
+    feature_offsets = np.searchsorted(df_features['talent_id'].to_numpy(), np.arange(n_talents + 1))
+    return feature_offsets, df_features['code'].to_numpy()
+
+
+def write_similarity_index(df_genre):
+    """Build and save the MinHash/LSH arrays from the portfolio, genres and graph."""
+    df_portfolio = pd.read_parquet('talent_portfolio.parquet', columns=['talent_id', 'show_id', 'country'])
+    offsets, neighbors = np.load(graph_path('offsets')), np.load(graph_path('neighbors'))
+    feature_offsets, features = talent_features(df_portfolio, df_genre, offsets, neighbors)
+    arrays = build_similarity_index(feature_offsets, features)
+    os.makedirs(os.path.dirname(index_path('similarity_features')), exist_ok=True)
+    for name in SIMILARITY_ARRAYS:
+        save_array(index_path(name), arrays[name])
+    return [f"{len(features):,} talent features hashed"]
+
+
+@stage('similarity', outputs=[index_path(name) for name in SIMILARITY_ARRAYS],
+       inputs=[CATALOG_INPUT, 'talent_portfolio.parquet'] + [graph_path(name) for name in GRAPH_ARRAYS],
+       code=['talent_similarity.py', 'talent_graph.py', 'talent_lookup.py'])
+def build_similar_talent():
+    return write_similarity_index(explode_genres(catalog.load_catalog(['show_id', 'listed_in'])))
+
+
 # --- 5. Build Genre Co-occurrence (for Tab 5) ---
-print("Step 4/4: Building genre co-occurrence matrix...")
+def explode_genres(df):
+    """(show_id, genre) rows from the comma-separated 'listed_in' column."""
+    df_genre = df[['show_id', 'listed_in']].dropna(subset=['listed_in'])
+    df_genre = df_genre.assign(genre=df_genre['listed_in'].str.split(', ')).explode('genre')
+    df_genre['genre'] = df_genre['genre'].str.strip()
+    return df_genre[['show_id', 'genre']]
+
+
+@stage('genre_edges', outputs=['genre_edges.parquet'], inputs=[CATALOG_INPUT])
+def build_genre_edges():
+    df_genre = explode_genres(catalog.load_catalog(['show_id', 'listed_in']))
+
+    # Count every pair of genres listed on the same show
+    df_genre_edges = build_edge_table(df_genre, 'show_id', 'genre')
+    write_output(df_genre_edges, 'genre_edges.parquet')
+    return [f"{len(df_genre_edges):,} genre pairs"]
+
+
+# --- 6. Title Similarity (Content Explorer) ---
+def write_title_neighbors(df_catalog):
+    """Find and save every title's most similar titles (see title_similarity.py)."""
+    df_neighbors = title_neighbors(df_catalog)
+    write_output(df_neighbors, NEIGHBORS_PATH)
+    return [f"{len(df_neighbors):,} similar-title pairs for {df_neighbors['show_id'].nunique():,} titles"]
+
+
+@stage('title_similar', outputs=[NEIGHBORS_PATH], inputs=[CATALOG_INPUT],
+       code=['title_similarity.py', 'talent_search.py'])
+def build_title_similar():
+    return write_title_neighbors(catalog.load_catalog(FEATURE_COLUMNS))
+
+
+# --- 7. Per-show Manifest (for --incremental) ---
+# Catalog columns the outputs are built from; a show whose hash of these
+# changes is re-applied by --incremental.
+SHOW_HASH_COLUMNS = ['title', 'release_year', 'country', 'cast', 'director', 'listed_in', 'description']
+
+
+def show_manifest(df):
+    """show_id, a hash of the show's source columns, and its genres.
+
+    The genres are kept so an incremental run can subtract a changed or
+    removed show's old genre pairs (the portfolio already holds its old talent).
+    """
+    return pd.DataFrame({
+        'show_id': df['show_id'].to_numpy(),
+        'row_hash': pd.util.hash_pandas_object(df[SHOW_HASH_COLUMNS], index=False).to_numpy(),
+        'listed_in': df['listed_in'].to_numpy(),
+    })
+
+
+@stage('show_manifest', outputs=[SHOW_MANIFEST_PATH], inputs=[CATALOG_INPUT])
+def build_show_manifest():
+    df_manifest = show_manifest(catalog.load_catalog(['show_id'] + SHOW_HASH_COLUMNS))
+    write_output(df_manifest, SHOW_MANIFEST_PATH)
+    return [f"{len(df_manifest):,} shows hashed"]
+
+
+# --- 8. Stage Cache ---
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest():
+    try:
+        with open(PREP_MANIFEST_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'stages': {}}
+
+
+def write_manifest(manifest):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{PREP_MANIFEST_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, PREP_MANIFEST_PATH)
+
+
+def catalog_token():
+    return f"{catalog.catalog_version()}/v{catalog.SNAPSHOT_VERSION}"
+
+
+def code_version(name):
+    """Hash of this script and the modules a stage is built with."""
+    digest = hashlib.sha256()
+    for path in [os.path.abspath(__file__)] + STAGES[name]['code']:
+        digest.update(_file_sha256(path).encode())
+    return digest.hexdigest()
+
+
+def stage_key(name):
+    """Hash of everything a stage's outputs depend on: its inputs, code and settings."""
+    inputs = {}
+    for path in STAGES[name]['inputs']:
+        inputs[path] = catalog_token() if path == CATALOG_INPUT else _file_sha256(path)
+    settings = {setting: SETTINGS[setting] for setting in STAGES[name]['settings']}
+    payload = json.dumps({'stage': name, 'code': code_version(name), 'inputs': inputs, 'settings': settings},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _output_stamp(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def stage_is_current(manifest, name, key):
+    """True if the stage last ran with the same key and its outputs are untouched."""
+    entry = manifest['stages'].get(name)
+    if entry is None or entry['key'] != key:
+        return False
+    for path in STAGES[name]['outputs']:
+        if not os.path.exists(path) or _output_stamp(path) != entry['outputs'].get(path):
+            return False
+    return True
+
+
+def record_stage(manifest, name, key, seconds=None, peak_rss_mb=None):
+    """Remember that the stage's current outputs were built from this catalog and code."""
+    manifest['stages'][name] = {
+        'key': key,
+        'outputs': {path: _output_stamp(path) for path in STAGES[name]['outputs']},
+        'catalog': catalog_token(),
+        'code': code_version(name),
+        'seconds': seconds,
+        'peak_rss_mb': peak_rss_mb,
+        'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+# --- 9. Running Stages ---
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return round(peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+def run_stage(name, settings):
+    """Run one stage (in a pool worker) and report its timing and peak memory."""
+    # The worker is a fresh process, so the command line's settings are passed in
+    SETTINGS.update(settings)
+    start = time.perf_counter()
+    lines = STAGES[name]['run']()
+    return {
+        'seconds': round(time.perf_counter() - start, 3),
+        'peak_rss_mb': peak_rss_mb(),
+        'lines': lines or [],
+    }
+
+
+def upstream_stages(name):
+    """Stages that write one of this stage's inputs."""
+    return [other for other, spec in STAGES.items()
+            if set(spec['outputs']) & set(STAGES[name]['inputs'])]
+
+
+def resolve_stages(selected):
+    """The selected stages plus everything upstream of them, in pipeline order."""
+    needed = set()
+    todo = list(selected)
+    while todo:
+        name = todo.pop()
+        if name not in needed:
+            needed.add(name)
+            todo.extend(upstream_stages(name))
+    return [name for name in STAGES if name in needed]
+
+
+def run_pipeline(selected=None, force=False, jobs=None):
+    """Run the selected stages (default: all), skipping ones whose inputs are unchanged.
+
+    Returns {stage name: result}, where each result has a 'status' of
+    'ran', 'cached', 'failed' or 'skipped' (an upstream stage failed).
+    """
+    selected = selected or list(STAGES)
+    plan = resolve_stages(selected)
+    jobs = jobs or min(4, os.cpu_count() or 1)
+
+    # Build the snapshot once, here, rather than in every worker
+    catalog.ensure_snapshot()
+    manifest = read_manifest()
+    results = {}
+    pending = list(plan)
+    running = {}
+
+    # A fresh process per stage keeps each stage's peak-memory figure its own.
+    # max_tasks_per_child needs Python 3.11; older interpreters reuse workers,
+    # so a stage's peak there can include an earlier stage run by the same worker.
+    context = multiprocessing.get_context('spawn')
+    pool_options = {'max_tasks_per_child': 1} if sys.version_info >= (3, 11) else {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, mp_context=context, **pool_options) as pool:
+        while pending or running:
+            # Start (or skip) every stage whose upstream stages have finished
+            for name in list(pending):
+                upstream = upstream_stages(name)
+                if any(other in pending or other in running.values() for other in upstream):
+                    continue
+                pending.remove(name)
+
+                if any(results[other]['status'] in ('failed', 'skipped') for other in upstream):
+                    results[name] = {'status': 'skipped'}
+                    continue
+                key = stage_key(name)
+                # --force reruns the selected stages; upstream ones still only run if stale
+                if not (force and name in selected) and stage_is_current(manifest, name, key):
+                    entry = manifest['stages'][name]
+                    results[name] = {'status': 'cached', 'seconds': entry.get('seconds'),
+                                     'peak_rss_mb': entry.get('peak_rss_mb')}
+                    # Same inputs, so the outputs are also valid for the current catalog
+                    entry['catalog'] = catalog_token()
+                    print(f"[{name}] up to date, skipped")
+                    continue
+                print(f"[{name}] running...")
+                running[pool.submit(run_stage, name, SETTINGS)] = name
+                results[name] = {'key': key}
+
+            if not running:
+                continue
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    results[name] = {'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+                    print(f"[{name}] FAILED: {results[name]['error']}")
+                    continue
+
+                for line in outcome['lines']:
+                    print(f"[{name}] {line}")
+                record_stage(manifest, name, results[name]['key'], outcome['seconds'], outcome['peak_rss_mb'])
+                write_manifest(manifest)
+                results[name] = {'status': 'ran', 'seconds': outcome['seconds'],
+                                 'peak_rss_mb': outcome['peak_rss_mb']}
+    write_manifest(manifest)
+    return results
+
+
+# --- 10. Incremental Updates ---
+def incremental_base(manifest):
+    """Catalog version every stage's outputs were last built from, or None.
+
+    An incremental update needs all outputs (and the per-show manifest) to
+    come from one catalog version, built by the current code, and
+    to be untouched since.
+    """
+    entries = [manifest['stages'].get(name) for name in STAGES]
+    if any(entry is None or entry.get('code') != code_version(name) for name, entry in zip(STAGES, entries)):
+        return None
+    if len({entry.get('catalog') for entry in entries}) != 1:
+        return None
+    if not all(stage_is_current(manifest, name, entry['key']) for name, entry in zip(STAGES, entries)):
+        return None
+    return entries[0]['catalog']
+
+
+def apply_count_delta(df_counts, df_removed, df_added, keys, value):
+    """Subtract one count table from another and add a third; drop counts that reach 0."""
+    df_all = pd.concat([
+        df_counts,
+        df_removed.assign(**{value: -df_removed[value]}),
+        df_added,
+    ], ignore_index=True)
+    df_all = df_all.groupby(keys, sort=True)[value].sum().reset_index()
+    return df_all[df_all[value] > 0].reset_index(drop=True)
+
+
+def run_incremental():
+    """Apply only the shows that were added, removed or changed since the last run.
+
+    The old rows of changed and removed shows come from the current outputs
+    (the portfolio) and the per-show manifest (genres); their pair and yearly
+    counts are subtracted, and the counts for the new rows added. Rising
+    stars are then rescored from the updated yearly counts. Falls back to a
+    full pipeline run when there is no complete previous run to update.
+    """
+    catalog.ensure_snapshot()
+    manifest = read_manifest()
+    base = incremental_base(manifest)
+    if base is None:
+        print("No complete previous run to update; running the full pipeline.")
+        return run_pipeline()
+    if base == catalog_token():
+        print("Outputs already match the current catalog.")
+        return {name: {'status': 'cached'} for name in STAGES}
+
+    start = time.perf_counter()
+    df_catalog = catalog.load_catalog(['show_id'] + SHOW_HASH_COLUMNS)
+    df_new_manifest = show_manifest(df_catalog)
+    df_old_manifest = pd.read_parquet(SHOW_MANIFEST_PATH)
+
+    # A show is unchanged if the same (show_id, row_hash) is in both manifests
+    unchanged = df_old_manifest.merge(df_new_manifest[['show_id', 'row_hash']], on=['show_id', 'row_hash'])['show_id']
+    removed_ids = df_old_manifest.loc[~df_old_manifest['show_id'].isin(unchanged), 'show_id']
+    added_ids = df_new_manifest.loc[~df_new_manifest['show_id'].isin(unchanged), 'show_id']
+    n_changed = int(removed_ids.isin(added_ids).sum())
+    print(f"Incremental update: {len(added_ids) - n_changed:,} added, {len(removed_ids) - n_changed:,} removed, "
+          f"{n_changed:,} changed shows (of {len(df_new_manifest):,}).")
+
+    if len(removed_ids) or len(added_ids):
+        # Portfolio: drop the old rows of every touched show, append the new ones.
+        # The deltas are worked out on names, as talent IDs are renumbered
+        # when names come and go.
+        df_portfolio, df_old_dictionary = read_portfolio()
+        is_removed = df_portfolio['show_id'].isin(removed_ids)
+        df_old_rows = df_portfolio[is_removed]
+        df_new_rows = portfolio_rows(df_catalog.loc[df_catalog['show_id'].isin(added_ids), PORTFOLIO_COLUMNS])
+        df_portfolio = pd.concat([df_portfolio[~is_removed], df_new_rows], ignore_index=True)
+        df_dictionary = write_portfolio(df_portfolio)
+        write_talent_index(pd.read_parquet('talent_portfolio.parquet'), len(df_dictionary))
+        write_search_index(df_dictionary)
+
+        df_edges = apply_count_delta(
+            decode_talent(pd.read_parquet('talent_edges.parquet'), df_old_dictionary, ['source', 'target']),
+            build_edge_table(df_old_rows, 'show_id', 'name'),
+            build_edge_table(df_new_rows, 'show_id', 'name'),
+            ['source', 'target'], 'weight',
+        )
+        df_edges = encode_edges(encode_talent(df_edges, df_dictionary, ['source', 'target']))
+        write_talent_edges(df_edges, len(df_dictionary))
+        # Network-wide metrics cannot be patched; recompute them on the new graph
+        write_centrality(df_dictionary)
+        write_similarity_index(explode_genres(df_catalog))
+        # Description IDF and neighbors are catalog-wide too
+        write_title_neighbors(catalog.load_catalog(FEATURE_COLUMNS))
+
+        df_genre_edges = apply_count_delta(
+            pd.read_parquet('genre_edges.parquet'),
+            build_edge_table(explode_genres(df_old_manifest[df_old_manifest['show_id'].isin(removed_ids)]), 'show_id', 'genre'),
+            build_edge_table(explode_genres(df_catalog[df_catalog['show_id'].isin(added_ids)]), 'show_id', 'genre'),
+            ['source', 'target'], 'weight',
+        )
+        write_output(df_genre_edges, 'genre_edges.parquet')
+
+        df_yearly_count = apply_count_delta(
+            pd.read_parquet(YEARLY_COUNTS_PATH),
+            yearly_title_counts(df_old_rows),
+            yearly_title_counts(df_new_rows),
+            ['name', 'release_year'], 'titles_count',
+        )
+        write_output(df_yearly_count, YEARLY_COUNTS_PATH)
+        lines = write_rising_stars(df_portfolio, df_dictionary, df_yearly_count, df_catalog['release_year'].max())
+
+        print(f"  -> {len(df_portfolio):,} portfolio rows, {len(df_edges):,} edges, "
+              f"{len(df_genre_edges):,} genre pairs, {lines[0]}")
+
+    write_output(df_new_manifest, SHOW_MANIFEST_PATH)
+    seconds = round(time.perf_counter() - start, 3)
+    for name in STAGES:
+        record_stage(manifest, name, stage_key(name), seconds, peak_rss_mb())
+    write_manifest(manifest)
+    return {name: {'status': 'updated', 'seconds': seconds, 'peak_rss_mb': peak_rss_mb()} for name in STAGES}
+
+
+def print_summary(results):
+    print(f"{'Stage':<14}{'Status':<9}{'Seconds':>9}{'Peak RSS (MB)':>15}  Outputs")
+    for name, result in results.items():
+        seconds = result.get('seconds')
+        peak = result.get('peak_rss_mb')
+        print(f"{name:<14}{result['status']:<9}"
+              f"{'' if seconds is None else f'{seconds:.2f}':>9}"
+              f"{'' if peak is None else f'{peak:.1f}':>15}  "
+              f"{', '.join(STAGES[name]['outputs'])}")
+    print("Cached stages show the timings of the run that built them; peak RSS "
+          "includes the interpreter and libraries of the stage's process.")
+
 
-# Reload the raw dataframe
-df_genre = pd.read_csv("netflix.csv")
-df_genre = df_genre.dropna(subset=['listed_in'])
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the talent and genre datasets.")
+    parser.add_argument('stages', nargs='*', metavar='STAGE',
+                        help=f"stages to run (default: all): {', '.join(STAGES)}")
+    parser.add_argument('--force', action='store_true', help="rerun the selected stages even if unchanged")
+    parser.add_argument('--jobs', type=int, default=None, help="stages to run at once (default: up to 4)")
+    parser.add_argument('--list', action='store_true', help="list the stages and exit")
+    parser.add_argument('--incremental', action='store_true',
+                        help="update every output with only the shows changed since the last run")
+    parser.add_argument('--rising-window', type=int, default=RISING_WINDOW_YEARS, metavar='YEARS',
+                        help=f"years of releases the rising-stars trend is fitted over (default: {RISING_WINDOW_YEARS})")
+    args = parser.parse_args(argv)
+    if args.rising_window < 1:
+        parser.error("--rising-window must be at least 1")
+    SETTINGS['rising_window_years'] = args.rising_window
 
-# Explode the 'listed_in' column
-df_genre = df_genre.assign(genre=df_genre['listed_in'].str.split(', ')).explode('genre')
-df_genre['genre'] = df_genre['genre'].str.strip()
+    if args.list:
+        manifest = read_manifest()
+        for name, spec in STAGES.items():
+            last = manifest['stages'].get(name, {}).get('finished', 'never')
+            print(f"{name:<14}{', '.join(spec['inputs']):<44} -> {', '.join(spec['outputs'])}  (last run: {last})")
+        return 0
 
-# Group by show to get a list of genres for each show
-show_genres = df_genre.groupby('show_id')['genre'].apply(list)
+    unknown = [name for name in args.stages if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    if args.incremental and (args.stages or args.force):
+        parser.error("--incremental updates every stage; it cannot be combined with stage names or --force")
 
-genre_edges = []
-# Iterate over each show's list of genres
-for genre_list in show_genres:
-    # Create all unique pairs (edges) for this show
-    for pair in combinations(sorted(genre_list), 2):
-        genre_edges.append({'source': pair[0], 'target': pair[1]})
+    print("Starting talent data preparation...")
+    start = time.perf_counter()
+    try:
+        if args.incremental:
+            results = run_incremental()
+        else:
+            results = run_pipeline(args.stages, force=args.force, jobs=args.jobs)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
 
-df_genre_edges = pd.DataFrame(genre_edges)
+    print_summary(results)
+    failed = [name for name, result in results.items() if result['status'] in ('failed', 'skipped')]
+    if failed:
+        print(f"--- Preparation failed: {', '.join(failed)} ---")
+        return 1
+    print(f"--- All Data Preparation Complete! ({time.perf_counter() - start:.2f}s) ---")
+    return 0
 
-# Aggregate edges to get a 'weight'
-df_genre_edges_agg = df_genre_edges.groupby(['source', 'target']).size().reset_index(name='weight')
 
-# Save for Feature 2
-df_genre_edges_agg.to_parquet('genre_edges.parquet', index=False)
-print(f"  -> genre_edges.parquet saved with {len(df_genre_edges_agg)} relationships.")
-print("--- All Data Preparation Complete! ---")
\ No newline at end of file
+if __name__ == '__main__':
+    sys.exit(main())
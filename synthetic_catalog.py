@@ -0,0 +1,187 @@
+# Synthetic catalogs for scaling tests.
+#
+# Writes a catalog CSV with the same columns as netflix.csv at N times its
+# size, statistically similar to the real file:
+#
+# - every synthetic title copies a randomly chosen real title's type, rating,
+#   release year, date added and duration, and how many cast members,
+#   directors, countries and genres it lists (so the list-length
+#   distributions, and how they differ between movies and TV shows, match);
+# - cast and director names come from a talent pool N times the size of the
+#   real one in which every person has as many credits as a real person, so
+#   the titles-per-person distribution stays the same as the catalog grows;
+# - countries are drawn with their real frequencies, genres with their real
+#   frequencies for the title's type;
+# - titles and descriptions are drawn from the real vocabulary, with the real
+#   word counts.
+#
+#   python synthetic_catalog.py --scale 1 10 100 [--source netflix.csv] [--out-dir .cache/synthetic]
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from catalog import CATALOG_CSV, LIST_COLUMNS, parse_catalog_csv
+from datastore import CACHE_DIR
+
+SYNTHETIC_DIR = os.path.join(CACHE_DIR, "synthetic")
+
+# Scalar columns copied from the template title
+TEMPLATE_COLUMNS = ['type', 'date_added', 'release_year', 'rating', 'duration']
+
+
+def synthetic_path(scale, seed=0, out_dir=SYNTHETIC_DIR):
+    return os.path.join(out_dir, f"catalog_{scale}x_seed{seed}.csv")
+
+
+# --- 1. Sampling Helpers ---
+def _frequencies(lists):
+    """Distinct values and their relative frequencies across a column of lists."""
+    counts = pd.Series([value for values in lists for value in values]).value_counts()
+    return counts.index.to_numpy(dtype=object), (counts / counts.sum()).to_numpy()
+
+
+def _join_slots(values, lengths, sep=', '):
+    """Split a flat sample into consecutive rows of the given lengths and join each.
+
+    Repeats within a row are dropped, as a title never lists a person twice.
+    """
+    values = values.tolist()
+    joined, pos = [], 0
+    for n in lengths:
+        joined.append(sep.join(dict.fromkeys(values[pos:pos + n])))
+        pos += n
+    return joined
+
+
+def _sample_lists(rng, pool, weights, lengths):
+    """Draw `lengths[i]` values for every row, joined as 'a, b, c'."""
+    draws = pool[rng.choice(len(pool), size=int(lengths.sum()), p=weights)]
+    return _join_slots(draws, lengths)
+
+
+def talent_pool(lists, scale):
+    """Names and credit counts for a talent pool `scale` times the real one.
+
+    Each real person gets `scale` namesakes ("Jane Doe", "Jane Doe 2", ...),
+    each with the real person's number of titles.
+    """
+    counts = pd.Series([name for names in lists for name in names]).value_counts()
+    names = counts.index.to_numpy(dtype=object)
+    pool = np.concatenate([names] + [names + f" {copy}" for copy in range(2, scale + 1)])
+    return pool, np.tile(counts.to_numpy(), scale)
+
+
+def _deal_talent(rng, pool, credits, lengths):
+    """Shuffle every pool member's credits and deal them out to the rows.
+
+    Sampling with replacement would under-draw the many one-title people;
+    dealing keeps each person's title count (topped up by weighted draws, or
+    cut, when the rows need a different number of credits than the pool has).
+    """
+    n_slots = int(lengths.sum())
+    slots = np.repeat(np.arange(len(pool)), credits)
+    if len(slots) < n_slots:
+        extra = rng.choice(len(pool), size=n_slots - len(slots), p=credits / credits.sum())
+        slots = np.concatenate([slots, extra])
+    rng.shuffle(slots)
+    return _join_slots(pool[slots[:n_slots]], lengths)
+
+
+def _sample_text(rng, vocabulary, weights, lengths, title_case=False):
+    draws = vocabulary[rng.choice(len(vocabulary), size=int(lengths.sum()), p=weights)]
+    texts = []
+    values, pos = draws.tolist(), 0
+    for n in lengths:
+        words = values[pos:pos + n]
+        pos += n
+        if title_case:
+            texts.append(' '.join(word.capitalize() for word in words))
+        else:
+            text = ' '.join(words)
+            texts.append(text[:1].upper() + text[1:] + '.')
+    return texts
+
+
+def _vocabulary(texts):
+    words = texts.fillna('').str.lower().str.findall(r"[a-z][a-z'\-]+")
+    return _frequencies(words), words.str.len().to_numpy()
+
+
+# --- 2. Generator ---
+def generate_catalog(source=CATALOG_CSV, scale=1, seed=0):
+    """A synthetic catalog DataFrame with `scale` times as many titles as `source`."""
+    rng = np.random.default_rng(seed)
+    df_real = parse_catalog_csv(source)
+    # Raw cells, to copy the file's own date/duration formats and missing markers
+    df_raw = pd.read_csv(source)
+    n_rows = len(df_real) * scale
+
+    # Template titles: type, dates, rating, duration and list lengths
+    template = rng.integers(0, len(df_real), size=n_rows)
+    df = pd.DataFrame({'show_id': [f"s{i + 1}" for i in range(n_rows)]})
+    for column_name in TEMPLATE_COLUMNS:
+        df[column_name] = df_raw[column_name].to_numpy()[template]
+
+    (title_words, title_weights), title_lengths = _vocabulary(df_real['title'])
+    df['title'] = _sample_text(rng, title_words, title_weights,
+                               np.maximum(title_lengths[template], 1), title_case=True)
+
+    for column_name, list_name in LIST_COLUMNS.items():
+        lengths = df_real[list_name].str.len().to_numpy()[template]
+        # Templates without values keep the real file's blank/"No Data" cell
+        values = df_raw[column_name].to_numpy(dtype=object)[template]
+        has_values = lengths > 0
+
+        if column_name in ('cast', 'director'):
+            pool, credits = talent_pool(df_real[list_name], scale)
+            values[has_values] = _deal_talent(rng, pool, credits, lengths[has_values])
+        elif column_name == 'listed_in':
+            # Movie and TV genres are different lists on Netflix
+            for title_type in df_real['type'].dropna().unique():
+                pool, weights = _frequencies(df_real.loc[df_real['type'] == title_type, list_name])
+                rows = has_values & (df['type'].to_numpy() == title_type)
+                values[rows] = _sample_lists(rng, pool, weights, lengths[rows])
+        else:
+            pool, weights = _frequencies(df_real[list_name])
+            values[has_values] = _sample_lists(rng, pool, weights, lengths[has_values])
+        df[column_name] = values
+
+    (description_words, description_weights), description_lengths = _vocabulary(df_real['description'])
+    df['description'] = _sample_text(rng, description_words, description_weights,
+                                     np.maximum(description_lengths[template], 1))
+
+    # Same columns, in the same order, as the source file
+    return df[list(df_raw.columns)]
+
+
+def write_synthetic_catalog(scale, source=CATALOG_CSV, seed=0, out_dir=SYNTHETIC_DIR, force=False):
+    """Generate (or reuse) the catalog CSV for one scale and return its path."""
+    path = synthetic_path(scale, seed, out_dir)
+    if os.path.exists(path) and not force:
+        return path
+    os.makedirs(out_dir, exist_ok=True)
+    df = generate_catalog(source, scale, seed)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Generate synthetic catalogs shaped like netflix.csv.")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10, 100], help="size multiples (default: 1 10 100)")
+    parser.add_argument('--source', default=CATALOG_CSV, help="real catalog to imitate")
+    parser.add_argument('--out-dir', default=SYNTHETIC_DIR)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--force', action='store_true', help="regenerate files that already exist")
+    args = parser.parse_args()
+
+    for scale in args.scale:
+        start = time.perf_counter()
+        path = write_synthetic_catalog(scale, args.source, args.seed, args.out_dir, args.force)
+        print(f"{scale}x -> {path} ({os.path.getsize(path) / 1e6:.1f} MB, {time.perf_counter() - start:.1f}s)")
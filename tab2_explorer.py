@@ -1,90 +1,181 @@
 # Save this in /pages/tab2_explorer.py
 
+import functools
+import json
+from urllib.parse import urlencode
+
 import dash
 from dash import dcc, html, Input, Output, State, ALL
-import plotly.express as px
-import pandas as pd
 import dash_bootstrap_components as dbc
 import dash_ag_grid as dag
+import numpy as np
+
+from catalog import load_catalog
+from grid_query import EMPTY_RESPONSE, block_response, filter_frame, model_key, sort_frame, valid_request
+from page_cache import page_data
+from title_search import build_title_search, search_titles
+from title_similarity import similar_titles
 
 dash.register_page(__name__, name='Content Explorer', path='/content-explorer')
 
 # --- 1. Load Data ---
-try:
-    df = pd.read_csv("netflix.csv")
-    df = df.fillna("N/A")
-except FileNotFoundError:
-    layout = html.Div([
-        html.H1("Error: netflix.csv not found", className="text-danger"),
-        html.P("Please make sure 'netflix.csv' is in your main 'Dashboard' folder.")
-    ])
-    raise FileNotFoundError("netflix.csv not found.")
+EXPLORER_COLUMNS = [
+    'show_id', 'type', 'title', 'director', 'cast', 'country',
+    'release_year', 'rating', 'duration', 'listed_in', 'description',
+]
+
+# Computed on the first request for this page (once per worker), not at import.
+@page_data('Content Explorer')
+def explorer_data():
+    # Shared catalog from catalog.py; astype/fillna return this page's own display copy.
+    df = load_catalog(EXPLORER_COLUMNS).astype({'type': 'object', 'rating': 'object'}).fillna("N/A")
+    # Lookups for the Quick Facts card: show_id -> row position, rating -> row positions
+    row_by_id = {show_id: row for row, show_id in enumerate(df['show_id'])}
+    rating_rows = df.groupby('rating', sort=False).indices
+    return {'df': df, 'row_by_id': row_by_id, 'rating_rows': rating_rows, 'search_index': build_title_search(df)}
+
+# Similar titles listed on the Quick Facts card
+SIMILAR_SHOWN = 5
+
+# Filtered, sorted results kept per worker: the grid requests block after
+# block of the same result while the user scrolls or pages
+RESULT_CACHE_SIZE = 32
+
+@functools.lru_cache(maxsize=RESULT_CACHE_SIZE)
+def explorer_result(key, query):
+    sort_model, filter_model = json.loads(key)
+    data_store = explorer_data()
+    df = data_store['df']
+    rows = search_titles(data_store['search_index'], query)
+    if rows is not None:
+        # Best matches first, unless the grid is sorted on a column
+        df = df.iloc[rows]
+    return sort_frame(filter_frame(df, filter_model), sort_model)
 
 # --- 2. Define Grid Columns ---
 columnDefs = [
-    {"field": "title", "filter": "agTextColumnFilter", "checkboxSelection": True, "headerCheckboxSelection": True},
+    {"field": "title", "filter": "agTextColumnFilter", "checkboxSelection": True},
     {"field": "type", "filter": "agSetColumnFilter"},
     {"field": "release_year", "filter": "agNumberColumnFilter"},
     {"field": "rating", "filter": "agSetColumnFilter"},
 ]
 
+# Only the grid's own columns (and the row id) are sent to the browser
+GRID_FIELDS = ['show_id'] + [column['field'] for column in columnDefs]
+
 # --- 3. Define Page Layout ---
-layout = dbc.Container([
-    html.H1("🔎  Content Explorer", className="mt-4 netflix-glow"),
+# A function, so Dash only builds it (and the data behind it) when the page is opened
+def layout(**kwargs):
+    return dbc.Container([
+        html.H1("🔎  Content Explorer", className="mt-4 netflix-glow"),
     
-    # NEW: Add a 'dcc.Store' to hold the currently selected title
-    # This is an invisible component that acts as our app's "memory"
-    dcc.Store(id='selected-title-store', data=None),
-
-    dbc.Row([
-        # --- Left Column: The Grid ---
-        dbc.Col([
-            dbc.Alert(
-                [
-                    html.I(className="bi bi-info-circle-fill me-2"),
-                    "Search, sort, right-click to export, and select a title to see details."
-                ], 
-                color="info",
-                className="d-flex align-items-center"
-            ),
-            dag.AgGrid(
-                id='content-browser-grid',
-                rowData=df.to_dict('records'),
-                columnDefs=columnDefs,
-                className="ag-theme-alpine-dark",
-                defaultColDef={
-                    "sortable": True, "filter": True, "resizable": True, "floatingFilter": True,
-                },
-                dashGridOptions={
-                    "pagination": True, "paginationPageSize": 20, "rowSelection": "multiple",
-                },
-                style={"height": "600px"}
-            )
-        ], width=8),
-
-        # --- Right Column: The Quick Facts Card ---
-        dbc.Col([
-            dbc.Card(
-                [
-                    dbc.CardHeader(html.H4("Quick Facts")),
-                    dbc.CardBody(
-                        id="quick-facts-card", # This card's content is now driven by the 'dcc.Store'
-                        children=[
-                            html.P("Select a title from the grid to see details.", className="text-muted")
-                        ]
-                    )
-                ],
-                color="dark",
-                inverse=True,
-                className="sticky-top"
-            )
-        ], width=4)
-    ], className="mt-4")
-], fluid=True)
+        # NEW: Add a 'dcc.Store' to hold the show_id of the currently selected title
+        # This is an invisible component that acts as our app's "memory"
+        dcc.Store(id='selected-title-store', data=None),
+
+        dbc.Row([
+            # --- Left Column: The Grid ---
+            dbc.Col([
+                dbc.Alert(
+                    [
+                        html.I(className="bi bi-info-circle-fill me-2"),
+                        "Search, sort, filter, export the result, and select a title to see details."
+                    ], 
+                    color="info",
+                    className="d-flex align-items-center"
+                ),
+                dbc.Input(
+                    id='explorer-search',
+                    type='search',
+                    placeholder="Search titles, descriptions, cast and directors...",
+                    debounce=300,
+                    className="mb-2",
+                ),
+                html.Div([
+                    html.A("Export CSV", id='explorer-export-csv', href='/export/content-explorer.csv',
+                           className="btn btn-sm btn-outline-light me-2"),
+                    html.A("Export Parquet", id='explorer-export-parquet', href='/export/content-explorer.parquet',
+                           className="btn btn-sm btn-outline-light"),
+                ], className="mb-2"),
+                dcc.Store(id='explorer-grid-reset'),
+                dag.AgGrid(
+                    id='content-browser-grid',
+                    columnDefs=columnDefs,
+                    className="ag-theme-alpine-dark",
+                    defaultColDef={
+                        "sortable": True, "filter": True, "resizable": True, "floatingFilter": True,
+                    },
+                    getRowId="params.data.show_id",
+                    rowModelType="infinite",
+                    dashGridOptions={
+                        "pagination": True, "paginationPageSize": 20, "rowSelection": "multiple",
+                        "cacheBlockSize": 100, "maxBlocksInCache": 20,
+                    },
+                    style={"height": "600px"}
+                )
+            ], width=8),
+
+            # --- Right Column: The Quick Facts Card ---
+            dbc.Col([
+                dbc.Card(
+                    [
+                        dbc.CardHeader(html.H4("Quick Facts")),
+                        dbc.CardBody(
+                            id="quick-facts-card", # This card's content is now driven by the 'dcc.Store'
+                            children=[
+                                html.P("Select a title from the grid to see details.", className="text-muted")
+                            ]
+                        )
+                    ],
+                    color="dark",
+                    inverse=True,
+                    className="sticky-top"
+                )
+            ], width=4)
+        ], className="mt-4")
+    ], fluid=True)
 
 
 # --- 4. Define Callbacks ---
 
+# Start the grid over (it then requests its first block) when the search changes
+dash.clientside_callback(
+    """
+    function(query) {
+        dash_ag_grid.getApiAsync('content-browser-grid').then((api) => api.purgeInfiniteCache());
+        return window.dash_clientside.no_update;
+    }
+    """,
+    Output('explorer-grid-reset', 'data'),
+    Input('explorer-search', 'value'),
+    prevent_initial_call=True,
+)
+
+
+@dash.callback(
+    Output('explorer-export-csv', 'href'),
+    Output('explorer-export-parquet', 'href'),
+    Input('content-browser-grid', 'getRowsRequest'),
+    Input('explorer-search', 'value'),
+)
+def update_export_links(request, query):
+    """Point the export buttons at the grid's current sort, filters and search."""
+    params = {'models': model_key(request or {}), 'q': (query or '').strip()}
+    return [f"/export/content-explorer.{file_format}?{urlencode(params)}" for file_format in ('csv', 'parquet')]
+
+
+@dash.callback(
+    Output('content-browser-grid', 'getRowsResponse'),
+    Input('content-browser-grid', 'getRowsRequest'),
+    State('explorer-search', 'value'),
+)
+def serve_explorer_rows(request, query):
+    """One block of the catalog (or of the search matches), with the grid's sort and filters applied on the server."""
+    if request is None or not valid_request(request):
+        return EMPTY_RESPONSE
+    return block_response(explorer_result(model_key(request), (query or '').strip()), request, columns=GRID_FIELDS)
+
+
 # Callback 1: Update the Store when a GRID ROW is selected
 @dash.callback(
     Output('selected-title-store', 'data'),
@@ -95,15 +186,14 @@ def update_store_from_grid(selected_rows):
     if not selected_rows:
         return dash.no_update # If deselected, do nothing
     
-    # Get the title from the selected row and put it in the store
-    title = selected_rows[0]['title']
-    return title
+    # Get the show_id from the selected row and put it in the store (titles are not unique)
+    return selected_rows[0]['show_id']
 
 
 # Callback 2: Update the Store when a DYNAMIC BUTTON is clicked
 @dash.callback(
     Output('selected-title-store', 'data', allow_duplicate=True), # 'allow_duplicate' is key
-    Input({'type': 'similar-movie-button', 'title': ALL}, 'n_clicks'),
+    Input({'type': 'similar-movie-button', 'show_id': ALL}, 'n_clicks'),
     prevent_initial_call=True
 )
 def update_store_from_button(n_clicks):
@@ -113,10 +203,9 @@ def update_store_from_button(n_clicks):
     if not triggered_id_dict:
         return dash.no_update
         
-    # The ID is a dictionary like {'type': '...', 'title': 'The Movie'}
-    # We just want the title
-    title = triggered_id_dict['title']
-    return title
+    # The ID is a dictionary like {'type': '...', 'show_id': 's42'}
+    # We just want the show_id
+    return triggered_id_dict['show_id']
 
 
 # Callback 3: Update the CARD whenever the STORE is updated
@@ -125,33 +214,40 @@ def update_store_from_button(n_clicks):
     Output('quick-facts-card', 'children'),
     Input('selected-title-store', 'data') # Listens only to the store
 )
-def update_quick_facts_from_store(selected_title):
+def update_quick_facts_from_store(selected_id):
     # If store is empty, show default message
-    if not selected_title:
+    if not selected_id:
         return html.P("Select a title from the grid to see details.", className="text-muted")
 
-    # Find the movie's data in the main dataframe
-    data_rows = df[df['title'] == selected_title]
-    if data_rows.empty:
+    # Find the movie's row through the show_id index (no catalog scan)
+    data_store = explorer_data()
+    df = data_store['df']
+    row = data_store['row_by_id'].get(selected_id)
+    if row is None:
         return html.P("Error: Title not found.", className="text-danger")
-        
-    data = data_rows.iloc[0] # Get the first row
+
+    data = df.iloc[row]
     
     # --- Find Similar Titles ---
+    # Precomputed by the title_similar prep stage; without it, fall back to
+    # a few random titles with the same rating
     selected_rating = data['rating']
-    
-    same_rating_df = df[
-        (df['rating'] == selected_rating) & 
-        (df['title'] != selected_title)
-    ]
-    
-    similar_titles_df = same_rating_df.sample(min(3, len(same_rating_df)))
+    try:
+        similar_ids, _ = similar_titles(selected_id, SIMILAR_SHOWN)
+        similar_rows = [data_store['row_by_id'][show_id] for show_id in similar_ids if show_id in data_store['row_by_id']]
+        similar_heading = "More like this:"
+    except FileNotFoundError:
+        same_rating_rows = data_store['rating_rows'][selected_rating]
+        same_rating_rows = same_rating_rows[same_rating_rows != row]
+        similar_rows = np.random.default_rng().choice(same_rating_rows, min(3, len(same_rating_rows)), replace=False)
+        similar_heading = f"More with rating '{selected_rating}':"
+    similar_titles_df = df.iloc[similar_rows]
     
     # --- Create CLICKABLE similar titles ---
     similar_titles_components = []
     if not similar_titles_df.empty:
         similar_titles_components.append(html.Hr())
-        similar_titles_components.append(html.Strong(f"More with rating '{selected_rating}':"))
+        similar_titles_components.append(html.Strong(similar_heading))
         
         # Create a ListGroup of clickable Buttons
         title_list = [
@@ -159,13 +255,13 @@ def update_quick_facts_from_store(selected_title):
             dbc.ListGroupItem(
                 dbc.Button(
                     title,
-                    id={'type': 'similar-movie-button', 'title': title},
+                    id={'type': 'similar-movie-button', 'show_id': show_id},
                     # We removed color="link" and added 'similar-movie-link'
                     className="p-0 text-start similar-movie-link" 
                 ),
                 className="border-0"
             ) 
-            for title in similar_titles_df['title']
+            for show_id, title in zip(similar_titles_df['show_id'], similar_titles_df['title'])
         ]
         similar_titles_components.append(dbc.ListGroup(title_list, flush=True, className="mt-2"))
     
@@ -1,5 +1,7 @@
 # Save this in /pages/tab3_trends.py
 
+import functools
+
 import dash
 from dash import dcc, html, Input, Output
 import plotly.express as px
@@ -8,31 +10,21 @@ import pandas as pd
 import dash_bootstrap_components as dbc
 import numpy as np
 
+from catalog import catalog_version, load_added_titles
+from page_cache import page_data, warmer
+
 dash.register_page(__name__, name='Trend Intelligence', path='/trend-intelligence')
 
-# --- 1. Load and Prepare Data ---
-try:
-    df = pd.read_csv("netflix.csv")
-except FileNotFoundError:
-    layout = html.Div([
-        html.H1("Error: netflix.csv not found", className="text-danger"),
-        html.P("Please make sure 'netflix.csv' is in your main 'Dashboard' folder.")
-    ])
-    raise FileNotFoundError("netflix.csv not found.")
-
-# --- Prep for Time-Series & Seasonal ---
-df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce')
-df = df.dropna(subset=['date_added'])
-df['year_added'] = df['date_added'].dt.year
-df['month_num'] = df['date_added'].dt.month
-df['month_abbr'] = df['date_added'].dt.strftime('%b')
-
-# Prep data for main time-series chart (Feature 1)
-df_yearly_counts = df.groupby(['year_added', 'type']).size().reset_index(name='count')
-
-# Prep data for seasonal chart (Feature 3)
-df_seasonal = df.groupby(['month_num', 'month_abbr', 'type']).size().reset_index(name='count')
-df_seasonal = df_seasonal.sort_values('month_num')
+# --- 1. Helper Function for Styling ---
+def style_figure_dark(fig):
+    fig.update_layout(
+        template="plotly_dark",
+        font_color="white",
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        legend_title_text=''
+    )
+    return fig
 
 # --- NEW: Milestones Data (Feature 5) ---
 milestones_data = [
@@ -43,167 +35,187 @@ milestones_data = [
     {'date': '2022-01-01', 'event': 'First Subscriber Decline', 'description': 'Netflix reported its first subscriber loss in over a decade, signaling market saturation.'},
 ]
 
-df_milestones = pd.DataFrame(milestones_data)
-df_milestones['date'] = pd.to_datetime(df_milestones['date'])
 
+# --- 2. Load and Prepare Data ---
+# Computed on the first request for this page (once per worker), not at import.
+@page_data('Trend Intelligence')
+def trend_data():
+    # --- Prep for Time-Series & Seasonal ---
+    # Rows with a valid date_added, with year/month columns, come from catalog.py
+    df = load_added_titles()
 
-# --- 2. Helper Function for Styling ---
-def style_figure_dark(fig):
-    fig.update_layout(
+    # Prep data for main time-series chart (Feature 1)
+    df_yearly_counts = df.groupby(['year_added', 'type'], observed=True).size().reset_index(name='count')
+
+    # Prep data for seasonal chart (Feature 3)
+    df_seasonal = df.groupby(['month_num', 'month_abbr', 'type'], observed=True).size().reset_index(name='count')
+    df_seasonal = df_seasonal.sort_values('month_num')
+
+    df_milestones = pd.DataFrame(milestones_data)
+    df_milestones['date'] = pd.to_datetime(df_milestones['date'])
+
+    # --- NEW: Create Milestones Timeline Figure ---
+    # We'll use a simple scatter plot with custom markers to simulate a timeline
+    fig_milestones = go.Figure()
+
+    # Add a horizontal line to represent the timeline axis
+    fig_milestones.add_trace(go.Scatter(
+        x=[df_milestones['date'].min(), df_milestones['date'].max()],
+        y=[0, 0], # All points on the same y-axis level
+        mode='lines',
+        line=dict(color='grey', width=2),
+        showlegend=False
+    ))
+
+    # Add markers for each milestone
+    for i, row in df_milestones.iterrows():
+        fig_milestones.add_trace(go.Scatter(
+            x=[row['date']],
+            y=[0], # All markers on the same horizontal line
+            mode='markers+text',
+            marker=dict(symbol='diamond-open', size=12, color='#E50914', line=dict(width=2, color='#E50914')),
+            name=row['event'],
+            text=f"<b>{row['date'].year}</b><br>{row['event']}",
+            textposition="top center", # Position text above the marker
+            hovertemplate=f"<b>%{{x|%Y-%m-%d}}</b><br>{row['event']}<br>{row['description']}<extra></extra>"
+        ))
+
+    fig_milestones.update_layout(
+        title="Historical Milestones",
+        yaxis=dict(
+            showgrid=False,
+            zeroline=False,
+            showticklabels=False, # Hide y-axis labels as it's just a timeline
+            title=""
+        ),
+        xaxis=dict(
+            showgrid=False,
+            tickformat="%Y",
+            range=[df_milestones['date'].min() - pd.Timedelta(days=180), df_milestones['date'].max() + pd.Timedelta(days=180)]
+        ),
+        height=250, # Make it compact
+        margin=dict(l=20, r=20, t=50, b=20),
         template="plotly_dark",
         font_color="white",
         paper_bgcolor="rgba(0,0,0,0)",
         plot_bgcolor="rgba(0,0,0,0)",
-        legend_title_text=''
+        showlegend=False # Legend not needed for this style
     )
-    return fig
 
-# --- NEW: Create Milestones Timeline Figure ---
-# We'll use a simple scatter plot with custom markers to simulate a timeline
-fig_milestones = go.Figure()
-
-# Add a horizontal line to represent the timeline axis
-fig_milestones.add_trace(go.Scatter(
-    x=[df_milestones['date'].min(), df_milestones['date'].max()],
-    y=[0, 0], # All points on the same y-axis level
-    mode='lines',
-    line=dict(color='grey', width=2),
-    showlegend=False
-))
-
-# Add markers for each milestone
-for i, row in df_milestones.iterrows():
-    fig_milestones.add_trace(go.Scatter(
-        x=[row['date']],
-        y=[0], # All markers on the same horizontal line
-        mode='markers+text',
-        marker=dict(symbol='diamond-open', size=12, color='#E50914', line=dict(width=2, color='#E50914')),
-        name=row['event'],
-        text=f"<b>{row['date'].year}</b><br>{row['event']}",
-        textposition="top center", # Position text above the marker
-        hovertemplate=f"<b>%{{x|%Y-%m-%d}}</b><br>{row['event']}<br>{row['description']}<extra></extra>"
+    # Seasonal pattern figure (Feature 3)
+    fig_seasonal = style_figure_dark(px.line(
+        df_seasonal,
+        x='month_abbr',
+        y='count',
+        color='type',
+        title="Seasonal Addition Trends",
+        markers=True,
+        color_discrete_map={
+            'Movie': '#F08080',
+            'TV Show': '#E50914'
+        }
     ))
 
-fig_milestones.update_layout(
-    title="Historical Milestones",
-    yaxis=dict(
-        showgrid=False,
-        zeroline=False,
-        showticklabels=False, # Hide y-axis labels as it's just a timeline
-        title=""
-    ),
-    xaxis=dict(
-        showgrid=False,
-        tickformat="%Y",
-        range=[df_milestones['date'].min() - pd.Timedelta(days=180), df_milestones['date'].max() + pd.Timedelta(days=180)]
-    ),
-    height=250, # Make it compact
-    margin=dict(l=20, r=20, t=50, b=20),
-    template="plotly_dark",
-    font_color="white",
-    paper_bgcolor="rgba(0,0,0,0)",
-    plot_bgcolor="rgba(0,0,0,0)",
-    showlegend=False # Legend not needed for this style
-)
+    return {
+        'df_yearly_counts': df_yearly_counts,
+        'fig_seasonal': fig_seasonal,
+        'fig_milestones': fig_milestones,
+    }
 
 
 # --- 3. Define Page Layout ---
-layout = dbc.Container([
-    html.H1("🧠 Trend Intelligence", className="mt-4 netflix-glow"),
-
-    # Row 1: Main Interactive Chart & Controls
-    dbc.Row([
-        # Column 1: The Controls
-        dbc.Col([
-            dbc.Card(
-                dbc.CardBody([
-                    html.H5("Comparison Tools (Feature 2)", className="card-title"),
-                    dcc.Checklist(
-                        id='trend-comparison-checklist',
-                        options=[
-                            {'label': ' Movies', 'value': 'Movie'},
-                            {'label': ' TV Shows', 'value': 'TV Show'},
-                        ],
-                        value=['Movie', 'TV Show'], # Default to showing both
-                        labelStyle={'display': 'block', 'margin-top': '5px'},
-                        inputStyle={'margin-right': '5px'}
-                    ),
-                    html.Hr(),
-                    html.H5("Analysis Tools", className="card-title"),
-                    dbc.Switch(
-                        id='projection-switch',
-                        label="Show Growth Projection (Feature 4)",
-                        value=False,
+# A function, so Dash only builds it (and the data behind it) when the page is opened
+def layout(**kwargs):
+    data = trend_data()
+    return dbc.Container([
+        html.H1("🧠 Trend Intelligence", className="mt-4 netflix-glow"),
+
+        # Row 1: Main Interactive Chart & Controls
+        dbc.Row([
+            # Column 1: The Controls
+            dbc.Col([
+                dbc.Card(
+                    dbc.CardBody([
+                        html.H5("Comparison Tools (Feature 2)", className="card-title"),
+                        dcc.Checklist(
+                            id='trend-comparison-checklist',
+                            options=[
+                                {'label': ' Movies', 'value': 'Movie'},
+                                {'label': ' TV Shows', 'value': 'TV Show'},
+                            ],
+                            value=['Movie', 'TV Show'], # Default to showing both
+                            labelStyle={'display': 'block', 'margin-top': '5px'},
+                            inputStyle={'margin-right': '5px'}
+                        ),
+                        html.Hr(),
+                        html.H5("Analysis Tools", className="card-title"),
+                        dbc.Switch(
+                            id='projection-switch',
+                            label="Show Growth Projection (Feature 4)",
+                            value=False,
+                        ),
+                    ]),
+                    color="dark"
+                )
+            ], width=3),
+
+            # Column 2: The Main Chart
+            dbc.Col([
+                dbc.Card(
+                    # Feature 1: Interactive time-series chart
+                    dcc.Graph(id='main-trend-chart'),
+                    color="dark",
+                    body=True
+                )
+            ], width=9)
+        ], className="mt-4"),
+
+        # Row 2: Seasonal Analysis
+        dbc.Row([
+            dbc.Col([
+                dbc.Card(
+                    # Feature 3: Seasonal pattern analysis
+                    dcc.Graph(
+                        id='seasonal-trend-chart',
+                        figure=data['fig_seasonal']
                     ),
-                ]),
-                color="dark"
-            )
-        ], width=3),
-
-        # Column 2: The Main Chart
-        dbc.Col([
-            dbc.Card(
-                # Feature 1: Interactive time-series chart
-                dcc.Graph(id='main-trend-chart'),
-                color="dark",
-                body=True
-            )
-        ], width=9)
-    ], className="mt-4"),
-
-    # Row 2: Seasonal Analysis
-    dbc.Row([
-        dbc.Col([
-            dbc.Card(
-                # Feature 3: Seasonal pattern analysis
-                dcc.Graph(
-                    id='seasonal-trend-chart',
-                    figure=style_figure_dark(px.line(
-                        df_seasonal,
-                        x='month_abbr',
-                        y='count',
-                        color='type',
-                        title="Seasonal Addition Trends",
-                        markers=True,
-                        color_discrete_map={
-                            'Movie': '#F08080',
-                            'TV Show': '#E50914'
-                        }
-                    ))
-                ),
-                color="dark",
-                body=True
-            )
-        ], width=12)
-    ], className="mt-4"),
+                    color="dark",
+                    body=True
+                )
+            ], width=12)
+        ], className="mt-4"),
     
-    # NEW ROW 3: Historical Milestones Timeline
-    dbc.Row([
-        dbc.Col([
-            dbc.Card(
-                dcc.Graph(id='milestones-timeline', figure=fig_milestones),
-                color="dark",
-                body=True
-            )
-        ], width=12)
-    ], className="mt-4 mb-4") # Add bottom margin to the last row
-], fluid=True)
+        # NEW ROW 3: Historical Milestones Timeline
+        dbc.Row([
+            dbc.Col([
+                dbc.Card(
+                    dcc.Graph(id='milestones-timeline', figure=data['fig_milestones']),
+                    color="dark",
+                    body=True
+                )
+            ], width=12)
+        ], className="mt-4 mb-4") # Add bottom margin to the last row
+    ], fluid=True)
 
 
 # --- 4. Define Callback for Main Chart ---
-@dash.callback(
-    Output('main-trend-chart', 'figure'),
-    Input('trend-comparison-checklist', 'value'),
-    Input('projection-switch', 'value')
-)
-def update_main_trend_chart(selected_types, show_projection):
-    
-    # Filter data based on checklist
-    df_filtered = df_yearly_counts[df_yearly_counts['type'].isin(selected_types)].copy() # Use .copy() to avoid SettingWithCopyWarning
+TYPE_COLORS = {'Movie': '#F08080', 'TV Show': '#E50914'}
+
+# Every checklist/switch combination fits: 4 type subsets x projection on/off
+TREND_FIGURE_CACHE_SIZE = 8
+
+
+def _scatter(item_type, years, counts, **style):
+    # Plain dicts: the figure is built once per input, without plotly's validation per frame
+    return {'type': 'scatter', 'x': years, 'y': counts, 'mode': 'lines+markers',
+            'legendgroup': item_type, **style}
+
+
+@functools.lru_cache(maxsize=TREND_FIGURE_CACHE_SIZE)
+def trend_figure(selected_types, show_projection, version):
+    """The animated trend figure (as a dict) for a tuple of types, cached per dataset version."""
+    df_yearly_counts = trend_data()['df_yearly_counts']
 
-    # --- NEW: Create a list of frames for animation ---
-    frames = []
-    
     # Get overall max values for consistent axis ranges
     min_year = df_yearly_counts['year_added'].min()
     max_year = df_yearly_counts['year_added'].max()
@@ -223,42 +235,25 @@ def update_main_trend_chart(selected_types, show_projection):
         )
     )
 
+    # One pass: each type's (year, count) series, sorted by year
+    df_filtered = df_yearly_counts[df_yearly_counts['type'].isin(selected_types)].sort_values('year_added')
+    series = {
+        item_type: (df_type['year_added'].to_numpy(), df_type['count'].to_numpy())
+        for item_type, df_type in df_filtered.groupby('type', observed=True)
+    }
+
     # Add the full static lines (the "original graph") for the selected types
     for item_type in selected_types:
-        df_type = df_filtered[df_filtered['type'] == item_type]
-        color = '#F08080' if item_type == 'Movie' else '#E50914'
+        years, counts = series.get(item_type, (np.array([]), np.array([])))
         fig.add_trace(go.Scatter(
-            x=df_type['year_added'],
-            y=df_type['count'],
+            x=years,
+            y=counts,
             mode='lines+markers',
             name=f'{item_type} (Full)',
-            line=dict(color=color, width=1, dash='dot'), # Make static line slightly thinner and dotted
+            line=dict(color=TYPE_COLORS[item_type], width=1, dash='dot'), # Make static line slightly thinner and dotted
             showlegend=True,
             legendgroup=item_type # Group legends
         ))
-    
-    # Generate frames for the animated "drawing" effect
-    for year in sorted(df_filtered['year_added'].unique()):
-        frame_data = []
-        for item_type in selected_types:
-            df_slice = df_filtered[(df_filtered['type'] == item_type) & (df_filtered['year_added'] <= year)]
-            color = '#F08080' if item_type == 'Movie' else '#E50914'
-            
-            # This trace will be animated
-            frame_data.append(go.Scatter(
-                x=df_slice['year_added'],
-                y=df_slice['count'],
-                mode='lines+markers',
-                name=f'{item_type} (Animated)',
-                line=dict(color=color, width=3), # Make animated line thicker
-                marker=dict(size=8, color=color),
-                showlegend=False, # Don't show legend for animated parts, it gets redundant
-                legendgroup=item_type
-            ))
-        
-        frames.append(go.Frame(data=frame_data, name=str(year)))
-
-    fig.frames = frames
 
     # Add Growth Projection (Feature 4) - this will be static above the animated lines
     if show_projection:
@@ -281,5 +276,40 @@ def update_main_trend_chart(selected_types, show_projection):
         ))
 
     # Style the final figure
-    fig = style_figure_dark(fig)
-    return fig
\ No newline at end of file
+    fig = style_figure_dark(fig).to_dict()
+
+    # Frames for the animated "drawing" effect: frame `year` shows each
+    # type's series up to that year, a prefix found by binary search
+    frame_years = np.unique(df_filtered['year_added'].to_numpy())
+    ends = {item_type: np.searchsorted(series[item_type][0], frame_years, side='right')
+            for item_type in selected_types if item_type in series}
+    fig['frames'] = [
+        {'name': str(year), 'data': [
+            _scatter(item_type, series[item_type][0][:ends[item_type][i]], series[item_type][1][:ends[item_type][i]],
+                     name=f'{item_type} (Animated)',
+                     line=dict(color=TYPE_COLORS[item_type], width=3), # Make animated line thicker
+                     marker=dict(size=8, color=TYPE_COLORS[item_type]),
+                     showlegend=False) # Don't show legend for animated parts, it gets redundant
+            for item_type in selected_types if item_type in series
+        ]}
+        for i, year in enumerate(frame_years.tolist())
+    ]
+    return fig
+
+
+@warmer('Trend Intelligence')
+def warm_trend_figures():
+    for selected_types in ((), ('Movie',), ('TV Show',), tuple(TYPE_COLORS)):
+        for show_projection in (False, True):
+            trend_figure(selected_types, show_projection, catalog_version())
+
+
+@dash.callback(
+    Output('main-trend-chart', 'figure'),
+    Input('trend-comparison-checklist', 'value'),
+    Input('projection-switch', 'value')
+)
+def update_main_trend_chart(selected_types, show_projection):
+    # In checklist order, so each combination has a single cache entry
+    selected_types = tuple(item_type for item_type in TYPE_COLORS if item_type in (selected_types or []))
+    return trend_figure(selected_types, bool(show_projection), catalog_version())
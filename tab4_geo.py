@@ -7,122 +7,121 @@ import pandas as pd
 import country_converter as coco
 import dash_bootstrap_components as dbc
 
+from catalog import title_countries
+from page_cache import page_data
+
 dash.register_page(__name__, name='Geographic Insights', path='/geographic-insights')
 
 # --- 1. Data Preparation ---
-
-try:
-    df_raw = pd.read_csv("netflix.csv")
-
+# Computed on the first request for this page (once per worker), not at import.
+@page_data('Geographic Insights')
+def geo_data():
     try:
         df_capitals = pd.read_csv("country-capital-lat-long-population.csv")
     except FileNotFoundError:
         print("WARNING: 'country-capital-lat-long-population.csv' not found. Production Hub map will be empty.")
         df_capitals = pd.DataFrame(columns=['Country', 'Latitude', 'Longitude'])
 
-except FileNotFoundError:
-    layout = html.Div([
-        html.H1("Error: netflix.csv not found", className="text-danger"),
-        html.P("Please make sure 'netflix.csv' is in your main project folder.")
-    ])
-    raise FileNotFoundError("netflix.csv not found. Cannot build page.")
+    # --- Process Netflix Data ---
+    # One row per (show_id, country), built once by catalog.py
+    df_exploded = title_countries()
 
-# --- Process Netflix Data ---
-df_clean = df_raw.dropna(subset=['country'])
-df_clean['country'] = df_clean['country'].str.strip()
-df_exploded = df_clean.assign(country=df_clean['country'].str.split(', ')).explode('country')
-df_exploded['country'] = df_exploded['country'].str.strip()
+    df_agg = df_exploded.groupby('country').size().reset_index(name='title_count')
 
-df_agg = df_exploded.groupby('country').size().reset_index(name='title_count')
+    cc = coco.CountryConverter()
+    df_agg['iso_alpha'] = cc.convert(df_agg['country'], to='ISO3', not_found=None)
+    df_agg['continent'] = cc.convert(df_agg['country'], to='continent', not_found=None)
 
-cc = coco.CountryConverter()
-df_agg['iso_alpha'] = cc.convert(df_agg['country'], to='ISO3', not_found=None)
-df_agg['continent'] = cc.convert(df_agg['country'], to='continent', not_found=None)
+    df_agg['mock_population'] = (df_agg['title_count'] * 10000) + abs(df_agg['country'].apply(hash) % 5000)
+    df_agg['opportunity_score'] = df_agg['mock_population'] / (df_agg['title_count'] + 1)
+    df_agg = df_agg.dropna(subset=['iso_alpha', 'continent'])
 
-df_agg['mock_population'] = (df_agg['title_count'] * 10000) + abs(df_agg['country'].apply(hash) % 5000)
-df_agg['opportunity_score'] = df_agg['mock_population'] / (df_agg['title_count'] + 1)
-df_agg = df_agg.dropna(subset=['iso_alpha', 'continent'])
+    # --- Merge with Capitals ---
+    df_capitals = df_capitals.rename(columns={"Country": "country", "Latitude": "lat", "Longitude": "lon"})
+    df_hubs = pd.merge(df_agg, df_capitals[['country', 'lat', 'lon']], on='country', how='left')
+    df_hubs = df_hubs.dropna(subset=['lat', 'lon'])
+
+    return {'df_agg': df_agg, 'df_hubs': df_hubs}
 
-# --- Merge with Capitals ---
-df_capitals.rename(columns={"Country": "country", "Latitude": "lat", "Longitude": "lon"}, inplace=True)
-df_hubs = pd.merge(df_agg, df_capitals[['country', 'lat', 'lon']], on='country', how='left')
-df_hubs = df_hubs.dropna(subset=['lat', 'lon'])
 
 # --- 2. Layout ---
-layout = dbc.Container([
-    html.H1("🌍 Geographic Insights", className="mt-4 netflix-glow"),
-
-    dbc.Row([
-        # --- Left Column: Map + Controls ---
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H5("Map Metric", className="card-title"),
-                    dcc.RadioItems(
-                        id='map-metric-selector',
-                        options=[
-                            {'label': ' Total Titles', 'value': 'title_count'},
-                            {'label': ' Market Opportunity', 'value': 'opportunity_score'},
-                        ],
-                        value='title_count',
-                        labelStyle={'display': 'block', 'margin-top': '5px'},
-                        inputStyle={'margin-right': '5px'}
-                    )
-                ])
-            ], color="dark", className="mb-3"),
-
-            # Fixed-height World Map (scroll fix)
-            dcc.Graph(
-                id='world-map',
-                config={'displayModeBar': False, 'scrollZoom': False},
-                style={'height': '70vh', 'minHeight': '500px'}  # 👈 FIXED HEIGHT
-            )
-        ], width=8),
-
-        # --- Right Column: Tabs ---
-        dbc.Col([
-            dbc.Tabs([
-                # --- Country Comparison ---
-                dbc.Tab(label='Country Comparison', children=[
-                    dbc.Row([
-                        dbc.Col(
-                            dcc.Dropdown(
-                                id='country-comparator-dropdown',
-                                options=[{'label': c, 'value': c} for c in sorted(df_agg['country'].unique())],
-                                multi=True,
-                                placeholder="Select countries to compare..."
-                            ),
+# A function, so Dash only builds it (and the data behind it) when the page is opened
+def layout(**kwargs):
+    df_agg = geo_data()['df_agg']
+    return dbc.Container([
+        html.H1("🌍 Geographic Insights", className="mt-4 netflix-glow"),
+
+        dbc.Row([
+            # --- Left Column: Map + Controls ---
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("Map Metric", className="card-title"),
+                        dcc.RadioItems(
+                            id='map-metric-selector',
+                            options=[
+                                {'label': ' Total Titles', 'value': 'title_count'},
+                                {'label': ' Market Opportunity', 'value': 'opportunity_score'},
+                            ],
+                            value='title_count',
+                            labelStyle={'display': 'block', 'margin-top': '5px'},
+                            inputStyle={'margin-right': '5px'}
                         )
-                    ], className="mt-4"),
-                    dcc.Graph(
-                        id='country-comparison-graph',
-                        config={'scrollZoom': False},
-                        style={'height': '400px'}  # Consistent height
-                    )
-                ]),
-
-                # --- Regional Deep Dive ---
-                dbc.Tab(label='Regional Deep Dive', children=[
-                    dbc.Alert("Click a country on the map to see its regional deep dive.", color="info", className="mt-4"),
-                    dcc.Graph(
-                        id='regional-deep-dive-graph',
-                        config={'scrollZoom': False},
-                        style={'height': '400px'}
-                    )
-                ]),
-
-                # --- Production Hubs ---
-                dbc.Tab(label='Production Hubs', children=[
-                    dcc.Graph(
-                        id='production-hub-map',
-                        config={'scrollZoom': False},
-                        style={'height': '70vh', 'minHeight': '500px'}  # 👈 FIXED HEIGHT TOO
-                    )
-                ]),
-            ])
-        ], width=4)
-    ], className="mt-4")
-], fluid=True)
+                    ])
+                ], color="dark", className="mb-3"),
+
+                # Fixed-height World Map (scroll fix)
+                dcc.Graph(
+                    id='world-map',
+                    config={'displayModeBar': False, 'scrollZoom': False},
+                    style={'height': '70vh', 'minHeight': '500px'}  # 👈 FIXED HEIGHT
+                )
+            ], width=8),
+
+            # --- Right Column: Tabs ---
+            dbc.Col([
+                dbc.Tabs([
+                    # --- Country Comparison ---
+                    dbc.Tab(label='Country Comparison', children=[
+                        dbc.Row([
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='country-comparator-dropdown',
+                                    options=[{'label': c, 'value': c} for c in sorted(df_agg['country'].unique())],
+                                    multi=True,
+                                    placeholder="Select countries to compare..."
+                                ),
+                            )
+                        ], className="mt-4"),
+                        dcc.Graph(
+                            id='country-comparison-graph',
+                            config={'scrollZoom': False},
+                            style={'height': '400px'}  # Consistent height
+                        )
+                    ]),
+
+                    # --- Regional Deep Dive ---
+                    dbc.Tab(label='Regional Deep Dive', children=[
+                        dbc.Alert("Click a country on the map to see its regional deep dive.", color="info", className="mt-4"),
+                        dcc.Graph(
+                            id='regional-deep-dive-graph',
+                            config={'scrollZoom': False},
+                            style={'height': '400px'}
+                        )
+                    ]),
+
+                    # --- Production Hubs ---
+                    dbc.Tab(label='Production Hubs', children=[
+                        dcc.Graph(
+                            id='production-hub-map',
+                            config={'scrollZoom': False},
+                            style={'height': '70vh', 'minHeight': '500px'}  # 👈 FIXED HEIGHT TOO
+                        )
+                    ]),
+                ])
+            ], width=4)
+        ], className="mt-4")
+    ], fluid=True)
 
 
 # --- 3. Styling Helpers ---
@@ -177,6 +176,7 @@ def style_map_geos(fig, map_type="choropleth"):
     Input('map-metric-selector', 'value')
 )
 def update_world_map(selected_metric):
+    df_agg = geo_data()['df_agg']
     title = f"Global Distribution of {'Total Titles' if selected_metric == 'title_count' else 'Market Opportunity'}"
     fig = px.choropleth(
         df_agg,
@@ -196,6 +196,7 @@ def update_world_map(selected_metric):
     Input('country-comparator-dropdown', 'value')
 )
 def update_comparison_chart(selected_countries):
+    df_agg = geo_data()['df_agg']
     title = "Select countries to compare"
     if not selected_countries:
         fig = px.bar()
@@ -211,6 +212,7 @@ def update_comparison_chart(selected_countries):
     Input('world-map', 'clickData')
 )
 def update_regional_deep_dive(click_data):
+    df_agg = geo_data()['df_agg']
     if click_data is None:
         df_continent = df_agg.groupby('continent')['title_count'].sum().reset_index()
         fig = px.bar(df_continent, x='continent', y='title_count', color='continent')
@@ -232,6 +234,7 @@ def update_regional_deep_dive(click_data):
     Input('map-metric-selector', 'value')
 )
 def update_hub_map(selected_metric):
+    df_hubs = geo_data()['df_hubs']
     if df_hubs.empty:
         fig = px.bar()
         return style_bar_chart(fig, "Production Hub data not available.")
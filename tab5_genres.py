@@ -6,112 +6,125 @@ import plotly.express as px
 import pandas as pd
 import dash_bootstrap_components as dbc
 
-dash.register_page(__name__, name='Genre Intelligence', path='/genre-intelligence')
+from catalog import load_added_titles, title_genres
+from datastore import read_table
+from page_cache import page_data
 
-# --- 1. Load Pre-processed Data ---
-try:
-    df_edges = pd.read_parquet('genre_edges.parquet')
-    df_raw = pd.read_csv("netflix.csv")
-except FileNotFoundError:
-    layout = html.Div([
-        html.H1("Error: Data files not found.", className="text-danger"),
-        html.P("Please run 'prepare_talent_data.py' to generate .parquet files and ensure 'netflix.csv' is present.")
-    ])
-    raise FileNotFoundError("Missing data files. Run prep script.")
-
-# --- 2. Create the Co-occurrence Matrix (Feature 2) ---
-# We use a pivot table to create the matrix for the heatmap
-# We need to add the reverse relationships (source, target) -> (target, source)
-df_edges_reverse = df_edges.rename(columns={'source': 'target', 'target': 'source'})
-df_edges_full = pd.concat([df_edges, df_edges_reverse])
-
-# Pivot to create the matrix
-matrix_df = pd.pivot_table(df_edges_full, values='weight', index='source', columns='target', fill_value=0)
-
-# Create the heatmap figure
-fig_heatmap = px.imshow(
-    matrix_df,
-    title="Genre Co-occurrence Matrix",
-    color_continuous_scale='Reds' # Use a red color scale
-)
-# 
-fig_heatmap.update_layout(
-    template="plotly_dark",
-    font_color="white",
-    paper_bgcolor="rgba(0,0,0,0)",
-    plot_bgcolor="rgba(0,0,0,0)"
-)
-fig_heatmap.update_xaxes(side="bottom")
+dash.register_page(__name__, name='Genre Intelligence', path='/genre-intelligence')
 
+# Everything below is computed on the first request for this page (once per
+# worker), not at import.
+@page_data('Genre Intelligence')
+def genre_data():
+    # --- 1. Load Pre-processed Data ---
+    # Raises FileNotFoundError if the prep script has not been run
+    df_edges = read_table('genre_edges.parquet')
+
+    # --- 2. Create the Co-occurrence Matrix (Feature 2) ---
+    # We use a pivot table to create the matrix for the heatmap
+    # We need to add the reverse relationships (source, target) -> (target, source)
+    df_edges_reverse = df_edges.rename(columns={'source': 'target', 'target': 'source'})
+    df_edges_full = pd.concat([df_edges, df_edges_reverse])
+
+    # Pivot to create the matrix
+    matrix_df = pd.pivot_table(df_edges_full, values='weight', index='source', columns='target', fill_value=0)
+
+    # Create the heatmap figure
+    fig_heatmap = px.imshow(
+        matrix_df,
+        title="Genre Co-occurrence Matrix",
+        color_continuous_scale='Reds' # Use a red color scale
+    )
+    # 
+    fig_heatmap.update_layout(
+        template="plotly_dark",
+        font_color="white",
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)"
+    )
+    fig_heatmap.update_xaxes(side="bottom")
 
-# --- 3. Prepare Data for Trend Analysis (Feature 3) ---
-df_raw['date_added'] = pd.to_datetime(df_raw['date_added'], errors='coerce')
-df_raw['year_added'] = df_raw['date_added'].dt.year
-df_raw = df_raw.dropna(subset=['listed_in', 'year_added'])
+    # --- 3. Prepare Data for Trend Analysis (Feature 3) ---
+    # One row per (show_id, genre) from catalog.py, limited to titles with a valid date_added
+    df_added = load_added_titles()[['show_id', 'year_added']]
+    df_genre_trend = title_genres().merge(df_added, on='show_id')
 
-# Explode the 'listed_in' column
-df_genre_trend = df_raw.assign(genre=df_raw['listed_in'].str.split(', ')).explode('genre')
-df_genre_trend['genre'] = df_genre_trend['genre'].str.strip()
+    # Get a list of all unique genres for the filter
+    all_genres = sorted(df_genre_trend['genre'].unique())
 
-# Get a list of all unique genres for the filter
-ALL_GENRES = sorted(df_genre_trend['genre'].unique())
+    return {
+        'matrix_df': matrix_df,
+        'fig_heatmap': fig_heatmap,
+        'df_genre_trend': df_genre_trend,
+        'all_genres': all_genres,
+    }
 
 
 # --- 4. Define Page Layout ---
-layout = dbc.Container([
-    html.H1("Genre & Category Intelligence", className="mt-4 netflix-glow"),
-
-    # Row 1: Filters (Feature 1)
-    dbc.Row([
-        dbc.Col([
-            dbc.Card(
-                dbc.CardBody([
-                    html.H5("Genre Explorer", className="card-title"),
-                    dcc.Dropdown(
-                        id='genre-filter-dropdown',
-                        options=[{'label': g, 'value': g} for g in ALL_GENRES],
-                        value='Dramas', # Set a default
-                        placeholder="Select a genre..."
-                    )
-                ]),
-                color="dark"
-            )
-        ], width=12)
-    ], className="mt-4"),
+# A function, so Dash only builds it (and the data behind it) when the page is opened
+def layout(**kwargs):
+    try:
+        data = genre_data()
+    except FileNotFoundError:
+        return html.Div([
+            html.H1("Error: Data files not found.", className="text-danger"),
+            html.P("Please run 'prepare_talent_data.py' to generate .parquet files and ensure 'netflix.csv' is present.")
+        ])
+
+    return dbc.Container([
+        html.H1("Genre & Category Intelligence", className="mt-4 netflix-glow"),
+
+        # Row 1: Filters (Feature 1)
+        dbc.Row([
+            dbc.Col([
+                dbc.Card(
+                    dbc.CardBody([
+                        html.H5("Genre Explorer", className="card-title"),
+                        dcc.Dropdown(
+                            id='genre-filter-dropdown',
+                            options=[{'label': g, 'value': g} for g in data['all_genres']],
+                            value='Dramas', # Set a default
+                            placeholder="Select a genre..."
+                        )
+                    ]),
+                    color="dark"
+                )
+            ], width=12)
+        ], className="mt-4"),
     
-    # Row 2: Charts & Analysis
-    dbc.Row([
-        # Column 1: Trend & Gaps
-        dbc.Col([
-            # Feature 3: Trend Analysis
-            dbc.Card(
-                dcc.Graph(id='genre-trend-graph'),
-                color="dark",
-                body=True,
-                className="mb-4"
-            ),
+        # Row 2: Charts & Analysis
+        dbc.Row([
+            # Column 1: Trend & Gaps
+            dbc.Col([
+                # Feature 3: Trend Analysis
+                dbc.Card(
+                    dcc.Graph(id='genre-trend-graph'),
+                    color="dark",
+                    body=True,
+                    className="mb-4"
+                ),
             
-            # Features 4 & 5: Opportunity / Gap Analysis
-            dbc.Card(
-                [
-                    dbc.CardHeader(html.H4("Competitive Gap Analysis")),
-                    dbc.CardBody(id="gap-analysis-card")
-                ],
-                color="dark",
-                inverse=True
-            )
-        ], width=4),
-
-        # Column 2: Co-occurrence Matrix
-        dbc.Col([
-            dbc.Card(
-                dcc.Graph(id='co-occurrence-heatmap', figure=fig_heatmap, style={'height': '700px'}),
-                color="dark",
-                body=True
-            )
-        ], width=8)
-    ], className="mt-4 mb-4")
-], fluid=True)
+                # Features 4 & 5: Opportunity / Gap Analysis
+                dbc.Card(
+                    [
+                        dbc.CardHeader(html.H4("Competitive Gap Analysis")),
+                        dbc.CardBody(id="gap-analysis-card")
+                    ],
+                    color="dark",
+                    inverse=True
+                )
+            ], width=4),
+
+            # Column 2: Co-occurrence Matrix
+            dbc.Col([
+                dbc.Card(
+                    dcc.Graph(id='co-occurrence-heatmap', figure=data['fig_heatmap'], style={'height': '700px'}),
+                    color="dark",
+                    body=True
+                )
+            ], width=8)
+        ], className="mt-4 mb-4")
+    ], fluid=True)
 
 
 # --- 5. Define Callback ---
@@ -125,6 +138,10 @@ def update_genre_analysis(selected_genre):
     if not selected_genre:
         return px.line(title="Select a genre"), "Select a genre to see gap analysis."
 
+    data = genre_data()
+    df_genre_trend = data['df_genre_trend']
+    matrix_df = data['matrix_df']
+
     # --- 1. Update Trend Graph ---
     df_filtered = df_genre_trend[df_genre_trend['genre'] == selected_genre]
     df_trend = df_filtered.groupby('year_added').size().reset_index(name='count')
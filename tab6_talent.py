@@ -1,149 +1,316 @@
+import functools
+import json
+import os
+
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State
 import plotly.express as px
-import pandas as pd
+import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 # --- MODIFICATION 1: 'dash_cytoscape' import removed ---
 # import dash_cytoscape as cyto 
 import dash_ag_grid as dag  # Import dash_ag_grid
+import numpy as np
+
+from catalog import MISSING_MARKERS
+from datastore import arrow_string_dtype, mapped_table, read_table
+from grid_query import (EMPTY_RESPONSE, block_response, filter_frame, model_key, rows_response, sort_frame,
+                        valid_request)
+from page_cache import page_data
+from talent_graph import connect, ego_layout
+from talent_lookup import talent_index, talent_stats, talent_titles
+from talent_search import SEARCH_LIMIT, search_talent
+from talent_similarity import similar_talent
 
 dash.register_page(__name__, name='Creator & Talent Hub', path='/talent-hub')
 
+CENTRALITY_PATH = 'talent_centrality.parquet'
+
+# Columns of rising_stars.parquet shown in the Rising Stars grid
+RISING_COLUMNS = ['name', 'growth_slope', 'total_recent_titles', 'r_squared', 'total_titles',
+                  'primary_role', 'top_country']
+
 # --- 1. Load Pre-processed Data ---
-try:
-    df_portfolio = pd.read_parquet('talent_portfolio.parquet')
-    df_edges = pd.read_parquet('talent_edges.parquet')
-    df_rising_stars = pd.read_parquet('rising_stars.parquet')
-except FileNotFoundError:
-    layout = html.Div([
-        html.H1("Error: Data files not found."),
-        html.P("Please run 'prepare_talent_data.py' first to generate the required .parquet files.")
-    ])
-    # Stop here if files are missing
-    raise FileNotFoundError("Missing .parquet files. Run 'prepare_talent_data.py'.")
+# Computed on the first request for this page (once per worker), not at import.
+# Raises FileNotFoundError if 'prepare_talent_data.py' has not been run.
+# The portfolio itself is not loaded: the callbacks read one person's stats
+# and titles at a time through talent_lookup's offset index.
+@page_data('Creator & Talent Hub')
+def talent_data():
+    # People are int32 talent_id codes in the prepared files; names are
+    # looked up in the dictionary only for display
+    df_dictionary = read_table('talent_dictionary.parquet')
+    # Every talent is scored by the prep script; show the ones whose output is growing
+    df_scores = read_table('rising_stars.parquet')
+    df_rising_stars = df_scores[(df_scores['growth_slope'] > 0) & (df_scores['total_recent_titles'] >= 2)]
+    df_rising_stars = df_rising_stars.sort_values(by=['growth_slope', 'total_recent_titles'], ascending=False)
+    # Only the grid's columns are kept; the grid pages through them on the server
+    df_rising_stars = df_rising_stars[RISING_COLUMNS].reset_index(drop=True)
 
+    # --- 2. Create Master Lists for Controls ---
+    # The dictionary is sorted by name, and talent_id is the row position.
+    # The dropdown is searched server-side (search_talent_options); before
+    # anything is typed it offers the most prolific people.
+    talent_names = df_dictionary['name'].to_numpy()
+    by_titles = np.argsort(-talent_index()['title_count'], kind='stable')
+    popular_ids = [int(talent_id) for talent_id in by_titles[:SEARCH_LIMIT + len(MISSING_MARKERS)]
+                   if talent_names[talent_id] not in MISSING_MARKERS][:SEARCH_LIMIT]
 
-# --- 2. Create Master Lists for Controls ---
-TALENT_LIST = sorted(df_portfolio['name'].unique())
+    return {
+        'df_rising_stars': df_rising_stars,
+        'talent_names': talent_names,
+        'popular_ids': popular_ids,
+    }
+
+
+def talent_option(talent_id, search_value=None):
+    """Dropdown option for one person.
+
+    The dropdown still filters the options it is given by the typed text;
+    putting that text in the option's 'search' field keeps the server's
+    matches (including fuzzy ones) from being filtered out again.
+    """
+    option = {'label': talent_data()['talent_names'][talent_id], 'value': talent_id}
+    if search_value:
+        option['search'] = search_value
+    return option
 
 
 # --- 3. Define Page Layout ---
-layout = dbc.Container([
-    html.H1("🎬 Creator & Talent Hub", className="netflix-glow"),
+# A function, so Dash only builds it (and the data behind it) when the page is opened
+def layout(**kwargs):
+    try:
+        data = talent_data()
+    except FileNotFoundError:
+        return html.Div([
+            html.H1("Error: Data files not found."),
+            html.P("Please run 'prepare_talent_data.py' first to generate the required .parquet files.")
+        ])
+
+    return dbc.Container([
+        html.H1("🎬 Creator & Talent Hub", className="netflix-glow"),
     
-    dbc.Tabs([
-        # --- TAB 1: TALENT EXPLORER (Features 1-4) ---
-        dbc.Tab(label='Talent Explorer', children=[
-            dbc.Row([
-                # -- Left Column: Controls & Portfolio --
-                dbc.Col([
-                    html.H4("Talent Search", className="text-light"),
-                    dcc.Dropdown(
-                        id='talent-search-dropdown',
-                        options=[{'label': name, 'value': name} for name in TALENT_LIST],
-                        placeholder="Search for an Actor or Director...",
-                    ),
+        dbc.Tabs([
+            # --- TAB 1: TALENT EXPLORER (Features 1-4) ---
+            dbc.Tab(label='Talent Explorer', children=[
+                dbc.Row([
+                    # -- Left Column: Controls & Portfolio --
+                    dbc.Col([
+                        html.H4("Talent Search", className="text-light"),
+                        dcc.Dropdown(
+                            id='talent-search-dropdown',
+                            options=[talent_option(talent_id) for talent_id in data['popular_ids']],
+                            placeholder="Search for an Actor or Director...",
+                        ),
                     
-                    html.H4("Portfolio Analysis", className="mt-4 text-light"),
-                    dbc.Card(id='portfolio-stats-card', body=True, className="mb-3", color="dark"),
+                        html.H4("Portfolio Analysis", className="mt-4 text-light"),
+                        dbc.Card(id='portfolio-stats-card', body=True, className="mb-3", color="dark"),
                     
-                    dag.AgGrid(
-                        id='portfolio-table-grid',
-                        className="ag-theme-alpine-dark", 
-                        style={"height": "300px"},
-                        columnDefs=[
-                            {"field": "title", "sortable": True, "filter": True},
-                            {"field": "role", "sortable": True, "filter": "agSetColumnFilter"},
-                            {"field": "release_year", "sortable": True},
-                        ],
-                        defaultColDef={"resizable": True},
-                        dashGridOptions={"domLayout": "autoHeight"},
-                    ),
+                        # Rows are served a page at a time by serve_portfolio_rows,
+                        # so prolific people do not ship their whole filmography
+                        dag.AgGrid(
+                            id='portfolio-table-grid',
+                            className="ag-theme-alpine-dark", 
+                            style={"height": "300px"},
+                            columnDefs=[
+                                {"field": "title", "sortable": True, "filter": "agTextColumnFilter"},
+                                {"field": "role", "sortable": True, "filter": "agTextColumnFilter"},
+                                {"field": "release_year", "sortable": True, "filter": "agNumberColumnFilter"},
+                            ],
+                            defaultColDef={"resizable": True},
+                            rowModelType="infinite",
+                            dashGridOptions={
+                                "pagination": True,
+                                "paginationPageSize": 20,
+                                "cacheBlockSize": 20,
+                                "maxBlocksInCache": 10,
+                                "rowBuffer": 0,
+                            },
+                        ),
+                        dcc.Store(id='portfolio-grid-reset'),
+                        html.Div([
+                            html.A("Export CSV", id='portfolio-export-csv',
+                                   className="btn btn-sm btn-outline-light me-2"),
+                            html.A("Export Parquet", id='portfolio-export-parquet',
+                                   className="btn btn-sm btn-outline-light"),
+                        ], id='portfolio-export-links', className="mt-2", style={'display': 'none'}),
                     
-                    html.H4("Portfolio Diversity", className="mt-4 text-light"),
-                    dcc.Graph(id='diversity-pie-chart')
+                        html.H4("Portfolio Diversity", className="mt-4 text-light"),
+                        dcc.Graph(id='diversity-pie-chart'),
 
-                ], width=5),
+                        html.H4("People Like This", className="mt-4 text-light"),
+                        html.P("Most similar genres, production countries and collaborators.", className="text-muted"),
+                        html.Div(id='similar-talent-list')
+
+                    ], width=5),
                 
-                # -- Right Column: Network Vis --
-                dbc.Col([
-                    html.H4("Collaboration Network", className="text-light"),
-                    dbc.Alert("Shows this person and their direct collaborators.", color="info"),
+                    # -- Right Column: Network Vis --
+                    dbc.Col([
+                        html.H4("Collaboration Network", className="text-light"),
+                        dbc.Alert("Shows this person, their strongest collaborators, and who those collaborators work with most. "
+                                  "Lines are shared titles.", color="info"),
                     
-                    # --- MODIFICATION 2: Cytoscape component removed and replaced ---
-                    # The 'cyto.Cytoscape' component was removed to avoid the error.
-                    dbc.Alert(
-                        "Network graph feature is temporarily disabled due to hosting resource limitations.",
-                        color="warning",
-                        className="mt-3"
-                    )
-                    # --- End of MODIFICATION 2 ---
-
-                ], width=7)
-            ])
-        ]),
-        # --- TAB 2: RISING STARS (Feature 5) ---
-        dbc.Tab(label='Rising Stars', children=[
-            html.H4("Rising Stars Identification", className="mt-3 text-light"),
-            dbc.Alert("Talent with the highest positive growth in new titles over the past 5 years.", color="info"),
+                        # A WebGL scatter of the person's ego network (see talent_graph.py),
+                        # in place of the Cytoscape component
+                        dcc.Graph(id='collaboration-network-graph', style={"height": "650px"})
+
+                    ], width=7)
+                ])
+            ]),
+            # --- TAB 2: RISING STARS (Feature 5) ---
+            dbc.Tab(label='Rising Stars', children=[
+                html.H4("Rising Stars Identification", className="mt-3 text-light"),
+                dbc.Alert("Talent with a positive growth trend in new titles over the most recent years. Filter by role or country to compare within a group.", color="info"),
             
-            dag.AgGrid(
-                id='rising-stars-grid',
-                className="ag-theme-alpine-dark",
-                rowData=df_rising_stars.to_dict('records'),
-                columnDefs=[
-                    {"field": "name", "sortable": True, "filter": True},
-                    {"field": "growth_slope", "headerName": "Growth Trend Score", "sortable": True, "valueFormatter": {"function": "d3.format('.2f')(params.value)"}},
-                    {"field": "total_recent_titles", "headerName": "Total Recent Titles", "sortable": True},
-                ],
-                defaultColDef={"sortable": True, "resizable": True},
-                style={"height": "600px", "width": "100%"},
-            )
+                # Served a page at a time, sorted and filtered on the server
+                dag.AgGrid(
+                    id='rising-stars-grid',
+                    className="ag-theme-alpine-dark",
+                    columnDefs=[
+                        {"field": "name", "sortable": True, "filter": "agTextColumnFilter"},
+                        {"field": "growth_slope", "headerName": "Growth Trend Score", "sortable": True, "valueFormatter": {"function": "d3.format('.2f')(params.value)"}},
+                        {"field": "total_recent_titles", "headerName": "Total Recent Titles", "sortable": True},
+                        {"field": "r_squared", "headerName": "Trend Fit (R²)", "sortable": True, "valueFormatter": {"function": "d3.format('.2f')(params.value)"}},
+                        {"field": "total_titles", "headerName": "Career Titles", "sortable": True},
+                        {"field": "primary_role", "headerName": "Role", "sortable": True, "filter": "agTextColumnFilter"},
+                        {"field": "top_country", "headerName": "Top Country", "sortable": True, "filter": "agTextColumnFilter"},
+                    ],
+                    defaultColDef={"sortable": True, "resizable": True},
+                    rowModelType="infinite",
+                    dashGridOptions={
+                        "pagination": True,
+                        "paginationPageSize": 50,
+                        "cacheBlockSize": 50,
+                        "maxBlocksInCache": 10,
+                    },
+                    style={"height": "600px", "width": "100%"},
+                )
+            ]),
+            # --- TAB 3: NETWORK INFLUENCE ---
+            dbc.Tab(label='Network Influence', children=[
+                html.H4("Network Influence", className="mt-3 text-light"),
+                dbc.Alert("Where each person sits in the collaboration network: how many people they have worked with, "
+                          "PageRank (ties to well-connected people), betweenness (how often they bridge otherwise "
+                          "distant people) and the community they work in most. Sort or filter any column.", color="info"),
+                # Served a page at a time, sorted and filtered on the server
+                dag.AgGrid(
+                    id='centrality-grid',
+                    className="ag-theme-alpine-dark",
+                    columnDefs=[
+                        {"field": "name", "filter": "agTextColumnFilter"},
+                        {"field": "primary_role", "headerName": "Role", "filter": "agTextColumnFilter"},
+                        {"field": "collaborators", "headerName": "Collaborators", "filter": "agNumberColumnFilter"},
+                        {"field": "weighted_degree", "headerName": "Shared Credits", "filter": "agNumberColumnFilter"},
+                        {"field": "pagerank", "headerName": "PageRank", "sort": "desc", "filter": "agNumberColumnFilter",
+                         "valueFormatter": {"function": "d3.format('.3e')(params.value)"}},
+                        {"field": "betweenness", "headerName": "Betweenness", "filter": "agNumberColumnFilter",
+                         "valueFormatter": {"function": "d3.format('.2e')(params.value)"}},
+                        {"field": "community", "headerName": "Community", "filter": "agNumberColumnFilter"},
+                        {"field": "community_size", "headerName": "Community Size", "filter": "agNumberColumnFilter"},
+                    ],
+                    defaultColDef={"sortable": True, "resizable": True},
+                    rowModelType="infinite",
+                    dashGridOptions={
+                        "pagination": True,
+                        "paginationPageSize": 50,
+                        "cacheBlockSize": 50,
+                        "maxBlocksInCache": 10,
+                    },
+                    style={"height": "600px", "width": "100%"},
+                )
+            ]),
+            # --- TAB 4: DEGREES OF SEPARATION ---
+            dbc.Tab(label='Degrees of Separation', children=[
+                html.H4("Connect Two People", className="mt-3 text-light"),
+                dbc.Alert("Finds the chain of collaborations linking two people, with the titles each pair made together. "
+                          "'Strongest ties' prefers people who worked together often over the fewest steps.", color="info"),
+                dbc.Row([
+                    dbc.Col(dcc.Dropdown(
+                        id='path-from-dropdown',
+                        options=[talent_option(talent_id) for talent_id in data['popular_ids']],
+                        placeholder="From...",
+                    ), width=4),
+                    dbc.Col(dcc.Dropdown(
+                        id='path-to-dropdown',
+                        options=[talent_option(talent_id) for talent_id in data['popular_ids']],
+                        placeholder="To...",
+                    ), width=4),
+                    dbc.Col(dbc.RadioItems(
+                        id='path-mode-radio',
+                        options=[
+                            {'label': 'Fewest steps', 'value': 'fewest'},
+                            {'label': 'Strongest ties', 'value': 'strongest'},
+                        ],
+                        value='fewest',
+                        inline=True,
+                        className="text-light",
+                    ), width=4),
+                ]),
+                html.Div(id='path-result', className="mt-3"),
+            ])
         ])
-    ])
-], fluid=True)
+    ], fluid=True)
 
 # --- 4. Define Callbacks ---
+def search_talent_options(search_value, selected_id):
+    """The top matches for the typed text (the selected person always stays an option)."""
+    talent_ids = search_talent(search_value) if search_value else talent_data()['popular_ids']
+    if selected_id is not None and selected_id not in talent_ids:
+        talent_ids = [selected_id] + talent_ids
+    return [talent_option(talent_id, search_value) for talent_id in talent_ids]
+
+
+# Every talent picker on the page is searched on the server the same way
+for dropdown_id in ['talent-search-dropdown', 'path-from-dropdown', 'path-to-dropdown']:
+    dash.callback(
+        Output(dropdown_id, 'options'),
+        Input(dropdown_id, 'search_value'),
+        State(dropdown_id, 'value'),
+        prevent_initial_call=True,
+    )(search_talent_options)
+
+
 @dash.callback(
     Output('portfolio-stats-card', 'children'),
-    Output('portfolio-table-grid', 'rowData'),
     Output('diversity-pie-chart', 'figure'),
-    # --- MODIFICATION 3: The Output for the network graph has been removed ---
-    # Output('collaboration-network-graph', 'elements'), 
+    Output('collaboration-network-graph', 'figure'),
+    Output('similar-talent-list', 'children'),
     Input('talent-search-dropdown', 'value')
 )
-def update_talent_page(selected_name):
-    if not selected_name:
+def update_talent_page(selected_id):
+    if selected_id is None:
         fig_pie = px.pie(title="Select a name")
         fig_pie.update_layout(template="plotly_dark", title_font_color="white")
-        # --- MODIFICATION 4: Removed the 4th item from the default return list ---
-        return ["Select a name", [], fig_pie]
+        fig_network = go.Figure(layout=dict(title="Select a name", template="plotly_dark"))
+        return ["Select a name", fig_pie, fig_network, None]
 
-    # --- 1. Filter for Portfolio (Features 3 & 4) ---
-    df_person_portfolio = df_portfolio[df_portfolio['name'] == selected_name]
+    selected_name = talent_data()['talent_names'][selected_id]
+
+    # --- 1. Look Up the Precomputed Stats (Features 3 & 4) ---
+    stats = talent_stats(selected_id)
     
     # --- 2. Build Portfolio Stats Card (Feature 3) ---
-    total_titles = df_person_portfolio['show_id'].nunique()
-    first_year = df_person_portfolio['release_year'].min()
-    last_year = df_person_portfolio['release_year'].max()
-    roles = ", ".join(df_person_portfolio['role'].unique())
-    
+    centrality = talent_centrality(selected_id)
+    if centrality is None:
+        network_line = html.P("Run 'prepare_talent_data.py' to compute network metrics.", className="text-muted")
+    else:
+        network_line = html.P(f"Collaborators: {centrality['collaborators']} "
+                              f"(community #{centrality['community']}, {centrality['community_size']} people)",
+                              className="card-text")
     stats_card = [
         html.H5(selected_name, className="card-title"),
-        html.P(f"Roles: {roles}", className="card-text"),
-        html.P(f"Total Titles: {total_titles}", className="card-text"),
-        html.P(f"Active: {first_year} - {last_year}", className="card-text"),
+        html.P(f"Roles: {', '.join(stats['roles'])}", className="card-text"),
+        html.P(f"Total Titles: {stats['title_count']}", className="card-text"),
+        html.P(f"Active: {stats['first_year']} - {stats['last_year']}", className="card-text"),
+        network_line,
     ]
     
-    # --- 3. Build Portfolio Table (Feature 3) ---
-    portfolio_table_data = df_person_portfolio[['title', 'role', 'release_year']].drop_duplicates().to_dict('records')
+    # --- 3. The Portfolio Table is served by serve_portfolio_rows (Feature 3) ---
 
     # --- 4. Build Diversity Pie Chart (Feature 4) ---
-    df_country_count = df_person_portfolio.groupby('country').size().reset_index(name='count')
     fig_pie = px.pie(
-        df_country_count,
-        names='country',
-        values='count',
+        names=stats['countries'],
+        values=stats['country_rows'],
         title="Portfolio by Country of Production"
     )
     fig_pie.update_layout(
@@ -153,9 +320,197 @@ def update_talent_page(selected_name):
         font_color="white"
     )
 
-    # --- MODIFICATION 5: The entire network graph logic block has been deleted ---
-    # (The block that started with "# --- 5. Build Network Graph (Feature 2) ---")
-    # --- End of MODIFICATION 5 ---
+    # --- 5. Build Network Graph (Feature 2) ---
+    fig_network = network_figure(selected_id)
+
+    # --- 6. List Similar Talent ---
+    names = talent_data()['talent_names']
+    try:
+        similar_ids, scores = similar_talent(selected_id)
+    except FileNotFoundError:
+        # Built from the genres of 'netflix.csv', so absent until the prep script has seen it
+        similar_ids, scores = None, None
+    if similar_ids is None:
+        similar_list = html.P("Run 'prepare_talent_data.py' with 'netflix.csv' present to find similar people.",
+                              className="text-muted")
+    elif similar_ids:
+        similar_list = dbc.ListGroup([
+            dbc.ListGroupItem(f"{names[talent_id]} ({score:.0%} overlap)", color="dark")
+            for talent_id, score in zip(similar_ids, scores) if names[talent_id] not in MISSING_MARKERS
+        ])
+    else:
+        similar_list = html.P("No similar people found.", className="text-muted")
+
+    return stats_card, fig_pie, fig_network, similar_list
+
+
+# Node colors by distance from the selected person
+HOP_COLORS = ['#E50914', '#F5C518', '#6C757D']
+
+
+def network_figure(selected_id):
+    """The selected person's ego network, drawn with WebGL scatter traces."""
+    ego = ego_layout(selected_id)
+    names = talent_data()['talent_names']
+    position = {node: i for i, node in enumerate(ego['nodes'].tolist())}
+
+    # All edges as one line trace, segments separated by None
+    edge_x, edge_y = [], []
+    for source, target in zip(ego['sources'].tolist(), ego['targets'].tolist()):
+        i, j = position[source], position[target]
+        edge_x += [ego['x'][i], ego['x'][j], None]
+        edge_y += [ego['y'][i], ego['y'][j], None]
+
+    # Shared titles with the selected person, for sizing and hover text
+    shared = dict.fromkeys(ego['nodes'].tolist(), 0)
+    for source, target, weight in zip(ego['sources'].tolist(), ego['targets'].tolist(), ego['weights'].tolist()):
+        if source == selected_id:
+            shared[target] = weight
+        elif target == selected_id:
+            shared[source] = weight
+    hover = [names[node] if node == selected_id else f"{names[node]}<br>{shared[node]} shared titles"
+             for node in ego['nodes'].tolist()]
+    sizes = [28 if node == selected_id else 10 + 3 * min(shared[node], 6) for node in ego['nodes'].tolist()]
+
+    fig = go.Figure([
+        go.Scattergl(x=edge_x, y=edge_y, mode='lines', hoverinfo='skip',
+                     line=dict(width=1, color='rgba(200, 200, 200, 0.35)')),
+        go.Scattergl(x=ego['x'], y=ego['y'], mode='markers', hovertext=hover, hoverinfo='text',
+                     marker=dict(size=sizes, color=[HOP_COLORS[hop] for hop in ego['hops'].tolist()],
+                                 line=dict(width=1, color='white'))),
+    ])
+    fig.update_layout(
+        title=f"{names[selected_id]}: {int((ego['hops'] == 1).sum())} direct collaborators shown",
+        showlegend=False,
+        template="plotly_dark",
+        font_color="white",
+        margin=dict(t=40, l=10, r=10, b=10),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, scaleanchor='x'),
+    )
+    return fig
+
+
+# Start the portfolio grid over (it then requests its first page) when the person changes
+dash.clientside_callback(
+    """
+    function(selected_id) {
+        dash_ag_grid.getApiAsync('portfolio-table-grid').then((api) => api.purgeInfiniteCache());
+        return window.dash_clientside.no_update;
+    }
+    """,
+    Output('portfolio-grid-reset', 'data'),
+    Input('talent-search-dropdown', 'value'),
+    prevent_initial_call=True,
+)
+
+
+@dash.callback(
+    Output('portfolio-export-csv', 'href'),
+    Output('portfolio-export-parquet', 'href'),
+    Output('portfolio-export-links', 'style'),
+    Input('talent-search-dropdown', 'value'),
+)
+def update_portfolio_export_links(selected_id):
+    if selected_id is None:
+        return None, None, {'display': 'none'}
+    return f"/export/talent/{selected_id}.csv", f"/export/talent/{selected_id}.parquet", {}
+
+
+@dash.callback(
+    Output('portfolio-table-grid', 'getRowsResponse'),
+    Input('portfolio-table-grid', 'getRowsRequest'),
+    State('talent-search-dropdown', 'value'),
+)
+def serve_portfolio_rows(request, selected_id):
+    """One page of the selected person's titles, sliced straight from the offset index."""
+    if request is None or selected_id is None:
+        return EMPTY_RESPONSE
+    return rows_response(talent_titles(selected_id), request, columns=['title', 'role', 'release_year'])
+
+
+def talent_centrality(talent_id):
+    """One person's network metrics, or None if the table is missing or from another prep run."""
+    try:
+        table = mapped_table(CENTRALITY_PATH)
+    except FileNotFoundError:
+        return None
+    # The table is in talent_id order: the person's row is at that position
+    if talent_id >= table.num_rows:
+        return None
+    row = table.slice(talent_id, 1).to_pylist()[0]
+    return row if row['talent_id'] == talent_id else None
+
+
+# Sorted or filtered network metrics kept per worker: the grid requests block
+# after block of the same result while the user scrolls or pages
+CENTRALITY_CACHE_SIZE = 16
+
+@functools.lru_cache(maxsize=CENTRALITY_CACHE_SIZE)
+def centrality_result(key, mtime_ns):
+    # mtime_ns keys the result to the table it was built from
+    sort_model, filter_model = json.loads(key)
+    df = mapped_table(CENTRALITY_PATH).to_pandas(types_mapper=arrow_string_dtype)
+    return sort_frame(filter_frame(df, filter_model), sort_model)
+
+
+@dash.callback(
+    Output('rising-stars-grid', 'getRowsResponse'),
+    Input('rising-stars-grid', 'getRowsRequest'),
+)
+def serve_rising_star_rows(request):
+    """One page of the rising stars, with the grid's sort and filters applied on the server."""
+    return rows_response(talent_data()['df_rising_stars'], request)
+
+
+@dash.callback(
+    Output('centrality-grid', 'getRowsResponse'),
+    Input('centrality-grid', 'getRowsRequest'),
+)
+def serve_centrality_rows(request):
+    """One page of the network metrics table, with the grid's sort and filters applied."""
+    if request is None or not valid_request(request):
+        return EMPTY_RESPONSE
+    try:
+        if not request.get('sortModel') and not request.get('filterModel'):
+            # Unsorted blocks are sliced straight from the mapped table
+            return rows_response(mapped_table(CENTRALITY_PATH), request)
+        result = centrality_result(model_key(request), os.stat(CENTRALITY_PATH).st_mtime_ns)
+    except FileNotFoundError:
+        # The centrality stage has not been run
+        return EMPTY_RESPONSE
+    return block_response(result, request)
+
+
+@dash.callback(
+    Output('path-result', 'children'),
+    Input('path-from-dropdown', 'value'),
+    Input('path-to-dropdown', 'value'),
+    Input('path-mode-radio', 'value'),
+)
+def update_connection(source_id, target_id, mode):
+    if source_id is None or target_id is None:
+        return dbc.Alert("Pick two people to connect.", color="secondary")
+
+    names = talent_data()['talent_names']
+    result = connect(source_id, target_id, mode)
+    if result['status'] == 'timeout':
+        return dbc.Alert("The search took too long; try 'Fewest steps' or another pair.", color="warning")
+    if result['status'] == 'unconnected':
+        return dbc.Alert(f"{names[source_id]} and {names[target_id]} are not connected through any shared titles.",
+                         color="warning")
 
-    # --- MODIFICATION 6: Removed 'elements' from the final return statement ---
-    return stats_card, portfolio_table_data, fig_pie
+    n_steps = len(result['path']) - 1
+    steps = []
+    for step in result['steps']:
+        titles = [f"{title['title']} ({title['release_year']})" for title in step['titles']]
+        more = f" and {len(titles) - 3} more" if len(titles) > 3 else ''
+        steps.append(html.Li([
+            html.Strong(f"{names[step['from']]} → {names[step['to']]}"),
+            html.Span(f": {', '.join(titles[:3])}{more}"),
+        ], className="card-text"))
+    return dbc.Card([
+        html.H5(f"{names[source_id]} to {names[target_id]}: "
+                f"{n_steps} degree{'s' if n_steps != 1 else ''} of separation", className="card-title"),
+        html.Ol(steps),
+    ], body=True, color="dark")
@@ -0,0 +1,302 @@
+# Collaboration graph queries over memory-mapped CSR arrays.
+#
+# The edges stage of prepare_talent_data.py stores the collaboration network
+# in compressed sparse row form, indexed by talent_id:
+#
+#   talent_graph/neighbors.npy   int32 collaborator talent_ids, row by row
+#   talent_graph/weights.npy     int32 shared titles with each collaborator
+#   talent_graph/offsets.npy     int64 start of each talent's row (one extra at the end)
+#
+# Each row lists a person's collaborators strongest first, so "top-k
+# collaborators" is a slice, and a small ego network is a handful of slices.
+# The arrays are memory-mapped (shared by every worker through the page
+# cache) instead of building a networkx graph of the whole network; networkx
+# only lays out the few dozen nodes of one ego network, and those layouts
+# are kept in a bounded cache.
+#
+# Paths between two people (degrees of separation) are searched on the same
+# arrays: fewest steps with a bidirectional, level-at-a-time BFS (each level
+# expanded with numpy), strongest ties with Dijkstra. Both stop at a time
+# budget, and recent answers are cached.
+
+import functools
+import heapq
+import os
+import time
+
+import networkx as nx
+import numpy as np
+
+from datastore import load_array
+from talent_lookup import talent_titles
+
+GRAPH_DIR = 'talent_graph'
+# offsets last: readers reload the graph when its mtime changes
+GRAPH_ARRAYS = ['neighbors', 'weights', 'offsets']
+
+# Ego network size: the strongest direct collaborators, then each one's
+# strongest collaborators outside the network, up to EGO_MAX_NODES people
+EGO_NEIGHBORS = 15
+EGO_SECOND_HOP = 4
+EGO_MAX_NODES = 60
+
+# Ego network layouts kept per worker
+LAYOUT_CACHE_SIZE = 256
+
+# Seconds a path search may take before giving up, and answers kept per worker
+PATH_TIME_BUDGET = 2.0
+PATH_CACHE_SIZE = 512
+
+
+def graph_path(name):
+    return os.path.join(GRAPH_DIR, f"{name}.npy")
+
+
+# --- 1. Building ---
+def build_csr(source, target, weight, n_talents):
+    """CSR arrays for an undirected weighted edge list (each edge stored once).
+
+    Rows are ordered by weight (descending), then neighbor talent_id.
+    """
+    rows = np.concatenate([source, target]).astype(np.int32)
+    neighbors = np.concatenate([target, source]).astype(np.int32)
+    weights = np.concatenate([weight, weight]).astype(np.int32)
+    order = np.lexsort((neighbors, -weights, rows))
+    return {
+        'neighbors': neighbors[order],
+        'weights': weights[order],
+        'offsets': np.searchsorted(rows[order], np.arange(n_talents + 1)).astype(np.int64),
+    }
+
+
+# --- 2. Queries ---
+@functools.lru_cache(maxsize=2)
+def _load_graph(mtime_ns):
+    return {name: load_array(graph_path(name)) for name in GRAPH_ARRAYS}
+
+
+def graph_version():
+    """Changes whenever the prep script rewrites the graph.
+
+    Raises FileNotFoundError if the prep script has not been run.
+    """
+    return os.stat(graph_path('offsets')).st_mtime_ns
+
+
+def talent_graph():
+    """The memory-mapped CSR arrays."""
+    return _load_graph(graph_version())
+
+
+def collaborators(talent_id, limit=None):
+    """(talent_ids, shared title counts) of one person's collaborators, strongest first."""
+    graph = talent_graph()
+    start, stop = graph['offsets'][talent_id:talent_id + 2]
+    if limit is not None:
+        stop = min(stop, start + limit)
+    return graph['neighbors'][start:stop], graph['weights'][start:stop]
+
+
+def ego_network(talent_id, limit=EGO_NEIGHBORS, second_hop=EGO_SECOND_HOP, max_nodes=EGO_MAX_NODES):
+    """A person, their strongest collaborators and those collaborators' strongest ones.
+
+    Returns (nodes, hops, edges): talent_ids, each node's distance from the
+    person (0, 1 or 2), and (u, v, weight) arrays for every edge between two
+    of the nodes.
+    """
+    nodes = {talent_id: 0}
+    first, _ = collaborators(talent_id, limit)
+    for neighbor in first.tolist():
+        nodes.setdefault(neighbor, 1)
+    for neighbor in first.tolist():
+        if len(nodes) >= max_nodes:
+            break
+        # Look a little further than second_hop, as some are already in
+        second, _ = collaborators(neighbor, second_hop + limit)
+        added = 0
+        for other in second.tolist():
+            if added == second_hop or len(nodes) >= max_nodes:
+                break
+            if other not in nodes:
+                nodes[other] = 2
+                added += 1
+
+    node_ids = np.fromiter(nodes, dtype=np.int32, count=len(nodes))
+    hops = np.fromiter(nodes.values(), dtype=np.int8, count=len(nodes))
+    graph = talent_graph()
+    sources, targets, weights = [], [], []
+    for node in node_ids.tolist():
+        start, stop = graph['offsets'][node:node + 2]
+        row = graph['neighbors'][start:stop]
+        # Each edge once, from its lower talent_id end
+        keep = (row > node) & np.isin(row, node_ids)
+        sources.append(np.full(int(keep.sum()), node, dtype=np.int32))
+        targets.append(row[keep])
+        weights.append(graph['weights'][start:stop][keep])
+    edges = (np.concatenate(sources), np.concatenate(targets), np.concatenate(weights))
+    return node_ids, hops, edges
+
+
+@functools.lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def _ego_layout(talent_id, version):
+    node_ids, hops, (sources, targets, weights) = ego_network(talent_id)
+    g = nx.Graph()
+    g.add_nodes_from(node_ids.tolist())
+    g.add_weighted_edges_from(zip(sources.tolist(), targets.tolist(), weights.tolist()))
+    positions = nx.spring_layout(g, weight='weight', seed=0, center=(0, 0))
+    xy = np.array([positions[node] for node in node_ids.tolist()]).reshape(-1, 2)
+    return {'nodes': node_ids, 'hops': hops, 'x': xy[:, 0], 'y': xy[:, 1],
+            'sources': sources, 'targets': targets, 'weights': weights}
+
+
+def ego_layout(talent_id):
+    """The person's ego network with node positions (cached per graph version)."""
+    return _ego_layout(talent_id, graph_version())
+
+
+# --- 3. Degrees of Separation ---
+def _expand(graph, frontier):
+    """(neighbor, parent) pairs for every edge out of a frontier, in one gather."""
+    offsets = graph['offsets']
+    starts = offsets[frontier]
+    lengths = offsets[frontier + 1] - starts
+    if not lengths.sum():
+        return np.array([], dtype=np.int32), np.array([], dtype=np.int32)
+    # Positions starts[i] .. starts[i] + lengths[i] - 1 for every frontier node
+    run_starts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    positions = run_starts + np.arange(lengths.sum())
+    return graph['neighbors'][positions], np.repeat(frontier, lengths).astype(np.int32)
+
+
+def _trace(parents, node):
+    path = [node]
+    while parents[path[-1]] != path[-1]:
+        path.append(int(parents[path[-1]]))
+    return path
+
+
+def fewest_steps_path(source, target, time_budget=PATH_TIME_BUDGET):
+    """Shortest path by number of collaborations, by bidirectional BFS.
+
+    Returns (path, status): the talent_ids from source to target and
+    'found', or None and 'unconnected' / 'timeout'.
+    """
+    if source == target:
+        return [source], 'found'
+    graph = talent_graph()
+    n_talents = len(graph['offsets']) - 1
+    deadline = time.perf_counter() + time_budget
+    # parents[side][node]: the node it was reached from (itself for the start), -1 if unseen;
+    # depths[side][node]: its distance from that side's start
+    parents = [np.full(n_talents, -1, dtype=np.int32), np.full(n_talents, -1, dtype=np.int32)]
+    depths = [np.zeros(n_talents, dtype=np.int32), np.zeros(n_talents, dtype=np.int32)]
+    parents[0][source], parents[1][target] = source, target
+    frontiers = [np.array([source], dtype=np.int32), np.array([target], dtype=np.int32)]
+    levels = [0, 0]
+
+    while len(frontiers[0]) and len(frontiers[1]):
+        if time.perf_counter() > deadline:
+            return None, 'timeout'
+        # Grow the side with the smaller frontier
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        neighbors, via = _expand(graph, frontiers[side])
+        fresh = parents[side][neighbors] == -1
+        neighbors, via = neighbors[fresh], via[fresh]
+        neighbors, first = np.unique(neighbors, return_index=True)
+        levels[side] += 1
+        parents[side][neighbors] = via[first]
+        depths[side][neighbors] = levels[side]
+        frontiers[side] = neighbors
+
+        met = neighbors[parents[1 - side][neighbors] != -1]
+        if len(met):
+            # The other side may have reached them at different depths
+            meeting = int(met[np.argmin(depths[1 - side][met])])
+            path = _trace(parents[0], meeting)[::-1] + _trace(parents[1], meeting)[1:]
+            return path, 'found'
+    return None, 'unconnected'
+
+
+def strongest_path(source, target, time_budget=PATH_TIME_BUDGET):
+    """Path whose collaborations are strongest, by bidirectional Dijkstra.
+
+    Each step costs 1 / (titles shared), so one tie of three shared titles
+    is as short as three one-title ties. Returns (path, status) as
+    fewest_steps_path() does.
+    """
+    if source == target:
+        return [source], 'found'
+    graph = talent_graph()
+    offsets, neighbors, weights = graph['offsets'], graph['neighbors'], graph['weights']
+    deadline = time.perf_counter() + time_budget
+    distances = [{source: 0.0}, {target: 0.0}]
+    parents = [{source: source}, {target: target}]
+    heaps = [[(0.0, source)], [(0.0, target)]]
+    settled = [set(), set()]
+    best, meeting = np.inf, None
+    pops = 0
+
+    while heaps[0] and heaps[1]:
+        # Done once no path through an unsettled node can beat the best one
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        pops += 1
+        if pops % 256 == 0 and time.perf_counter() > deadline:
+            return None, 'timeout'
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        distance, node = heapq.heappop(heaps[side])
+        if node in settled[side]:
+            continue
+        settled[side].add(node)
+
+        start, stop = offsets[node], offsets[node + 1]
+        for neighbor, weight in zip(neighbors[start:stop].tolist(), weights[start:stop].tolist()):
+            candidate = distance + 1.0 / weight
+            if candidate < distances[side].get(neighbor, np.inf):
+                distances[side][neighbor] = candidate
+                parents[side][neighbor] = node
+                heapq.heappush(heaps[side], (candidate, neighbor))
+            if neighbor in distances[1 - side]:
+                total = distances[side][neighbor] + distances[1 - side][neighbor]
+                if total < best:
+                    best, meeting = total, neighbor
+
+    if meeting is None:
+        return None, 'unconnected'
+    return _trace(parents[0], meeting)[::-1] + _trace(parents[1], meeting)[1:], 'found'
+
+
+PATH_FINDERS = {'fewest': fewest_steps_path, 'strongest': strongest_path}
+
+
+def shared_titles(talent_a, talent_b):
+    """Titles two people are both credited on, by release year."""
+    df_a = talent_titles(talent_a).to_pandas()
+    df_b = talent_titles(talent_b).to_pandas()
+    df_shared = df_a[df_a['show_id'].isin(df_b['show_id'])].drop_duplicates('show_id')
+    return df_shared.sort_values('release_year')[['show_id', 'title', 'release_year']]
+
+
+@functools.lru_cache(maxsize=PATH_CACHE_SIZE)
+def _connection(source, target, mode, version):
+    path, status = PATH_FINDERS[mode](source, target)
+    if status == 'timeout':
+        # Raised, so the cache does not keep it
+        raise TimeoutError
+    if path is None:
+        return {'status': status, 'path': [], 'steps': []}
+    steps = [{'from': a, 'to': b, 'titles': shared_titles(a, b).to_dict('records')}
+             for a, b in zip(path, path[1:])]
+    return {'status': status, 'path': path, 'steps': steps}
+
+
+def connect(source, target, mode='fewest'):
+    """The path between two people, with the titles each consecutive pair shares.
+
+    mode is 'fewest' (fewest steps) or 'strongest' (strongest ties). Returns
+    {'status', 'path', 'steps'}; a timed-out search is not cached.
+    """
+    try:
+        return _connection(source, target, mode, graph_version())
+    except TimeoutError:
+        return {'status': 'timeout', 'path': [], 'steps': []}
@@ -0,0 +1,119 @@
+# Per-talent reads from the prepared talent files.
+#
+# talent_portfolio.parquet is written sorted by talent_id in small row groups
+# (see prepare_talent_data.py), so each row group's talent_id min/max
+# statistics cover a narrow ID range. A lookup picks the row groups whose
+# range contains the requested ID, reads only those, and filters them on
+# talent_id with pyarrow, without keeping the table resident.
+#
+# File footers (and the row-group ranges taken from them) are cached per
+# file and reloaded when the file changes on disk. The talent hub's
+# portfolio export (app.py) reads a person's rows this way.
+#
+# The talent hub's page queries go through a flat offset index instead
+# (the talent_index prep stage): talent_titles.parquet holds every person's
+# distinct titles contiguously in talent_id order, and talent_index/*.npy
+# hold, per talent_id, where those rows start plus the precomputed stats
+# (title count, active years, roles, country breakdown). Both are
+# memory-mapped, so a lookup is a few array reads and an O(1) table slice.
+
+import functools
+import os
+
+import numpy as np
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from datastore import arrow_string_dtype, load_array, mapped_table
+
+PORTFOLIO_PATH = 'talent_portfolio.parquet'
+
+# Written by the talent_index stage of prepare_talent_data.py
+TITLES_PATH = 'talent_titles.parquet'
+TITLE_COLUMNS = ['talent_id', 'show_id', 'title', 'role', 'release_year']
+INDEX_DIR = 'talent_index'
+# Arrays indexed by talent_id (offsets have one extra entry at the end);
+# country_ids/country_rows run in country_offsets order, roles and countries
+# are the name tables for role_flags bits and country_ids. title_offsets is
+# written last, so its mtime marks a complete index.
+INDEX_ARRAYS = ['title_offsets', 'title_count', 'first_year', 'last_year', 'role_flags',
+                'country_offsets', 'country_ids', 'country_rows', 'roles', 'countries']
+
+
+def index_path(name):
+    return os.path.join(INDEX_DIR, f"{name}.npy")
+
+
+@functools.lru_cache(maxsize=16)
+def _row_group_ranges(path, mtime_ns):
+    """Footer metadata and per-row-group talent_id (min, max) of a sorted file."""
+    metadata = pq.ParquetFile(path).metadata
+    column = metadata.schema.to_arrow_schema().get_field_index('talent_id')
+    mins = np.empty(metadata.num_row_groups, dtype=np.int64)
+    maxs = np.empty(metadata.num_row_groups, dtype=np.int64)
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(column).statistics
+        if stats is None or not stats.has_min_max:
+            # No statistics: the group has to be read for every lookup
+            mins[i], maxs[i] = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+        else:
+            mins[i], maxs[i] = stats.min, stats.max
+    return metadata, mins, maxs
+
+
+def read_talent_rows(path, talent_id, columns=None):
+    """Rows of a talent-sorted file for one talent_id, as a DataFrame.
+
+    Raises FileNotFoundError if the prep script has not been run.
+    """
+    metadata, mins, maxs = _row_group_ranges(path, os.stat(path).st_mtime_ns)
+    row_groups = np.flatnonzero((mins <= talent_id) & (maxs >= talent_id))
+
+    read_columns = None if columns is None else list(dict.fromkeys(['talent_id'] + list(columns)))
+    # Reusing the cached footer skips re-parsing it on every lookup
+    table = pq.ParquetFile(path, metadata=metadata, memory_map=True).read_row_groups(
+        row_groups.tolist(), columns=read_columns)
+    table = table.filter(pc.equal(table.column('talent_id'), talent_id))
+    if columns is not None:
+        table = table.select(list(columns))
+    return table.to_pandas(types_mapper=arrow_string_dtype)
+
+
+def talent_portfolio(talent_id, columns=None):
+    """One person's portfolio rows (one row per title/country)."""
+    return read_talent_rows(PORTFOLIO_PATH, talent_id, columns)
+
+
+@functools.lru_cache(maxsize=2)
+def _load_index(mtime_ns):
+    return {name: load_array(index_path(name)) for name in INDEX_ARRAYS}
+
+
+def talent_index():
+    """The memory-mapped index arrays, reloaded when the prep script rewrites them.
+
+    Raises FileNotFoundError if the prep script has not been run.
+    """
+    return _load_index(os.stat(index_path('title_offsets')).st_mtime_ns)
+
+
+def talent_stats(talent_id):
+    """Precomputed portfolio stats for one person, without reading any rows."""
+    index = talent_index()
+    flags = int(index['role_flags'][talent_id])
+    start, stop = index['country_offsets'][talent_id:talent_id + 2]
+    return {
+        'title_count': int(index['title_count'][talent_id]),
+        'first_year': int(index['first_year'][talent_id]),
+        'last_year': int(index['last_year'][talent_id]),
+        'roles': [str(role) for bit, role in enumerate(index['roles']) if flags >> bit & 1],
+        # Portfolio rows (title x country) per production country, by country name
+        'countries': index['countries'][index['country_ids'][start:stop]].tolist(),
+        'country_rows': index['country_rows'][start:stop].tolist(),
+    }
+
+
+def talent_titles(talent_id):
+    """One person's distinct (show_id, title, role, release_year) rows, as an Arrow table slice."""
+    start, stop = talent_index()['title_offsets'][talent_id:talent_id + 2]
+    return mapped_table(TITLES_PATH).slice(int(start), int(stop - start))
@@ -0,0 +1,128 @@
+# Type-ahead search over talent names.
+#
+# The talent dropdown does not ship every name to the browser: it sends what
+# the user types and gets the best few matches back. The index is written by
+# the talent_search stage of prepare_talent_data.py, over normalized names
+# (lower case, accents and punctuation stripped), as a sorted token table in
+# offset form:
+#
+#   search_tokens           every distinct name token, sorted (UTF-8 bytes)
+#   search_token_offsets    where each token's postings start (one extra at the end)
+#   search_token_ids        talent_ids of the names containing the token
+#   search_token_positions  the token's position in that name
+#
+# The tokens starting with a prefix are one contiguous run of search_tokens,
+# and their postings one contiguous run of the posting arrays, so a term is
+# two binary searches and a slice. A term that prefixes no token falls back
+# to fuzzy matching against the tokens sharing its first letter.
+
+import difflib
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+from datastore import load_array
+from talent_lookup import index_path, talent_index
+
+SEARCH_ARRAYS = ['search_tokens', 'search_token_ids', 'search_token_positions', 'search_token_offsets']
+
+# Matches returned per query
+SEARCH_LIMIT = 20
+
+# difflib similarity a misspelled term needs, and how long it must be to try
+FUZZY_CUTOFF = 0.8
+FUZZY_MIN_LENGTH = 3
+FUZZY_TOKENS = 10
+
+
+# --- 1. Normalizing & Building ---
+def normalize_names(names):
+    """Lower-cased names with accents dropped and punctuation turned into spaces."""
+    names = pd.Series(names, dtype=object).astype('string')
+    names = names.str.normalize('NFKD').str.replace("[\u0300-\u036f]", '', regex=True)
+    return names.str.lower().str.replace(r"[\W_]+", ' ', regex=True).str.strip()
+
+
+def build_search_index(names):
+    """Search arrays for a list of names, where a name's talent_id is its position."""
+    df = pd.DataFrame({'token': normalize_names(names).str.split()})
+    df['talent_id'] = np.arange(len(df), dtype=np.int32)
+    df = df.explode('token').dropna(subset=['token'])
+    df['position'] = df.groupby('talent_id').cumcount().clip(upper=255)
+
+    # Sort by the UTF-8 bytes, the order searchsorted sees; stable keeps talent_id order
+    token_bytes = np.array([token.encode('utf-8') for token in df['token']], dtype=bytes)
+    order = np.argsort(token_bytes, kind='stable')
+    token_bytes = token_bytes[order]
+    tokens, starts = np.unique(token_bytes, return_index=True)
+    return {
+        'search_tokens': tokens,
+        'search_token_ids': df['talent_id'].to_numpy(np.int32)[order],
+        'search_token_positions': df['position'].to_numpy(np.uint8)[order],
+        'search_token_offsets': np.append(starts, len(token_bytes)).astype(np.int64),
+    }
+
+
+# --- 2. Searching ---
+@functools.lru_cache(maxsize=2)
+def _load_search_index(mtime_ns):
+    return {name: load_array(index_path(name)) for name in SEARCH_ARRAYS}
+
+
+def search_index():
+    """The memory-mapped search arrays (search_token_offsets is written last)."""
+    return _load_search_index(os.stat(index_path('search_token_offsets')).st_mtime_ns)
+
+
+def _prefix_range(tokens, prefix):
+    """[lo, hi) of the sorted tokens that start with `prefix` (bytes)."""
+    if len(prefix) > tokens.dtype.itemsize:
+        return 0, 0
+    return np.searchsorted(tokens, prefix), np.searchsorted(tokens, prefix + b'\xff')
+
+
+def _term_postings(index, term):
+    """(talent_ids, positions) of the tokens a query term prefixes, or else nearly matches."""
+    offsets = index['search_token_offsets']
+    lo, hi = _prefix_range(index['search_tokens'], term.encode('utf-8'))
+    ranges = [(lo, hi)] if hi > lo else []
+    if not ranges and len(term) >= FUZZY_MIN_LENGTH:
+        first_lo, first_hi = _prefix_range(index['search_tokens'], term[:1].encode('utf-8'))
+        candidates = [token.decode('utf-8') for token in index['search_tokens'][first_lo:first_hi]]
+        for token in difflib.get_close_matches(term, candidates, n=FUZZY_TOKENS, cutoff=FUZZY_CUTOFF):
+            position = first_lo + candidates.index(token)
+            ranges.append((position, position + 1))
+
+    slices = [slice(offsets[start], offsets[stop]) for start, stop in ranges]
+    ids = np.concatenate([index['search_token_ids'][s] for s in slices] or [np.array([], dtype=np.int32)])
+    positions = np.concatenate([index['search_token_positions'][s] for s in slices] or [np.array([], dtype=np.uint8)])
+    return ids, positions
+
+
+def search_talent(query, limit=SEARCH_LIMIT):
+    """talent_ids of the best matches for a typed query.
+
+    Every query term must prefix (or, failing that, nearly match) a token of
+    the name. Names whose first token matches the first term come first,
+    then the most prolific people.
+    """
+    terms = normalize_names([query]).iloc[0].split() if query else []
+    if not terms:
+        return []
+    index = search_index()
+
+    matched, leading = None, None
+    for term in terms:
+        ids, positions = _term_postings(index, term)
+        if leading is None:
+            leading = np.unique(ids[positions == 0])
+        ids = np.unique(ids)
+        matched = ids if matched is None else np.intersect1d(matched, ids, assume_unique=True)
+        if not len(matched):
+            return []
+
+    title_count = talent_index()['title_count'][matched]
+    order = np.lexsort((matched, -title_count, ~np.isin(matched, leading)))
+    return matched[order[:limit]].tolist()
@@ -0,0 +1,164 @@
+# "People like X": talent similarity by MinHash and LSH.
+#
+# Each person is described by a set of features: the genres and production
+# countries of their titles and the people they have worked with. Two
+# people are as similar as the Jaccard index of their sets. Comparing one
+# person with every other is too slow per request, so the similar_talent
+# stage of prepare_talent_data.py writes (under talent_index/):
+#
+#   similarity_features         every person's feature codes, sorted, row by row
+#   similarity_feature_offsets  where each person's row starts (one extra at the end)
+#   similarity_params           the (a, b) of the MINHASH_BANDS * BAND_ROWS hash functions
+#   similarity_band_keys        per LSH band, every person's band key, sorted
+#   similarity_band_talents     per LSH band, the talent_id behind each sorted key
+#
+# A query recomputes the person's MinHash signature from their features,
+# looks up the people sharing a band key with them (a binary search per
+# band), and ranks those candidates by their exact Jaccard index.
+#
+# A bucket (the people sharing one band key) can hold thousands of people
+# with tiny feature sets, so a query takes at most MAX_BUCKET of them.
+# Within a bucket people are ordered by a per-band hash of their talent_id,
+# which makes those a fixed pseudo-random sample of the bucket rather than
+# its lowest talent_ids, and a different sample in every band. The price is
+# recall: a similar person left out of an oversized bucket is only found if
+# they share another band with the query.
+
+import functools
+import os
+
+import numpy as np
+
+from datastore import load_array
+from talent_lookup import index_path
+
+# similarity_feature_offsets last: readers reload the index when its mtime changes
+SIMILARITY_ARRAYS = ['similarity_features', 'similarity_params', 'similarity_band_keys',
+                     'similarity_band_talents', 'similarity_feature_offsets']
+
+# 16 bands of 2 hashes: pairs with a Jaccard index of 0.25 share at least
+# one band key about half the time, and pairs of 0.5 almost always
+MINHASH_BANDS = 16
+BAND_ROWS = 2
+MINHASH_PRIME = (1 << 31) - 1
+
+# Candidates taken from one band bucket (a sample, see above), and matches returned
+MAX_BUCKET = 500
+SIMILAR_LIMIT = 10
+
+
+# --- 1. MinHash ---
+def minhash_params(seed=0):
+    """(a, b) pairs of the universal hash functions h(x) = (a * x + b) mod MINHASH_PRIME."""
+    rng = np.random.default_rng(seed)
+    n_hashes = MINHASH_BANDS * BAND_ROWS
+    return np.stack([rng.integers(1, MINHASH_PRIME, n_hashes), rng.integers(0, MINHASH_PRIME, n_hashes)],
+                    axis=1).astype(np.uint64)
+
+
+def _hash(params, codes):
+    """Every hash function applied to every code: shape (hashes, codes)."""
+    codes = np.asarray(codes, dtype=np.uint64)
+    return (params[:, :1] * codes[None, :] + params[:, 1:]) % MINHASH_PRIME
+
+
+def band_keys(signatures):
+    """32-bit key per band from signatures of shape (hashes, people)."""
+    signatures = signatures.reshape(MINHASH_BANDS, BAND_ROWS, -1).astype(np.uint64)
+    keys = np.zeros(signatures[:, 0].shape, dtype=np.uint64)
+    for row in range(BAND_ROWS):
+        # uint64 arithmetic wraps around, which is what a hash wants
+        keys = keys * np.uint64(0x9E3779B97F4A7C15) + signatures[:, row] + np.uint64(1)
+    return ((keys ^ (keys >> np.uint64(32))) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def build_similarity_index(offsets, features, seed=0):
+    """Similarity arrays for a feature CSR (talent_id rows of sorted feature codes)."""
+    params = minhash_params(seed)
+    n_talents = len(offsets) - 1
+    has_features = np.diff(offsets) > 0
+    signatures = np.full((len(params), n_talents), MINHASH_PRIME, dtype=np.uint64)
+    for i in range(len(params)):
+        # One hash function at a time, to bound memory
+        hashes = _hash(params[i:i + 1], features)[0]
+        signatures[i, has_features] = np.minimum.reduceat(hashes, offsets[:-1][has_features])
+    keys = band_keys(signatures)
+    keys[:, ~has_features] = 0
+
+    # Sorted by key, and within a key by a hash of the talent_id seeded by the band
+    shuffle = _hash(params[::BAND_ROWS], np.arange(n_talents))
+    order = np.lexsort((shuffle, keys), axis=1)
+    return {
+        'similarity_features': features.astype(np.int32),
+        'similarity_params': params,
+        'similarity_band_keys': np.take_along_axis(keys, order, axis=1),
+        'similarity_band_talents': order.astype(np.int32),
+        'similarity_feature_offsets': offsets.astype(np.int64),
+    }
+
+
+# --- 2. Queries ---
+@functools.lru_cache(maxsize=2)
+def _load_similarity_index(mtime_ns):
+    return {name: load_array(index_path(name)) for name in SIMILARITY_ARRAYS}
+
+
+def similarity_index():
+    """The memory-mapped similarity arrays.
+
+    Raises FileNotFoundError if the prep script has not been run.
+    """
+    return _load_similarity_index(os.stat(index_path('similarity_feature_offsets')).st_mtime_ns)
+
+
+def _features(index, talent_id):
+    offsets = index['similarity_feature_offsets']
+    return index['similarity_features'][offsets[talent_id]:offsets[talent_id + 1]]
+
+
+def lsh_candidates(talent_id):
+    """People sharing at least one LSH band key with this person."""
+    index = similarity_index()
+    features = _features(index, talent_id)
+    if not len(features):
+        return np.array([], dtype=np.int32)
+    keys = band_keys(_hash(index['similarity_params'], features).min(axis=1)[:, None])[:, 0]
+
+    candidates = []
+    for band, key in enumerate(keys):
+        sorted_keys = index['similarity_band_keys'][band]
+        lo, hi = np.searchsorted(sorted_keys, key, 'left'), np.searchsorted(sorted_keys, key, 'right')
+        candidates.append(index['similarity_band_talents'][band, lo:min(hi, lo + MAX_BUCKET)])
+    candidates = np.unique(np.concatenate(candidates))
+    return candidates[candidates != talent_id]
+
+
+def jaccard(talent_id, candidates):
+    """Exact Jaccard index between one person's features and each candidate's."""
+    index = similarity_index()
+    features = _features(index, talent_id)
+    offsets = index['similarity_feature_offsets']
+    starts = offsets[candidates]
+    lengths = offsets[candidates + 1] - starts
+    # All candidates' features in one gather, tagged with their candidate's position
+    positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    owners = np.repeat(np.arange(len(candidates)), lengths)
+    shared = np.bincount(owners[np.isin(index['similarity_features'][positions], features)],
+                         minlength=len(candidates))
+    return shared / (len(features) + lengths - shared)
+
+
+@functools.lru_cache(maxsize=1024)
+def _similar_talent(talent_id, limit, mtime_ns):
+    candidates = lsh_candidates(talent_id)
+    if not len(candidates):
+        return [], []
+    scores = jaccard(talent_id, candidates)
+    order = np.lexsort((candidates, -scores))[:limit]
+    return candidates[order].tolist(), scores[order].tolist()
+
+
+def similar_talent(talent_id, limit=SIMILAR_LIMIT):
+    """(talent_ids, Jaccard indexes) of the most similar people, most similar first."""
+    mtime_ns = os.stat(index_path('similarity_feature_offsets')).st_mtime_ns
+    return _similar_talent(talent_id, limit, mtime_ns)
@@ -0,0 +1,27 @@
+import unittest
+
+import pandas as pd
+
+from catalog import explode_values
+
+
+class ExplodeValuesTest(unittest.TestCase):
+    def test_values_are_kept_as_listed(self):
+        df = pd.DataFrame({
+            'show_id': ['s1', 's2', 's3', 's4'],
+            'country': [' United States, India ', 'Not Given', None, 'France, France'],
+        })
+        df_bridge = explode_values(df, 'country', 'country')
+        self.assertEqual(df_bridge.values.tolist(), [
+            ['s1', 'United States'], ['s1', 'India'], ['s2', 'Not Given'], ['s4', 'France'], ['s4', 'France'],
+        ])
+
+    def test_counts_match_a_raw_explode(self):
+        df = pd.DataFrame({'show_id': ['s1', 's2', 's3'], 'listed_in': ['Dramas, Comedies', 'Dramas', 'No Data']})
+        raw = df.assign(genre=df['listed_in'].str.split(', ')).explode('genre')['genre'].value_counts()
+        counts = explode_values(df, 'listed_in', 'genre')['genre'].value_counts()
+        pd.testing.assert_series_equal(counts, raw)
+
+
+if __name__ == '__main__':
+    unittest.main()
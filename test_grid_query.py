@@ -0,0 +1,47 @@
+import unittest
+
+import pandas as pd
+
+from grid_query import EMPTY_RESPONSE, rows_response, valid_models
+
+
+class ValidModelsTest(unittest.TestCase):
+    def test_grid_models_pass(self):
+        sort_model = [{'colId': 'title', 'sort': 'asc'}, {'colId': 'release_year', 'sort': 'desc'}]
+        filter_model = {
+            'title': {'filterType': 'text', 'type': 'contains', 'filter': 'love'},
+            'release_year': {'filterType': 'number', 'operator': 'AND', 'conditions': [
+                {'filterType': 'number', 'type': 'inRange', 'filter': 2000, 'filterTo': 2010},
+                {'filterType': 'number', 'type': 'notBlank'},
+            ]},
+        }
+        self.assertTrue(valid_models(sort_model, filter_model))
+        self.assertTrue(valid_models([], {}))
+
+    def test_malformed_models_fail(self):
+        for sort_model, filter_model in [
+            ([[{'colId': 'title'}]], {}),
+            (['title'], {}),
+            ([{'colId': 'title'}], {}),
+            ([{'colId': 'title', 'sort': 'up'}], {}),
+            ([{'colId': ['title'], 'sort': 'asc'}], {}),
+            ([], {'title': 'love'}),
+            ([], {'title': {'conditions': {}}}),
+            ([], {'title': {'conditions': ['love']}}),
+            ([], {'release_year': {'filterType': 'number', 'type': 'lessThan', 'filter': 'x'}}),
+            ([], {'country': {'filterType': 'set', 'values': 'Japan'}}),
+            ({}, {}),
+            ([], []),
+        ]:
+            self.assertFalse(valid_models(sort_model, filter_model), (sort_model, filter_model))
+
+    def test_rows_response_rejects_malformed_request(self):
+        df = pd.DataFrame({'title': ['b', 'a']})
+        request = {'startRow': 0, 'endRow': 10, 'sortModel': [['title']], 'filterModel': {}}
+        self.assertEqual(rows_response(df, request), EMPTY_RESPONSE)
+        request['sortModel'] = [{'colId': 'title', 'sort': 'asc'}]
+        self.assertEqual(rows_response(df, request)['rowData'], [{'title': 'a'}, {'title': 'b'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import glob
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+
+import prepare_talent_data as prep
+
+
+class StageKeyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.helper = os.path.join(self.tmp.name, 'helper.py')
+        with open(self.helper, 'w') as f:
+            f.write('WEIGHT = 1\n')
+        prep.SETTINGS['_test_window'] = 5
+        prep.stage('_test_stage', outputs=[], code=[self.helper], settings=['_test_window'])(lambda: None)
+
+    def tearDown(self):
+        del prep.STAGES['_test_stage']
+        del prep.SETTINGS['_test_window']
+        self.tmp.cleanup()
+
+    def test_helper_module_change_invalidates_stage(self):
+        before = prep.stage_key('_test_stage')
+        self.assertEqual(prep.stage_key('_test_stage'), before)
+        with open(self.helper, 'w') as f:
+            f.write('WEIGHT = 2\n')
+        self.assertNotEqual(prep.stage_key('_test_stage'), before)
+
+    def test_setting_change_invalidates_stage(self):
+        before = prep.stage_key('_test_stage')
+        prep.SETTINGS['_test_window'] = 3
+        self.assertNotEqual(prep.stage_key('_test_stage'), before)
+
+    def test_rising_stars_read_the_window_setting(self):
+        self.assertIn('rising_window_years', prep.STAGES['rising_stars']['settings'])
+
+    def test_stages_hash_their_builder_modules(self):
+        for name, module in [('talent_index', 'talent_lookup.py'), ('talent_search', 'talent_search.py'),
+                             ('edges', 'talent_graph.py'), ('similarity', 'talent_similarity.py'),
+                             ('title_similar', 'title_similarity.py'), ('portfolio', 'catalog.py')]:
+            self.assertIn(module, [os.path.basename(path) for path in prep.STAGES[name]['code']], name)
+
+
+class BuilderModuleTest(unittest.TestCase):
+    """A copy of the script next to copies of its modules, so one can be edited."""
+
+    def setUp(self):
+        here = os.path.dirname(os.path.abspath(__file__))
+        self.tmp = tempfile.TemporaryDirectory()
+        for path in glob.glob(os.path.join(here, '*.py')):
+            shutil.copy(path, self.tmp.name)
+        spec = importlib.util.spec_from_file_location(
+            '_prep_copy', os.path.join(self.tmp.name, 'prepare_talent_data.py'))
+        self.prep = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(self.prep)
+        # The stage inputs are the committed outputs next to the real script
+        self.cwd = os.getcwd()
+        os.chdir(here)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_editing_a_builder_module_invalidates_its_stages_only(self):
+        stages = ['edges', 'centrality', 'talent_index']
+        before = {name: self.prep.stage_key(name) for name in stages}
+        with open(os.path.join(self.tmp.name, 'talent_graph.py'), 'a') as f:
+            f.write('\n# edited\n')
+        after = {name: self.prep.stage_key(name) for name in stages}
+        self.assertNotEqual(after['edges'], before['edges'])
+        self.assertNotEqual(after['centrality'], before['centrality'])
+        self.assertEqual(after['talent_index'], before['talent_index'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# Full-text search over the catalog for the Content Explorer.
+#
+# An inverted index over the title, description, cast and director of every
+# title: text is normalized like talent names (see talent_search.py), split
+# into tokens, and each token's postings list the catalog rows containing
+# it with a field-weighted term frequency (a word in the title counts
+# FIELD_WEIGHTS['title'] times). The index is built once per worker, from
+# the catalog the explorer holds, as sorted arrays in offset form:
+#
+#   tokens         every distinct token, sorted
+#   token_offsets  where each token's postings start (one extra at the end)
+#   rows           catalog rows containing the token
+#   frequencies    the token's weighted frequency in that row
+#   lengths        every row's weighted token count
+#
+# Every query term must prefix a token of the row, so results narrow as the
+# user types; matches are ranked by BM25.
+
+import numpy as np
+import pandas as pd
+
+from talent_search import normalize_names
+
+# How much a token counts in each searched column
+FIELD_WEIGHTS = {'title': 3.0, 'cast': 2.0, 'director': 2.0, 'description': 1.0}
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+# --- 1. Building ---
+def build_title_search(df):
+    """Search arrays for a catalog frame with the FIELD_WEIGHTS columns, rows by position."""
+    field_tokens = []
+    for column_name, weight in FIELD_WEIGHTS.items():
+        text = df[column_name].astype('string').where(~df[column_name].isin(['N/A']))
+        df_tokens = pd.DataFrame({'row': np.arange(len(df)), 'token': normalize_names(text.fillna('')).str.split().to_numpy()})
+        df_tokens = df_tokens.explode('token').dropna(subset=['token'])
+        field_tokens.append(df_tokens.assign(frequency=weight))
+    df_postings = pd.concat(field_tokens, ignore_index=True)
+    df_postings = df_postings.groupby(['token', 'row'], sort=True)['frequency'].sum().reset_index()
+
+    tokens, starts = np.unique(df_postings['token'].to_numpy(str), return_index=True)
+    lengths = np.bincount(df_postings['row'], weights=df_postings['frequency'], minlength=len(df))
+    return {
+        'tokens': tokens,
+        'token_offsets': np.append(starts, len(df_postings)).astype(np.int64),
+        'rows': df_postings['row'].to_numpy(np.int32),
+        'frequencies': df_postings['frequency'].to_numpy(np.float32),
+        'lengths': lengths.astype(np.float32),
+    }
+
+
+# --- 2. Searching ---
+def _term_scores(index, term):
+    """(rows, BM25 scores) of the rows with a token that `term` prefixes."""
+    tokens, offsets = index['tokens'], index['token_offsets']
+    lo, hi = np.searchsorted(tokens, term), np.searchsorted(tokens, term + '\uffff')
+    # The postings of every token in the prefix range are one contiguous run
+    postings = slice(offsets[lo], offsets[hi])
+    rows, frequencies = index['rows'][postings], index['frequencies'][postings]
+    if not len(rows):
+        return rows, np.array([], dtype=np.float64)
+
+    lengths = index['lengths']
+    document_counts = np.repeat(np.diff(offsets[lo:hi + 1]), np.diff(offsets[lo:hi + 1]))
+    idf = np.log(1 + (len(lengths) - document_counts + 0.5) / (document_counts + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[rows] / lengths.mean())
+    scores = idf * frequencies * (BM25_K1 + 1) / (frequencies + norm)
+    # A row matching several tokens of the prefix keeps its best one
+    scores = pd.Series(scores).groupby(rows).max()
+    return scores.index.to_numpy(np.int32), scores.to_numpy()
+
+
+def search_titles(index, query):
+    """Catalog rows matching every term of the query, best BM25 score first (None for no query)."""
+    terms = normalize_names([query]).iloc[0].split() if query else []
+    if not terms:
+        return None
+
+    matched, total = None, None
+    for term in terms:
+        rows, scores = _term_scores(index, term)
+        term_scores = pd.Series(scores, index=rows)
+        if matched is None:
+            matched, total = rows, term_scores
+        else:
+            matched = np.intersect1d(matched, rows, assume_unique=True)
+            total = total.reindex(matched) + term_scores.reindex(matched)
+        if not len(matched):
+            return np.array([], dtype=np.int32)
+
+    total = total.reindex(matched)
+    order = np.lexsort((matched, -total.to_numpy()))
+    return matched[order]
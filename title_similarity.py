@@ -0,0 +1,204 @@
+# "More like this": title similarity for the Content Explorer.
+#
+# Each title is a sparse feature vector made of weighted blocks: TF-IDF of
+# its description, its genres, its cast and director, its production
+# countries and its release decade. Every block is L2-normalized and scaled
+# by the square root of its FEATURE_WEIGHTS entry, so the cosine of two
+# titles is the weighted sum of their per-block cosines.
+#
+# Comparing every pair of exact vectors is too slow even at prep time, so
+# the title_similar stage of prepare_talent_data.py finds neighbors in two
+# passes:
+#
+#   1. every vector is projected onto SKETCH_DIMS random Gaussian directions
+#      (a "sketch" whose dot products approximate the cosines), and each
+#      block of QUERY_BLOCK titles is scored against all sketches in one
+#      matrix product, keeping the best RERANK_CANDIDATES,
+#   2. those candidates are rescored on the exact sparse vectors.
+#
+# (Clustering the sketches and probing only nearby clusters scans less, but
+# titles do not cluster well enough: a third of the catalog scanned still
+# missed a sixth of the true neighbors.) The best SIMILAR_TITLES of every
+# title are written to title_neighbors.parquet, so workers only look them up.
+
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+from talent_search import normalize_names
+
+NEIGHBORS_PATH = 'title_neighbors.parquet'
+NEIGHBOR_COLUMNS = ['show_id', 'similar_show_id', 'rank', 'score']
+
+# Catalog columns the features are built from
+FEATURE_COLUMNS = ['show_id', 'description', 'genre_list', 'cast_list', 'director_list',
+                   'country_list', 'release_year']
+
+# Share of the similarity carried by each block
+FEATURE_WEIGHTS = {'description': 0.4, 'genre': 0.25, 'people': 0.2, 'country': 0.1, 'era': 0.05}
+
+# Description words too common to say anything about a title
+STOP_WORDS = frozenset(
+    "a about after against all an and any are as at be becomes before being between but by "
+    "can during for from gets has have he her his how in into is it its their them this "
+    "through to up when where while who with your must one two new own out only find finds "
+    "off on or of over she they that the these young life".split()
+)
+
+SKETCH_DIMS = 256
+RERANK_CANDIDATES = 100
+QUERY_BLOCK = 256
+SIMILAR_TITLES = 20
+
+
+# --- 1. Feature Vectors ---
+def _normalized_block(df_block, weight):
+    """(row, key, value) rows of one block, L2-normalized per row and scaled by sqrt(weight)."""
+    norms = np.sqrt((df_block['value'] ** 2).groupby(df_block['row']).transform('sum'))
+    return df_block.assign(value=df_block['value'] / norms * np.sqrt(weight))
+
+
+def _list_block(df, column_names, prefix):
+    df_block = pd.concat([
+        pd.DataFrame({'row': np.arange(len(df)), 'key': df[column_name].to_numpy()}).explode('key')
+        for column_name in column_names
+    ], ignore_index=True).dropna(subset=['key']).drop_duplicates()
+    return df_block.assign(key=prefix + df_block['key'].astype(str), value=1.0)
+
+
+def title_features(df):
+    """(offsets, feature ids, weights) CSR of every title's feature vector, rows in df order."""
+    n_titles = len(df)
+    words = normalize_names(df['description'].fillna('')).str.split()
+    df_words = pd.DataFrame({'row': np.arange(n_titles), 'key': words.to_numpy()}).explode('key').dropna()
+    df_words = df_words[~df_words['key'].isin(STOP_WORDS) & (df_words['key'].str.len() > 1)]
+    df_words = df_words.groupby(['row', 'key']).size().rename('value').reset_index()
+    # Smoothed inverse document frequency
+    document_count = df_words.groupby('key')['row'].transform('size')
+    df_words['value'] = df_words['value'] * (np.log((1 + n_titles) / (1 + document_count)) + 1)
+    df_words['key'] = 'd:' + df_words['key'].astype(str)
+
+    decades = (pd.to_numeric(df['release_year'], errors='coerce') // 10 * 10).astype('Int64')
+    df_era = pd.DataFrame({'row': np.arange(n_titles), 'key': 'e:' + decades.astype('string'), 'value': 1.0})
+
+    blocks = {
+        'description': df_words,
+        'genre': _list_block(df, ['genre_list'], 'g:'),
+        'people': _list_block(df, ['cast_list', 'director_list'], 'p:'),
+        'country': _list_block(df, ['country_list'], 'c:'),
+        'era': df_era.dropna(),
+    }
+    df_features = pd.concat([_normalized_block(blocks[name], weight) for name, weight in FEATURE_WEIGHTS.items()],
+                            ignore_index=True)
+    # Titles missing a block are rescaled to unit length over the blocks they have
+    df_features = _normalized_block(df_features, 1.0)
+    df_features['feature'] = pd.factorize(df_features['key'], sort=True)[0]
+    df_features = df_features.sort_values(['row', 'feature'])
+
+    offsets = np.searchsorted(df_features['row'].to_numpy(), np.arange(n_titles + 1)).astype(np.int64)
+    return offsets, df_features['feature'].to_numpy(np.int32), df_features['value'].to_numpy(np.float32)
+
+
+def _gather(offsets, rows):
+    """Positions of every listed row's entries, and the index of the row each belongs to."""
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+    positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    return positions, np.repeat(np.arange(len(rows)), lengths)
+
+
+def pair_scores(vectors, queries, candidates):
+    """Exact cosine between each queries[i] and candidates[i]."""
+    offsets, features, weights = vectors
+    n_features = np.int64(features.max()) + 1 if len(features) else np.int64(1)
+    # Keys (pair, feature) are sorted on the query side: pairs ascending, features sorted per row
+    query_positions, query_pairs = _gather(offsets, queries)
+    query_keys = query_pairs * n_features + features[query_positions]
+    candidate_positions, candidate_pairs = _gather(offsets, candidates)
+    candidate_keys = candidate_pairs * n_features + features[candidate_positions]
+
+    hits = np.minimum(np.searchsorted(query_keys, candidate_keys), max(len(query_keys) - 1, 0))
+    match = query_keys[hits] == candidate_keys if len(query_keys) else np.zeros(len(candidate_keys), dtype=bool)
+    products = weights[query_positions][hits[match]] * weights[candidate_positions][match]
+    return np.bincount(candidate_pairs[match], weights=products, minlength=len(queries))
+
+
+# --- 2. Approximate Nearest-Neighbor Index ---
+def sketches(vectors, dims=SKETCH_DIMS, seed=0, chunk_size=2048):
+    """Unit-length random projections of the feature vectors, one row per title."""
+    offsets, features, weights = vectors
+    rng = np.random.default_rng(seed)
+    projection = rng.standard_normal((int(features.max()) + 1, dims), dtype=np.float32)
+    n_titles = len(offsets) - 1
+    points = np.zeros((n_titles, dims), dtype=np.float32)
+    for start in range(0, n_titles, chunk_size):
+        # Chunks bound the (entries, dims) intermediate
+        rows = np.arange(start, min(start + chunk_size, n_titles))
+        positions, owners = _gather(offsets, rows)
+        np.add.at(points, start + owners, projection[features[positions]] * weights[positions, None])
+    norms = np.linalg.norm(points, axis=1, keepdims=True)
+    return points / np.where(norms > 0, norms, 1)
+
+
+def build_title_neighbors(vectors, limit=SIMILAR_TITLES, seed=0):
+    """(rows, neighbor rows, ranks, scores) of every title's most similar titles."""
+    n_titles = len(vectors[0]) - 1
+    points = sketches(vectors, seed=seed)
+    n_candidates = min(RERANK_CANDIDATES, n_titles - 1)
+    if n_candidates < 1:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty, np.array([], dtype=np.float64)
+
+    results = []
+    for start in range(0, n_titles, QUERY_BLOCK):
+        queries = np.arange(start, min(start + QUERY_BLOCK, n_titles))
+        approximate = points[queries] @ points.T
+        approximate[np.arange(len(queries)), queries] = -np.inf
+        candidates = np.argpartition(-approximate, n_candidates - 1, axis=1)[:, :n_candidates]
+
+        exact = pair_scores(vectors, np.repeat(queries, n_candidates), candidates.ravel())
+        exact = exact.reshape(len(queries), n_candidates)
+        # Best first, ties by row; then the top `limit` with any overlap at all
+        order = np.lexsort((candidates, -exact))[:, :limit]
+        scores = np.take_along_axis(exact, order, axis=1)
+        keep = scores > 0
+        results.append((np.repeat(queries, order.shape[1]).reshape(order.shape)[keep],
+                        np.take_along_axis(candidates, order, axis=1)[keep],
+                        np.tile(np.arange(1, order.shape[1] + 1), (len(queries), 1))[keep],
+                        scores[keep]))
+    return tuple(np.concatenate(column) for column in zip(*results))
+
+
+def title_neighbors(df):
+    """title_neighbors.parquet rows for a catalog with FEATURE_COLUMNS."""
+    rows, neighbors, ranks, scores = build_title_neighbors(title_features(df))
+    show_ids = df['show_id'].to_numpy()
+    df_neighbors = pd.DataFrame({
+        'show_id': show_ids[rows], 'similar_show_id': show_ids[neighbors],
+        'rank': ranks.astype(np.int16), 'score': scores.astype(np.float32),
+    })
+    return df_neighbors.sort_values(['show_id', 'rank'], ignore_index=True)[NEIGHBOR_COLUMNS]
+
+
+# --- 3. Lookups ---
+@functools.lru_cache(maxsize=2)
+def _load_neighbors(mtime_ns):
+    df = pd.read_parquet(NEIGHBORS_PATH)
+    # show_id -> positions of its neighbor rows, already in rank order
+    return {
+        'rows': df.groupby('show_id', sort=False).indices,
+        'similar_show_id': df['similar_show_id'].to_numpy(),
+        'score': df['score'].to_numpy(),
+    }
+
+
+def similar_titles(show_id, limit=SIMILAR_TITLES):
+    """(show_ids, cosine scores) of the titles most like this one, most similar first.
+
+    Raises FileNotFoundError if the prep script has not been run.
+    """
+    neighbors = _load_neighbors(os.stat(NEIGHBORS_PATH).st_mtime_ns)
+    rows = neighbors['rows'].get(show_id, np.array([], dtype=np.int64))[:limit]
+    return neighbors['similar_show_id'][rows].tolist(), neighbors['score'][rows].tolist()